@@ -13,6 +13,7 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+from ._broadcast import Broadcast, LocalBroadcast
 from ._table import KVTable, KVTableContext, K, V, is_table
 from ._type import ComputingEngine
 from ._uuid import generate_computing_uuid
@@ -0,0 +1,48 @@
+#
+#  Copyright 2019 The FATE Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Broadcast(Generic[T]):
+    """
+    read-only value shared by all tasks of a computing session, created by `KVTableContext.broadcast`.
+
+    capture the broadcast instead of the value in functions submitted to tables, and access `value` inside them,
+    so that large objects are not serialized into every task.
+    """
+
+    @property
+    def value(self) -> T:
+        raise NotImplementedError(f"{self.__class__.__name__}.value")
+
+    def destroy(self):
+        pass
+
+
+class LocalBroadcast(Broadcast[T]):
+    """
+    broadcast which simply carries the value with it, used by backends without a shared storage for broadcasts
+    and for values small enough to be shipped with each task
+    """
+
+    def __init__(self, value: T):
+        self._value = value
+
+    @property
+    def value(self) -> T:
+        return self._value
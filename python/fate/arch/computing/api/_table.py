@@ -14,11 +14,15 @@
 #  limitations under the License.
 
 import abc
+import itertools
 import logging
+import math
 import random
 from typing import Any, Callable, Tuple, Iterable, Generic, TypeVar, Optional
 
 from fate.arch.computing.partitioners import get_partitioner_by_type
+from fate.arch.computing.api._broadcast import Broadcast, LocalBroadcast
+from fate.arch.config import cfg
 from fate.arch.computing.serdes import get_serdes_by_type
 from fate.arch.trace import auto_trace
 from fate.arch.trace import computing_profile as _compute_info
@@ -30,6 +34,12 @@ logger = logging.getLogger(__name__)
 K = TypeVar("K")
 V = TypeVar("V")
 
+_KEY_DESERIALIZE_BATCH_SIZE = 1024
+_KEY_SERIALIZE_BATCH_SIZE = 1024
+
+# partitioners placing key at `hash(key) % num_partitions`, see `fate.arch.computing.partitioners`
+_MODULO_PARTITIONER_TYPES = (0, 1, 2)
+
 _level = 0
 
 
@@ -99,12 +109,19 @@ class KVTableContext:
         key_serdes = get_serdes_by_type(key_serdes_type)
         value_serdes = get_serdes_by_type(value_serdes_type)
         partitioner = get_partitioner_by_type(partitioner_type)
-        if partition is None:
-            partition = 1
+        num_rows = len(data) if hasattr(data, "__len__") else None
         if not include_key:
-            data = ((key_serdes.serialize(i), value_serdes.serialize(v)) for i, v in enumerate(data))
+            if (serialize_batch := getattr(key_serdes, "serialize_batch", None)) is not None:
+                data = _batch_serialized_enumerate(data, serialize_batch, value_serdes)
+            else:
+                data = ((key_serdes.serialize(i), value_serdes.serialize(v)) for i, v in enumerate(data))
         else:
             data = ((key_serdes.serialize(k), value_serdes.serialize(v)) for k, v in data)
+        if partition is None:
+            if cfg.computing.adaptive_partition.enable:
+                partition, data = self._suggest_num_partitions_from_sample(data, num_rows)
+            else:
+                partition = 1
         return self._parallelize(
             data=data,
             total_partitions=partition,
@@ -119,8 +136,81 @@ class KVTableContext:
     def destroy(self):
         self._destroy()
 
+    @property
+    def task_cores(self) -> Optional[int]:
+        """
+        number of tasks could be run in parallel, None if unknown
+        """
+        return None
+
+    def suggest_num_partitions(self, num_rows: int = None, num_bytes: int = None, default: int = None) -> int:
+        """
+        pick a partition count for data of the given size, see `computing.adaptive_partition` in config.
+
+        partitions are spread over task cores unless they would hold less than `min_partition_rows` rows, and are
+        split further when they would exceed `max_partition_bytes`, counts above task cores are rounded up to
+        full waves. `default` is returned as is if given and adaptive partition is disabled.
+        """
+        options = cfg.computing.adaptive_partition
+        if default is not None and not options.enable:
+            return default
+        task_cores = self.task_cores or 1
+        by_cores = task_cores
+        if num_rows is not None:
+            by_cores = min(task_cores, max(1, num_rows // options.min_partition_rows))
+        by_size = 1
+        if num_bytes is not None:
+            by_size = max(1, math.ceil(num_bytes / options.max_partition_bytes))
+        num_partitions = max(by_cores, by_size)
+        if num_partitions > task_cores:
+            num_partitions = math.ceil(num_partitions / task_cores) * task_cores
+        return num_partitions
+
+    def _suggest_num_partitions_from_sample(self, data, num_rows=None):
+        """
+        suggest a partition count for serialized pairs from the first `sample_rows` of them, the sampled pairs are
+        chained back in front of the remaining ones.
+
+        the row size of the sample is extrapolated to `num_rows` if the total is known, otherwise data longer than
+        the sample is spread over task cores
+        """
+        data = iter(data)
+        sample = list(itertools.islice(data, cfg.computing.adaptive_partition.sample_rows))
+        sample_bytes = sum(len(k) + len(v) for k, v in sample)
+        if len(sample) < cfg.computing.adaptive_partition.sample_rows:
+            num_rows, num_bytes = len(sample), sample_bytes
+        elif num_rows is not None and sample:
+            num_bytes = math.ceil(sample_bytes / len(sample) * num_rows)
+        else:
+            num_bytes = None
+        return self.suggest_num_partitions(num_rows=num_rows, num_bytes=num_bytes), itertools.chain(sample, data)
+
+    def adaptive_repartition(self, table: "KVTable") -> "KVTable":
+        """
+        repartition table to the partition count suggested for its observed size,
+        partitions are merged without shuffle if the count goes down
+        """
+        num_rows, num_bytes = table.size_stats()
+        num_partitions = self.suggest_num_partitions(num_rows=num_rows, num_bytes=num_bytes)
+        if num_partitions < table.num_partitions:
+            return table.coalesce(num_partitions)
+        return table.repartition(num_partitions)
+
+    def broadcast(self, obj) -> Broadcast:
+        """
+        share a large read-only object with tasks, see `Broadcast`
+        """
+        return self._broadcast(obj)
+
+    def _broadcast(self, obj) -> Broadcast:
+        return LocalBroadcast(obj)
+
 
 class KVTable(Generic[K, V]):
+    # whether narrow transformations could be recorded and fused when lazy execution is enabled,
+    # backends which already pipeline narrow transformations should turn it off
+    _support_lazy_execution = True
+
     def __init__(self, key_serdes_type, value_serdes_type, partitioner_type, num_partitions):
         self.key_serdes_type = key_serdes_type
         self.value_serdes_type = value_serdes_type
@@ -227,6 +317,14 @@ class KVTable(Generic[K, V]):
     def _destroy(self):
         raise NotImplementedError(f"{self.__class__.__name__}.destroy")
 
+    def _cache(self, level: Optional[str]):
+        # backends without an in-memory tier just read from their storage every time
+        pass
+
+    def _coalesce(self, num_partitions: int):
+        # backends without a narrow merge of partitions fall back to shuffle
+        return self.repartition(num_partitions)
+
     @property
     def key_serdes(self):
         if self._key_serdes is None:
@@ -254,6 +352,9 @@ class KVTable(Generic[K, V]):
     def destroy(self):
         self._destroy()
 
+    def _materialize(self) -> "KVTable":
+        return self
+
     @auto_trace
     @_compute_info
     def map_reduce_partitions_with_index(
@@ -265,6 +366,7 @@ class KVTable(Generic[K, V]):
         output_value_serdes_type=None,
         output_partitioner_type=None,
         output_num_partitions=None,
+        map_side_combine=True,
     ):
         return self._map_reduce_partitions_with_index(
             map_partition_op=map_partition_op,
@@ -274,6 +376,7 @@ class KVTable(Generic[K, V]):
             output_value_serdes_type=output_value_serdes_type,
             output_partitioner_type=output_partitioner_type,
             output_num_partitions=output_num_partitions,
+            map_side_combine=map_side_combine,
         )
 
     def _map_reduce_partitions_with_index(
@@ -285,7 +388,12 @@ class KVTable(Generic[K, V]):
         output_value_serdes_type=None,
         output_partitioner_type=None,
         output_num_partitions=None,
+        map_side_combine=True,
     ):
+        """
+        if `map_side_combine` is True, values of the same key emitted by one partition are reduced
+        before shuffle with `reduce_partition_op`, which should be associative then.
+        """
         if not shuffle and reduce_partition_op is not None:
             raise ValueError("when shuffle is False, it is not allowed to specify reduce_partition_op")
         if output_key_serdes_type is None:
@@ -302,10 +410,37 @@ class KVTable(Generic[K, V]):
         output_key_serdes = get_serdes_by_type(output_key_serdes_type)
         output_value_serdes = get_serdes_by_type(output_value_serdes_type)
         output_partitioner = get_partitioner_by_type(output_partitioner_type)
-        return self._impl_map_reduce_partitions_with_index(
-            map_partition_op=_lifted_mpwi_map_to_serdes(
+        if (
+            not shuffle
+            and self._support_lazy_execution
+            and cfg.computing.lazy_execution.enable
+            and output_partitioner_type == self.partitioner_type
+            and output_num_partitions == self.num_partitions
+        ):
+            # narrow transformation, record it and defer execution until an action is performed
+            return _LazyKVTable(
+                source=self,
+                map_partition_op=_lifted_mpwi_map_to_serdes(
+                    map_partition_op, self.key_serdes, self.value_serdes, output_key_serdes, output_value_serdes
+                ),
+                key_serdes_type=output_key_serdes_type,
+                value_serdes_type=output_value_serdes_type,
+            )
+        if reduce_partition_op is not None and map_side_combine:
+            lifted_map_partition_op = _lifted_mpwi_map_combine_to_serdes(
+                map_partition_op,
+                reduce_partition_op,
+                self.key_serdes,
+                self.value_serdes,
+                output_key_serdes,
+                output_value_serdes,
+            )
+        else:
+            lifted_map_partition_op = _lifted_mpwi_map_to_serdes(
                 map_partition_op, self.key_serdes, self.value_serdes, output_key_serdes, output_value_serdes
-            ),
+            )
+        return self._impl_map_reduce_partitions_with_index(
+            map_partition_op=lifted_map_partition_op,
             reduce_partition_op=_lifted_mpwi_reduce_to_serdes(reduce_partition_op, output_value_serdes),
             shuffle=shuffle,
             input_key_serdes=input_key_serdes,
@@ -386,6 +521,7 @@ class KVTable(Generic[K, V]):
         output_key_serdes_type=None,
         output_value_serdes_type=None,
         output_partitioner_type=None,
+        map_side_combine=True,
     ):
         return self._map_reduce_partitions_with_index(
             map_partition_op=_lifted_map_reduce_partitions_to_mpwi(map_partition_op),
@@ -394,6 +530,7 @@ class KVTable(Generic[K, V]):
             output_key_serdes_type=output_key_serdes_type,
             output_value_serdes_type=output_value_serdes_type,
             output_partitioner_type=output_partitioner_type,
+            map_side_combine=map_side_combine,
         )
 
     @auto_trace
@@ -485,6 +622,22 @@ class KVTable(Generic[K, V]):
             output_value_serdes_type=self.value_serdes_type,
         )
 
+    @auto_trace
+    @_compute_info
+    def cache(self, level: Optional[str] = "memory") -> "KVTable":
+        """
+        hint the backend to keep partitions of this table in memory once they are computed or read,
+        so that repeated passes over the table skip storage reads and deserialization.
+
+        Args:
+            level: `memory` keeps deserialized values, mappers should not modify them in place;
+                `memory_serialized` keeps serialized values only; `None` disables caching
+        """
+        if level not in (None, "memory", "memory_serialized"):
+            raise ValueError(f"cache level `{level}` not supported")
+        self._cache(level)
+        return self
+
     @auto_trace
     @_compute_info
     def collect(self):
@@ -564,6 +717,7 @@ class KVTable(Generic[K, V]):
         #   self.num_partitions == other.num_partitions
         #   self.partitioner_type == other.partitioner_type
         first, second = self.repartition_with(other)
+        first, second = first._materialize(), second._materialize()
 
         # apply binary_sorted_map_partitions_with_index_op
         return first._binary_sorted_map_partitions_with_index(
@@ -638,6 +792,46 @@ class KVTable(Generic[K, V]):
             output_num_partitions=num_partitions,
         )
 
+    @auto_trace
+    @_compute_info
+    def coalesce(self, num_partitions: int) -> "KVTable":
+        """
+        reduce the number of partitions by merging existing partitions instead of a full shuffle.
+
+        partition `p` is merged into `p % num_partitions`, which keeps keys where modulo based partitioners
+        expect them only if `num_partitions` divides the current number of partitions, so the smallest such
+        count not less than `num_partitions` is used. tables with other partitioners are repartitioned.
+        """
+        if num_partitions >= self.num_partitions:
+            return self
+        if self.partitioner_type not in _MODULO_PARTITIONER_TYPES:
+            return self.repartition(num_partitions)
+        num_partitions = min(
+            n for n in range(max(num_partitions, 1), self.num_partitions + 1) if self.num_partitions % n == 0
+        )
+        if num_partitions == self.num_partitions:
+            return self
+        return self._materialize()._coalesce(num_partitions)
+
+    @auto_trace
+    @_compute_info
+    def size_stats(self) -> Tuple[int, int]:
+        """
+        number of rows and serialized bytes of keys and values in this table
+        """
+        partial_stats = self.mapPartitionsWithIndexNoSerdes(
+            _lifted_partition_size_to_mpwi(),
+            output_key_serdes_type=self.key_serdes_type,
+            output_value_serdes_type=self.value_serdes_type,
+            output_partitioner_type=self.partitioner_type,
+        )
+        num_rows, num_bytes = 0, 0
+        for _, v in partial_stats._collect():
+            num_rows += int.from_bytes(v[:8], "big")
+            num_bytes += int.from_bytes(v[8:], "big")
+        self._count_cache = num_rows
+        return num_rows, num_bytes
+
     @auto_trace
     @_compute_info
     def repartition_with(self, other: "KVTable") -> Tuple["KVTable", "KVTable"]:
@@ -692,6 +886,192 @@ class KVTable(Generic[K, V]):
                 return sampled_table._drop_num(sampled_count - num, self.partitioner)
 
 
+class _LazyKVTable(KVTable):
+    """
+    a table whose partitions are defined as narrow transformations of a source table.
+
+    consecutive narrow transformations are composed into one per-partition pipeline operating on serialized
+    key/value pairs, the pipeline is fused into the map side of the next shuffle, or executed by an action.
+    """
+
+    def __init__(self, source: KVTable, map_partition_op, key_serdes_type, value_serdes_type):
+        super().__init__(
+            key_serdes_type=key_serdes_type,
+            value_serdes_type=value_serdes_type,
+            partitioner_type=source.partitioner_type,
+            num_partitions=source.num_partitions,
+        )
+        self._source = source
+        self._map_partition_op = map_partition_op
+        self._materialized = None
+
+    def __getattr__(self, item):
+        # backend specific attributes, such as `table` or `engine`, are resolved on the materialized table
+        if item.startswith("_"):
+            raise AttributeError(item)
+        return getattr(self._materialize(), item)
+
+    def _map_source_partitions(self, map_partition_op, reduce_partition_op=None, shuffle=False, **output):
+        output.setdefault("output_key_serdes_type", self.key_serdes_type)
+        output.setdefault("output_value_serdes_type", self.value_serdes_type)
+        output.setdefault("output_partitioner_type", self.partitioner_type)
+        output.setdefault("output_num_partitions", self.num_partitions)
+        output.setdefault("output_key_serdes", get_serdes_by_type(output["output_key_serdes_type"]))
+        output.setdefault("output_value_serdes", get_serdes_by_type(output["output_value_serdes_type"]))
+        output.setdefault("output_partitioner", get_partitioner_by_type(output["output_partitioner_type"]))
+        source = self._source
+        return source._impl_map_reduce_partitions_with_index(
+            map_partition_op=_compose_mpwi(self._map_partition_op, map_partition_op),
+            reduce_partition_op=reduce_partition_op,
+            shuffle=shuffle,
+            input_key_serdes=source.key_serdes,
+            input_key_serdes_type=source.key_serdes_type,
+            input_value_serdes=source.value_serdes,
+            input_value_serdes_type=source.value_serdes_type,
+            input_partitioner=source.partitioner,
+            input_partitioner_type=source.partitioner_type,
+            **output,
+        )
+
+    def _materialize(self) -> KVTable:
+        if self._materialized is None:
+            self._materialized = self._map_source_partitions(None)
+            self._materialized.schema = self.schema
+        return self._materialized
+
+    def _impl_map_reduce_partitions_with_index(
+        self,
+        map_partition_op,
+        reduce_partition_op,
+        shuffle,
+        input_key_serdes,
+        input_key_serdes_type,
+        input_value_serdes,
+        input_value_serdes_type,
+        input_partitioner,
+        input_partitioner_type,
+        output_key_serdes,
+        output_key_serdes_type,
+        output_value_serdes,
+        output_value_serdes_type,
+        output_partitioner,
+        output_partitioner_type,
+        output_num_partitions,
+    ):
+        if self._materialized is not None:
+            return self._materialized._impl_map_reduce_partitions_with_index(
+                map_partition_op=map_partition_op,
+                reduce_partition_op=reduce_partition_op,
+                shuffle=shuffle,
+                input_key_serdes=input_key_serdes,
+                input_key_serdes_type=input_key_serdes_type,
+                input_value_serdes=input_value_serdes,
+                input_value_serdes_type=input_value_serdes_type,
+                input_partitioner=input_partitioner,
+                input_partitioner_type=input_partitioner_type,
+                output_key_serdes=output_key_serdes,
+                output_key_serdes_type=output_key_serdes_type,
+                output_value_serdes=output_value_serdes,
+                output_value_serdes_type=output_value_serdes_type,
+                output_partitioner=output_partitioner,
+                output_partitioner_type=output_partitioner_type,
+                output_num_partitions=output_num_partitions,
+            )
+        return self._map_source_partitions(
+            map_partition_op,
+            reduce_partition_op,
+            shuffle,
+            output_key_serdes=output_key_serdes,
+            output_key_serdes_type=output_key_serdes_type,
+            output_value_serdes=output_value_serdes,
+            output_value_serdes_type=output_value_serdes_type,
+            output_partitioner=output_partitioner,
+            output_partitioner_type=output_partitioner_type,
+            output_num_partitions=output_num_partitions,
+        )
+
+    def _binary_sorted_map_partitions_with_index(self, other, **kwargs):
+        return self._materialize()._binary_sorted_map_partitions_with_index(other._materialize(), **kwargs)
+
+    def _reduce(self, func):
+        if self._materialized is not None:
+            return self._materialized._reduce(func)
+        # reduce each partition inside the fused pipeline, only partial results are written
+        return self._map_source_partitions(_lifted_partition_reduce_to_mpwi(func))._reduce(func)
+
+    def _count(self):
+        if self._materialized is not None:
+            return self._materialized._count()
+        partial_counts = self._map_source_partitions(_lifted_partition_count_to_mpwi())
+        return sum(int.from_bytes(v, "big") for _, v in partial_counts._collect())
+
+    def _collect(self, **kwargs):
+        return self._materialize()._collect(**kwargs)
+
+    def _take(self, n=1, **kwargs):
+        return self._materialize()._take(n=n, **kwargs)
+
+    def _save(self, uri: URI, schema, options: dict):
+        return self._materialize()._save(uri, schema, options)
+
+    def _drop_num(self, num: int, partitioner):
+        return self._materialize()._drop_num(num, partitioner)
+
+    def _destroy(self):
+        if self._materialized is not None:
+            self._materialized.destroy()
+
+    def _cache(self, level):
+        self._materialize()._cache(level)
+
+
+def _compose_mpwi(first, second):
+    if second is None:
+        return first
+
+    def _composed(_index, _iter):
+        return second(_index, first(_index, _iter))
+
+    return _composed
+
+
+def _lifted_partition_reduce_to_mpwi(reduce_op):
+    def _lifted(_index, _iter):
+        key, value = None, None
+        for key, v in _iter:
+            value = v if value is None else reduce_op(value, v)
+        if key is None:
+            return []
+        return [(key, value)]
+
+    return _lifted
+
+
+def _lifted_partition_count_to_mpwi():
+    def _lifted(_index, _iter):
+        key, count = None, 0
+        for key, _ in _iter:
+            count += 1
+        if key is None:
+            return []
+        return [(key, count.to_bytes(8, "big"))]
+
+    return _lifted
+
+
+def _lifted_partition_size_to_mpwi():
+    def _lifted(_index, _iter):
+        key, count, size = None, 0, 0
+        for key, value in _iter:
+            count += 1
+            size += len(key) + len(value)
+        if key is None:
+            return []
+        return [(key, count.to_bytes(8, "big") + size.to_bytes(8, "big"))]
+
+    return _lifted
+
+
 def _lifted_map_to_io_serdes(_f, input_key_serdes, input_value_serdes, output_key_serdes, output_value_serdes):
     def _lifted(_index, _iter):
         for out_k, out_v in _f(_index, _serdes_wrapped_generator(_iter, input_key_serdes, input_value_serdes)):
@@ -700,12 +1080,37 @@ def _lifted_map_to_io_serdes(_f, input_key_serdes, input_value_serdes, output_ke
     return _lifted
 
 
+def _batch_serialized_enumerate(data, serialize_batch, value_serdes):
+    # row indexes are encoded a batch at a time, so the input is never held as a whole
+    data = iter(data)
+    offset = 0
+    while batch := list(itertools.islice(data, _KEY_SERIALIZE_BATCH_SIZE)):
+        yield from zip(serialize_batch(range(offset, offset + len(batch))), (value_serdes.serialize(v) for v in batch))
+        offset += len(batch)
+
+
 def _serdes_wrapped_generator(_iter, key_serdes, value_serdes):
+    # partitions cached in memory by backend may provide the deserialized records directly
+    if (deserialized := getattr(_iter, "deserialized", None)) is not None:
+        if (records := deserialized(key_serdes, value_serdes)) is not None:
+            yield from records
+            return
+    if (deserialize_batch := getattr(key_serdes, "deserialize_batch", None)) is not None:
+        # keys of fixed width serdes are decoded a batch at a time
+        _iter = iter(_iter)
+        while batch := list(itertools.islice(_iter, _KEY_DESERIALIZE_BATCH_SIZE)):
+            for k, (_, v) in zip(deserialize_batch([k for k, _ in batch]), batch):
+                yield k, value_serdes.deserialize(v)
+        return
     for k, v in _iter:
         yield key_serdes.deserialize(k), value_serdes.deserialize(v)
 
 
 def _value_serdes_wrapped_generator(_iter, value_serdes):
+    if (deserialized := getattr(_iter, "deserialized", None)) is not None:
+        if (records := deserialized(None, value_serdes)) is not None:
+            yield from records
+            return
     for k, v in _iter:
         yield k, value_serdes.deserialize(v)
 
@@ -718,6 +1123,39 @@ def _lifted_mpwi_map_to_serdes(_f, input_key_serdes, input_value_serdes, output_
     return _lifted
 
 
+# bound the number of distinct keys held by the map side combiner, partial results are flushed beyond it
+_MAP_SIDE_COMBINE_MAX_KEYS = 10000
+
+
+def _lifted_mpwi_map_combine_to_serdes(
+    _f, reduce_op, input_key_serdes, input_value_serdes, output_key_serdes, output_value_serdes
+):
+    def _lifted(_index, _iter):
+        # first value of a key is kept serialized (as it would be without combining), and only deserialized
+        # when a second value comes, so the reducer never mutates objects still owned by the mapper
+        serialized, combined = {}, {}
+        for out_k, out_v in _f(_index, _serdes_wrapped_generator(_iter, input_key_serdes, input_value_serdes)):
+            out_k_bytes = output_key_serdes.serialize(out_k)
+            if out_k_bytes in combined:
+                combined[out_k_bytes] = reduce_op(combined[out_k_bytes], out_v)
+            elif out_k_bytes in serialized:
+                combined[out_k_bytes] = reduce_op(
+                    output_value_serdes.deserialize(serialized.pop(out_k_bytes)),
+                    out_v,
+                )
+            else:
+                serialized[out_k_bytes] = output_value_serdes.serialize(out_v)
+            if len(serialized) + len(combined) >= _MAP_SIDE_COMBINE_MAX_KEYS:
+                yield from serialized.items()
+                yield from ((k, output_value_serdes.serialize(v)) for k, v in combined.items())
+                serialized.clear()
+                combined.clear()
+        yield from serialized.items()
+        yield from ((k, output_value_serdes.serialize(v)) for k, v in combined.items())
+
+    return _lifted
+
+
 def _lifted_mpwi_reduce_to_serdes(_f, output_value_serdes):
     if _f is None:
         return None
@@ -17,7 +17,7 @@ import logging
 import typing
 from typing import Iterable
 
-from fate.arch.computing.api import KVTableContext
+from fate.arch.computing.api import Broadcast, KVTableContext
 from fate.arch.unify import URI
 from ._table import from_hdfs, from_hive, from_localfs, from_rdd
 
@@ -96,6 +96,19 @@ class CSession(KVTableContext):
         rdd = SparkContext.getOrCreate().parallelize(data, total_partitions)
         return from_rdd(rdd)
 
+    @property
+    def task_cores(self):
+        # noinspection PyPackageRequirements
+        from pyspark import SparkContext
+
+        return SparkContext.getOrCreate().defaultParallelism
+
+    def _broadcast(self, obj):
+        # noinspection PyPackageRequirements
+        from pyspark import SparkContext
+
+        return SparkBroadcast(SparkContext.getOrCreate().broadcast(obj))
+
     @property
     def session_id(self):
         return self._session_id
@@ -111,3 +124,15 @@ class CSession(KVTableContext):
 
     def _destroy(self):
         pass
+
+
+class SparkBroadcast(Broadcast):
+    def __init__(self, broadcast):
+        self._broadcast = broadcast
+
+    @property
+    def value(self):
+        return self._broadcast.value
+
+    def destroy(self):
+        self._broadcast.destroy()
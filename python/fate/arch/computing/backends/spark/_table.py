@@ -58,6 +58,9 @@ class HiveCoder:
 
 
 class Table(KVTable):
+    # rdd transformations are lazy and pipelined by spark already
+    _support_lazy_execution = False
+
     def __init__(self, rdd: pyspark.RDD, key_serdes_type, value_serdes_type, partitioner_type):
         self._rdd = rdd
         self._engine = ComputingEngine.SPARK
@@ -93,20 +96,34 @@ class Table(KVTable):
         merge_op: Callable[[V, V], V] = lambda x, y: x,
         output_value_serdes_type=None,
     ):
-        op = _lifted_reduce_to_serdes(merge_op, get_serdes_by_type(self.value_serdes_type))
+        if output_value_serdes_type is None:
+            output_value_serdes_type = self.value_serdes_type
+        # each side is decoded with its own serdes, tables of different value serdes could be joined
+        left_value_serdes = self.value_serdes
+        right_value_serdes = other.value_serdes
+        output_value_serdes = get_serdes_by_type(output_value_serdes_type)
         return from_rdd(
-            self._rdd.join(other._rdd).mapValues(lambda x: op(x[0], x[1])),
+            self._rdd.join(other._rdd).mapValues(
+                lambda x: output_value_serdes.serialize(
+                    merge_op(left_value_serdes.deserialize(x[0]), right_value_serdes.deserialize(x[1]))
+                )
+            ),
             key_serdes_type=self.key_serdes_type,
-            value_serdes_type=output_value_serdes_type or self.value_serdes_type,
+            value_serdes_type=output_value_serdes_type,
             partitioner_type=self.partitioner_type,
         )
 
     def union(self, other: "Table", merge_op: Callable[[V, V], V] = lambda x, y: x, output_value_serdes_type=None):
-        op = _lifted_reduce_to_serdes(merge_op, get_serdes_by_type(self.value_serdes_type))
+        if output_value_serdes_type is None:
+            output_value_serdes_type = self.value_serdes_type
+        output_value_serdes = get_serdes_by_type(output_value_serdes_type)
+        op = _lifted_reduce_to_serdes(merge_op, output_value_serdes)
         return from_rdd(
-            self._rdd.union(other._rdd).reduceByKey(op),
+            _rdd_with_value_serdes(self._rdd, self.value_serdes_type, output_value_serdes_type)
+            .union(_rdd_with_value_serdes(other._rdd, other.value_serdes_type, output_value_serdes_type))
+            .reduceByKey(op),
             key_serdes_type=self.key_serdes_type,
-            value_serdes_type=output_value_serdes_type or self.value_serdes_type,
+            value_serdes_type=output_value_serdes_type,
             partitioner_type=self.partitioner_type,
         )
 
@@ -170,6 +187,15 @@ class Table(KVTable):
     def _reduce(self, func, **kwargs):
         return self._rdd.values().reduce(func)
 
+    def _coalesce(self, num_partitions: int):
+        # placement by partitioner is restored by `_as_partitioned` when it matters
+        return from_rdd(
+            self._rdd.coalesce(num_partitions),
+            key_serdes_type=self.key_serdes_type,
+            value_serdes_type=self.value_serdes_type,
+            partitioner_type=self.partitioner_type,
+        )
+
     def _drop_num(self, num: int, partitioner):
         raise NotImplementedError("drop num not supported in spark backend")
 
@@ -295,6 +321,14 @@ def from_rdd(rdd, key_serdes_type=0, value_serdes_type=0, partitioner_type=0):
     )
 
 
+def _rdd_with_value_serdes(rdd, value_serdes_type, output_value_serdes_type):
+    if value_serdes_type == output_value_serdes_type:
+        return rdd
+    value_serdes = get_serdes_by_type(value_serdes_type)
+    output_value_serdes = get_serdes_by_type(output_value_serdes_type)
+    return rdd.mapValues(lambda v: output_value_serdes.serialize(value_serdes.deserialize(v)))
+
+
 def _exactly_sample(rdd, num: int, seed: int):
     from scipy.stats import hypergeom
 
@@ -0,0 +1,93 @@
+#
+#  Copyright 2019 The FATE Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import mmap
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+
+import cloudpickle
+
+from fate.arch.computing.api import Broadcast, LocalBroadcast
+
+# values pickled smaller than this are shipped with tasks directly, a file round trip costs more than it saves
+_INLINE_SIZE = 64 * 1024
+
+
+class FileBroadcast(Broadcast):
+    """
+    broadcast value pickled once into a file under the session's data dir.
+
+    when pickled into tasks, only the file path is carried, workers load the value with mmap on first access
+    and keep it in a per process lru cache.
+    """
+
+    capacity = 16
+    _loaded = OrderedDict()
+
+    def __init__(self, value, path: Path):
+        self._value = value
+        self._path = path
+        self._owner = True
+
+    def __getstate__(self):
+        return {"_path": self._path}
+
+    def __setstate__(self, state):
+        self._value = None
+        self._path = state["_path"]
+        self._owner = False
+
+    @property
+    def value(self):
+        if self._owner:
+            return self._value
+        key = self._path.as_posix()
+        if key in self._loaded:
+            self._loaded.move_to_end(key)
+            return self._loaded[key]
+        with open(self._path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                value = pickle.loads(m)
+        self._loaded[key] = value
+        while len(self._loaded) > self.capacity:
+            self._loaded.popitem(last=False)
+        return value
+
+    def destroy(self):
+        if self._owner:
+            self._path.unlink(missing_ok=True)
+
+    def __del__(self):
+        try:
+            self.destroy()
+        except:
+            pass
+
+
+def create_broadcast(obj, broadcast_dir: Path, broadcast_id: str) -> Broadcast:
+    obj_bytes = cloudpickle.dumps(obj)
+    if len(obj_bytes) < _INLINE_SIZE:
+        return LocalBroadcast(obj)
+    broadcast_dir.mkdir(parents=True, exist_ok=True)
+    path = broadcast_dir.joinpath(broadcast_id)
+    # write to a temporary file first, so that readers never see a partially written payload
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(obj_bytes)
+    os.replace(tmp_path, path)
+    return FileBroadcast(obj, path)
@@ -14,11 +14,13 @@
 #  limitations under the License.
 
 import logging
+from pathlib import Path
 from typing import Optional
 
 from fate.arch.computing.api import KVTableContext, generate_computing_uuid
 from fate.arch.unify import URI, uuid
-from ._standalone import Session
+from ._broadcast import create_broadcast
+from ._standalone import Session, BasicProcessPool, PartitionAffineProcessPool
 from ._table import Table
 
 logger = logging.getLogger(__name__)
@@ -39,7 +41,23 @@ class CSession(KVTableContext):
         if options is None:
             options = {}
         max_workers = options.get("task_cores", None)
-        self._session = Session(session_id, data_dir=data_dir, max_workers=max_workers, logger_config=logger_config)
+        executor_pool = options.get("executor_pool", "partition_affine")
+        if executor_pool == "partition_affine":
+            executor_pool_cls = PartitionAffineProcessPool
+        elif executor_pool == "basic":
+            executor_pool_cls = BasicProcessPool
+        else:
+            raise ValueError(f"executor_pool `{executor_pool}` not supported, should be `partition_affine` or `basic`")
+        self._session = Session(
+            session_id,
+            data_dir=data_dir,
+            max_workers=max_workers,
+            logger_config=logger_config,
+            executor_pool_cls=executor_pool_cls,
+            shuffle_spill_size=options.get("shuffle_spill_size", None),
+            tree_reduce_fan_in=options.get("tree_reduce_fan_in", None),
+            cache_memory_budget=options.get("cache_memory_budget", None),
+        )
 
     def get_standalone_session(self):
         return self._session
@@ -61,12 +79,9 @@ class CSession(KVTableContext):
         except Exception as e:
             raise ValueError(f"uri `{uri}` not valid, demo format: standalone://database_path/namespace/name") from e
 
-        raw_table = self._session.load(name=name, namespace=namespace)
-        raw_table = raw_table.copy_as(
-            name=f"{name}_{uuid()}",
-            namespace=namespace,
-            need_cleanup=True,
-        )
+        # loaded table is referenced in place, all transformations write to new tables anyway,
+        # and the in-place modifications (see `Table._drop_num`) copy it first
+        raw_table = self._session.load(name=name, namespace=namespace, read_only=True)
         table = Table(raw_table)
         table.schema = schema
         return table
@@ -92,6 +107,17 @@ class CSession(KVTableContext):
         )
         return Table(table)
 
+    @property
+    def task_cores(self):
+        return self._session.max_workers
+
+    def _broadcast(self, obj):
+        return create_broadcast(
+            obj,
+            broadcast_dir=Path(self._session.data_dir).joinpath(self.session_id, "__broadcast__"),
+            broadcast_id=uuid(),
+        )
+
     def _info(self, level=0):
         if level == 0:
             return f"Standalone<session_id={self.session_id}, max_workers={self._session.max_workers}, data_dir={self._session.data_dir}>"
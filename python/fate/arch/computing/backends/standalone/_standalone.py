@@ -14,6 +14,7 @@
 #  limitations under the License.
 #
 
+import copy
 import hashlib
 import itertools
 import logging
@@ -21,14 +22,17 @@ import logging.config
 import os
 import shutil
 import signal
+import socket
+import struct
 import threading
 import time
 import uuid
+from collections import OrderedDict
 from concurrent.futures import ProcessPoolExecutor as Executor
-from contextlib import ExitStack
-from functools import partial
-from heapq import heapify, heappop, heapreplace
-from operator import is_not
+from contextlib import ExitStack, nullcontext
+from functools import partial, reduce
+from heapq import heapify, heappop, heapreplace, merge
+from operator import is_not, itemgetter
 from pathlib import Path
 from typing import Callable, Any, Iterable, Optional
 from typing import List, Tuple, Literal
@@ -77,6 +81,13 @@ class BasicProcessPool:
         self._exception_tb = {}
         self.log_level = log_level
 
+    @classmethod
+    def create(cls, max_workers, initializer, initargs, log_level):
+        return cls(
+            pool=Executor(max_workers=max_workers, initializer=initializer, initargs=initargs),
+            log_level=log_level,
+        )
+
     def submit(self, func, process_infos):
         features = []
         outputs = {}
@@ -118,11 +129,103 @@ class BasicProcessPool:
         except Exception as e:
             logger.error(f"exception in rank {process_info.partition_id}: {e}")
             return process_info.partition_id, None, e
+        finally:
+            _WorkerEnvCache.trim()
 
     def shutdown(self):
         self._pool.shutdown()
 
 
+class PartitionAffineProcessPool:
+    """
+    a pool of long-lived single process workers, partition `p` is always dispatched to worker `p % num_workers`.
+
+    since the same worker sees the same partitions job after job, it can keep lmdb environments open
+    and deserialized functors cached. functors are identified by the digest of their pickled bytes, and the
+    pickled bytes are only shipped to a worker which is not known to have the functor cached yet.
+    """
+
+    def __init__(self, workers, log_level):
+        self._workers = workers
+        self._worker_functor_ids = [OrderedDict() for _ in workers]
+        # jobs are submitted from the main thread, the federation push thread and retries of cache misses
+        self._worker_functor_ids_lock = threading.Lock()
+        self.log_level = log_level
+
+    @classmethod
+    def create(cls, max_workers, initializer, initargs, log_level):
+        if max_workers is None:
+            max_workers = os.cpu_count()
+        return cls(
+            workers=[Executor(max_workers=1, initializer=initializer, initargs=initargs) for _ in range(max_workers)],
+            log_level=log_level,
+        )
+
+    def _dispatch(self, func, process_info, force_payload=False):
+        worker_index = process_info.partition_id % len(self._workers)
+        functor_ids = process_info.operator_info.functor_ids()
+        # the mirror is updated in the order jobs are queued to the worker
+        with self._worker_functor_ids_lock:
+            known_functor_ids = self._worker_functor_ids[worker_index]
+            if not force_payload and all(functor_id in known_functor_ids for functor_id in functor_ids):
+                process_info = copy.copy(process_info)
+                process_info.operator_info = process_info.operator_info.without_payload()
+
+            # mirror the worker side lru so that we only skip the payload if the worker is likely to hold it
+            for functor_id in functor_ids:
+                known_functor_ids[functor_id] = None
+                known_functor_ids.move_to_end(functor_id)
+            while len(known_functor_ids) > _WorkerFunctorCache.capacity:
+                known_functor_ids.popitem(last=False)
+
+            return self._workers[worker_index].submit(
+                PartitionAffineProcessPool._process_wrapper,
+                func,
+                process_info,
+                self.log_level,
+            )
+
+    def submit(self, func, process_infos):
+        outputs = {}
+        num_partitions = len(process_infos)
+        features = {self._dispatch(func, process_info): process_info for process_info in process_infos}
+
+        from concurrent.futures import wait, FIRST_COMPLETED
+
+        not_done = set(features)
+        while not_done:
+            done, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+            for f in done:
+                partition_id, output, e = f.result()
+                if isinstance(e, _FunctorCacheMiss):
+                    logger.debug(f"partition {partition_id} functor cache missed, resubmit with payload")
+                    process_info = features[f]
+                    retry = self._dispatch(func, process_info, force_payload=True)
+                    features[retry] = process_info
+                    not_done.add(retry)
+                elif e is not None:
+                    logger.error(f"partition {partition_id} exec failed: {e}")
+                    raise RuntimeError(f"Partition {partition_id} exec failed: {e}")
+                else:
+                    outputs[partition_id] = output
+
+        outputs = [outputs[p] for p in range(num_partitions)]
+        return outputs
+
+    @classmethod
+    def _process_wrapper(cls, do_func, process_info, log_level):
+        try:
+            # resolve functors before any side effect so that a cache miss can be retried safely
+            process_info.operator_info.preload()
+        except _FunctorCacheMiss as e:
+            return process_info.partition_id, None, e
+        return BasicProcessPool._process_wrapper(do_func, process_info, log_level)
+
+    def shutdown(self):
+        for worker in self._workers:
+            worker.shutdown()
+
+
 # noinspection PyPep8Naming
 class Table(object):
     def __init__(
@@ -136,8 +239,16 @@ class Table(object):
         value_serdes_type: int,
         partitioner_type: int,
         need_cleanup=True,
+        read_only=False,
+        shared=False,
     ):
         self._need_cleanup = need_cleanup
+        self._read_only = read_only
+        self._shared = shared
+        # flags of the sender's handle before `share`, restored once the other references are released
+        self._unshared_flags = None
+        self._destroyed = False
+        self._cache_level = None
         self._data_dir = data_dir
         self._namespace = namespace
         self._name = name
@@ -175,6 +286,57 @@ class Table(object):
     def namespace(self):
         return self._namespace
 
+    @property
+    def read_only(self):
+        return self._read_only and not self._try_unshare()
+
+    @property
+    def cache_level(self):
+        return self._cache_level
+
+    def cache(self, level: Optional[str]):
+        """
+        keep partitions of this table in memory of workers once they are read by a job.
+
+        Args:
+            level: `memory` keeps deserialized values, which should be treated as immutable by mappers,
+                `memory_serialized` keeps raw bytes only, and `None` reads from lmdb every time
+        """
+        if level not in _CACHE_LEVELS:
+            raise ValueError(f"cache level `{level}` not supported, should be one of {_CACHE_LEVELS}")
+        self._cache_level = level
+
+    def share(self, num_refs: int):
+        """
+        freeze this table and hand out `num_refs` more references to it, which are released by `destroy` of
+        the tables loaded with `shared=True`. storage is reclaimed by the last holder if this table owns it.
+        """
+        if not self._shared:
+            # this handle holds one reference too, and releases it when collected
+            owned = self._need_cleanup and not self._read_only
+            _SharedTableRefManager.acquire(self._data_dir, self._namespace, self._name, num_refs + 1, owned)
+            self._unshared_flags = (self._read_only, self._need_cleanup)
+            self._shared = True
+            self._read_only = True
+            self._need_cleanup = True
+        else:
+            _SharedTableRefManager.acquire(self._data_dir, self._namespace, self._name, num_refs, False)
+
+    def _check_writable(self):
+        if self.read_only:
+            raise PermissionError(f"table {self} is a read only reference, copy it before modification")
+
+    def _try_unshare(self):
+        # the sender's handle becomes writable again once it holds the only reference left
+        if not self._shared or self._unshared_flags is None:
+            return False
+        if not _SharedTableRefManager.release_if_last(self._data_dir, self._namespace, self._name):
+            return False
+        self._shared = False
+        self._read_only, self._need_cleanup = self._unshared_flags
+        self._unshared_flags = None
+        return True
+
     def __del__(self):
         if self._need_cleanup:
             try:
@@ -189,6 +351,17 @@ class Table(object):
         return self.__str__()
 
     def destroy(self):
+        if self._destroyed:
+            return
+        if self._shared:
+            self._shared = False
+            self._destroyed = True
+            remaining, owned = _SharedTableRefManager.release(self._data_dir, self._namespace, self._name)
+            if remaining > 0 or not owned:
+                return
+        else:
+            self._check_writable()
+            self._destroyed = True
         for p in range(self.num_partitions):
             with self._get_env_for_partition(p, write=True) as env:
                 db = env.open_db()
@@ -240,6 +413,7 @@ class Table(object):
             num_partitions=self.num_partitions,
             name=self._name,
             namespace=self._namespace,
+            cache_level=self._cache_level,
         )
 
     def binary_sorted_map_partitions_with_index(
@@ -268,9 +442,11 @@ class Table(object):
             first_input_data_dir=self._data_dir,
             first_input_name=self._name,
             first_input_namespace=self._namespace,
+            first_input_cache_level=self._cache_level,
             second_input_data_dir=other._data_dir,
             second_input_name=other._name,
             second_input_namespace=other._namespace,
+            second_input_cache_level=other._cache_level,
             output_data_dir=output_data_dir,
             output_name=output_name,
             output_namespace=output_namespace,
@@ -319,6 +495,7 @@ class Table(object):
                 input_data_dir=self._data_dir,
                 input_name=self._name,
                 input_namespace=self._namespace,
+                input_cache_level=self._cache_level,
                 output_num_partitions=output_num_partitions,
                 output_data_dir=output_data_dir,
                 output_name=output_name,
@@ -347,6 +524,7 @@ class Table(object):
                 input_num_partitions=self.num_partitions,
                 input_name=self._name,
                 input_namespace=self._namespace,
+                input_cache_level=self._cache_level,
                 output_data_dir=output_data_dir,
                 output_num_partitions=output_num_partitions,
                 output_name=output_name,
@@ -365,7 +543,7 @@ class Table(object):
                 partitioner_type=output_partitioner_type,
             )
 
-        # Step 1: do map and write intermediate results to cache table
+        # Step 1: do map and write intermediate results to sorted shuffle run files
         # noinspection PyProtectedMember
         intermediate_name = str(uuid.uuid1())
         intermediate_namespace = self._namespace
@@ -378,6 +556,7 @@ class Table(object):
             input_num_partitions=self.num_partitions,
             input_name=self._name,
             input_namespace=self._namespace,
+            input_cache_level=self._cache_level,
             output_data_dir=intermediate_data_dir,
             output_num_partitions=output_num_partitions,
             output_name=intermediate_name,
@@ -411,19 +590,42 @@ class Table(object):
             partitioner_type=output_partitioner_type,
         )
 
-        # drop cache table
-        for p in range(self._partitions):
-            with _get_env_with_data_dir(
-                intermediate_data_dir, intermediate_namespace, intermediate_name, str(p), write=True
-            ) as env:
-                db = env.open_db()
-                with env.begin(write=True) as txn:
-                    txn.drop(db)
-
-        path = Path(self._data_dir).joinpath(intermediate_namespace, intermediate_name)
+        # drop shuffle run files
+        path = Path(intermediate_data_dir).joinpath(intermediate_namespace, intermediate_name)
         shutil.rmtree(path, ignore_errors=True)
         return output
 
+    def coalesce(self, num_partitions, need_cleanup=True):
+        # partition p is merged into p % num_partitions, which is where modulo partitioners put its keys
+        assert self.num_partitions % num_partitions == 0
+        output_name = str(uuid.uuid1())
+        # noinspection PyProtectedMember
+        self._session._submit_map_reduce_partitions_with_index(
+            _do_coalesce,
+            mapper=None,
+            reducer=None,
+            input_data_dir=self._data_dir,
+            input_num_partitions=self.num_partitions,
+            input_name=self._name,
+            input_namespace=self._namespace,
+            input_cache_level=self._cache_level,
+            output_data_dir=self._data_dir,
+            output_num_partitions=num_partitions,
+            output_name=output_name,
+            output_namespace=self._namespace,
+        )
+        return _create_table(
+            session=self._session,
+            data_dir=self._data_dir,
+            name=output_name,
+            namespace=self._namespace,
+            partitions=num_partitions,
+            need_cleanup=need_cleanup,
+            key_serdes_type=self._key_serdes_type,
+            value_serdes_type=self._value_serdes_type,
+            partitioner_type=self._partitioner_type,
+        )
+
     def copy_as(self, name, namespace, need_cleanup=True):
         return self.map_reduce_partitions_with_index(
             map_partition_op=lambda i, x: x,
@@ -443,22 +645,28 @@ class Table(object):
         return _get_env_with_data_dir(self._data_dir, self._namespace, self._name, str(p), write=write)
 
     def put(self, k_bytes: bytes, v_bytes: bytes, partitioner: Callable[[bytes, int], int] = None):
+        self._check_writable()
         p = partitioner(k_bytes, self._partitions)
         with self._get_env_for_partition(p, write=True) as env:
             with env.begin(write=True) as txn:
                 return txn.put(k_bytes, v_bytes)
 
     def put_all(self, kv_list: Iterable[Tuple[bytes, bytes]], partitioner: Callable[[bytes, int], int]):
+        self._check_writable()
         txn_map = {}
         with ExitStack() as s:
             for p in range(self._partitions):
                 env = s.enter_context(self._get_env_for_partition(p, write=True))
                 txn_map[p] = env, env.begin(write=True)
             try:
-                for k_bytes, v_bytes in kv_list:
-                    p = partitioner(k_bytes, self._partitions)
-                    if not txn_map[p][1].put(k_bytes, v_bytes):
-                        break
+                for batch in _batched(kv_list, _PARTITION_BATCH_SIZE):
+                    partition_ids = _get_partition_ids(partitioner, [k for k, _ in batch], self._partitions)
+                    for p, (k_bytes, v_bytes) in zip(partition_ids, batch):
+                        if not txn_map[p][1].put(k_bytes, v_bytes):
+                            break
+                    else:
+                        continue
+                    break
             except Exception as e:
                 for p, (env, txn) in txn_map.items():
                     txn.abort()
@@ -474,6 +682,7 @@ class Table(object):
                 return txn.get(k_bytes)
 
     def delete(self, k_bytes: bytes, partitioner: Callable[[bytes, int], int]):
+        self._check_writable()
         p = partitioner(k_bytes, self._partitions)
         with self._get_env_for_partition(p, write=True) as env:
             with env.begin(write=True) as txn:
@@ -491,10 +700,22 @@ class Session(object):
         data_dir: str,
         max_workers=None,
         logger_config=None,
-        executor_pool_cls=BasicProcessPool,
+        executor_pool_cls=PartitionAffineProcessPool,
+        shuffle_spill_size=None,
+        tree_reduce_fan_in=None,
+        cache_memory_budget=None,
     ):
         self.session_id = session_id
         self._data_dir = data_dir
+        self._shuffle_spill_size = shuffle_spill_size
+        if self._shuffle_spill_size is None:
+            self._shuffle_spill_size = _DEFAULT_SHUFFLE_SPILL_SIZE
+        self._tree_reduce_fan_in = tree_reduce_fan_in
+        if self._tree_reduce_fan_in is None:
+            self._tree_reduce_fan_in = _DEFAULT_TREE_REDUCE_FAN_IN
+        self._cache_memory_budget = cache_memory_budget
+        if self._cache_memory_budget is None:
+            self._cache_memory_budget = _DEFAULT_CACHE_MEMORY_BUDGET
         self._max_workers = max_workers
         if self._max_workers is None:
             self._max_workers = os.cpu_count()
@@ -504,14 +725,12 @@ class Session(object):
             log_level = logging.getLevelName(logger.getEffectiveLevel())
         else:
             log_level = None
-        self._pool = executor_pool_cls(
-            pool=Executor(
-                max_workers=max_workers,
-                initializer=_watch_thread_react_to_parent_die,
-                initargs=(
-                    os.getpid(),
-                    logger_config,
-                ),
+        self._pool = executor_pool_cls.create(
+            max_workers=self._max_workers,
+            initializer=_watch_thread_react_to_parent_die,
+            initargs=(
+                os.getpid(),
+                logger_config,
             ),
             log_level=log_level,
         )
@@ -528,8 +747,8 @@ class Session(object):
         # session won't be pickled
         pass
 
-    def load(self, name, namespace):
-        return _load_table(session=self, data_dir=self._data_dir, name=name, namespace=namespace)
+    def load(self, name, namespace, read_only=False):
+        return _load_table(session=self, data_dir=self._data_dir, name=name, namespace=namespace, read_only=read_only)
 
     def create_table(
         self,
@@ -600,15 +819,28 @@ class Session(object):
         self.cleanup(name="*", namespace=self.session_id)
         self._pool.shutdown()
 
-    def submit_reduce(self, func, data_dir: str, num_partitions: int, name: str, namespace: str):
+    def submit_reduce(
+        self, func, data_dir: str, num_partitions: int, name: str, namespace: str, cache_level: Optional[str] = None
+    ):
+        input_info = self._create_input_info(data_dir, namespace, name, num_partitions, cache_level)
+        operator_info = _ReduceFunctorInfo(func)
         rs = self._pool.submit(
             _do_reduce,
-            [
-                _ReduceProcess(p, _TaskInputInfo(data_dir, namespace, name, num_partitions), _ReduceFunctorInfo(func))
-                for p in range(num_partitions)
-            ],
+            [_ReduceProcess(p, input_info, operator_info) for p in range(num_partitions)],
         )
         rs = [r for r in filter(partial(is_not, None), rs)]
+
+        # merge partial results in workers level by level, each task folds `fan_in` adjacent results,
+        # so that expensive merges run in parallel instead of one by one in driver
+        fan_in = self._tree_reduce_fan_in
+        while fan_in > 1 and len(rs) > fan_in:
+            rs = self._pool.submit(
+                _do_tree_reduce,
+                [
+                    _TreeReduceProcess(i, rs[start : start + fan_in], operator_info)
+                    for i, start in enumerate(range(0, len(rs), fan_in))
+                ],
+            )
         if len(rs) <= 0:
             return None
         rtn = rs[0]
@@ -630,11 +862,21 @@ class Session(object):
         output_name,
         output_namespace,
         output_partitioner=None,
+        input_cache_level=None,
     ):
-        input_info = _TaskInputInfo(input_data_dir, input_namespace, input_name, input_num_partitions)
+        input_info = self._create_input_info(
+            input_data_dir, input_namespace, input_name, input_num_partitions, input_cache_level
+        )
         output_info = _TaskOutputInfo(
-            output_data_dir, output_namespace, output_name, output_num_partitions, partitioner=output_partitioner
+            output_data_dir,
+            output_namespace,
+            output_name,
+            output_num_partitions,
+            partitioner=output_partitioner,
+            spill_size=self._shuffle_spill_size,
         )
+        # the functor is pickled and hashed once per job, all partitions share it
+        operator_info = _MapReduceFunctorInfo(mapper=mapper, reducer=reducer)
         return self._submit_process(
             _do_func,
             [
@@ -642,7 +884,7 @@ class Session(object):
                     partition_id=p,
                     input_info=input_info,
                     output_info=output_info,
-                    operator_info=_MapReduceFunctorInfo(mapper=mapper, reducer=reducer),
+                    operator_info=operator_info,
                 )
                 for p in range(max(input_num_partitions, output_num_partitions))
             ],
@@ -662,14 +904,17 @@ class Session(object):
         output_data_dir: str,
         output_name: str,
         output_namespace: str,
+        first_input_cache_level: Optional[str] = None,
+        second_input_cache_level: Optional[str] = None,
     ):
-        first_input_info = _TaskInputInfo(
-            first_input_data_dir, first_input_namespace, first_input_name, num_partitions
+        first_input_info = self._create_input_info(
+            first_input_data_dir, first_input_namespace, first_input_name, num_partitions, first_input_cache_level
         )
-        second_input_info = _TaskInputInfo(
-            second_input_data_dir, second_input_namespace, second_input_name, num_partitions
+        second_input_info = self._create_input_info(
+            second_input_data_dir, second_input_namespace, second_input_name, num_partitions, second_input_cache_level
         )
         output_info = _TaskOutputInfo(output_data_dir, output_namespace, output_name, num_partitions, partitioner=None)
+        operator_info = _BinarySortedMapFunctorInfo(func)
         return self._submit_process(
             do_func,
             [
@@ -678,12 +923,22 @@ class Session(object):
                     first_input_info=first_input_info,
                     second_input_info=second_input_info,
                     output_info=output_info,
-                    operator_info=_BinarySortedMapFunctorInfo(func),
+                    operator_info=operator_info,
                 )
                 for p in range(num_partitions)
             ],
         )
 
+    def _create_input_info(self, data_dir, namespace, name, num_partitions, cache_level=None):
+        return _TaskInputInfo(
+            data_dir,
+            namespace,
+            name,
+            num_partitions,
+            cache_level=cache_level,
+            cache_memory_budget=self._cache_memory_budget,
+        )
+
     def _submit_process(self, do_func, process_infos):
         return self._pool.submit(do_func, process_infos)
 
@@ -710,14 +965,15 @@ class Federation(object):
         return federation
 
     def destroy(self):
+        self._meta.close()
         self._session.cleanup(namespace=self._session_id, name="*")
 
-    def push_table(self, table, name: str, tag: str, parties: List[PartyMeta]):
+    def push_table(self, table: Table, name: str, tag: str, parties: List[PartyMeta]):
+        # receivers share the frozen table instead of getting a copy each
+        table.share(len(parties))
         for party in parties:
             _tagged_key = self._federation_object_key(name, tag, self._party, party)
-            saved_name = str(uuid.uuid1())
-            _table = table.copy_as(name=saved_name, namespace=table.namespace, need_cleanup=False)
-            self._meta.set_status(party, _tagged_key, _serialize_tuple_of_str(_table.name, _table.namespace))
+            self._meta.set_status(party, _tagged_key, _serialize_tuple_of_str(table.name, table.namespace))
 
     def push_bytes(self, v: bytes, name: str, tag: str, parties: List[PartyMeta]):
         for party in parties:
@@ -736,7 +992,13 @@ class Federation(object):
         for r in results:
             name, namespace = _deserialize_tuple_of_str(self._meta.get_status(r))
             table: Table = _load_table(
-                session=self._session, data_dir=self._data_dir, name=name, namespace=namespace, need_cleanup=True
+                session=self._session,
+                data_dir=self._data_dir,
+                name=name,
+                namespace=namespace,
+                need_cleanup=True,
+                read_only=True,
+                shared=True,
             )
             rtn.append(table)
             self._meta.ack_status(r)
@@ -758,6 +1020,22 @@ class Federation(object):
             self._meta.ack_status(r)
         return rtn
 
+    def pull_bytes_as_completed(self, name: str, tag: str, parties: List[PartyMeta]):
+        """
+        yield `(index, bytes)` pairs in the order parties' objects arrive
+        """
+        pending = {
+            self._federation_object_key(name, tag, party, self._party): index for index, party in enumerate(parties)
+        }
+        while pending:
+            key = self._meta.wait_any_status_set(list(pending))
+            obj = self._meta.get_object(key)
+            if obj is None:
+                raise EnvironmentError(f"object not found: {key}")
+            self._meta.ack_object(key)
+            self._meta.ack_status(key)
+            yield pending.pop(key), obj
+
 
 def _create_table(
     session: "Session",
@@ -796,7 +1074,7 @@ def _create_table(
     )
 
 
-def _load_table(session, data_dir: str, name: str, namespace: str, need_cleanup=False):
+def _load_table(session, data_dir: str, name: str, namespace: str, need_cleanup=False, read_only=False, shared=False):
     table_meta = _TableMetaManager.get_table_meta(data_dir, namespace, name)
     if table_meta is None:
         raise RuntimeError(f"table not exist: name={name}, namespace={namespace}")
@@ -806,6 +1084,8 @@ def _load_table(session, data_dir: str, name: str, namespace: str, need_cleanup=
         namespace=namespace,
         name=name,
         need_cleanup=need_cleanup,
+        read_only=read_only,
+        shared=shared,
         partitions=table_meta.num_partitions,
         key_serdes_type=table_meta.key_serdes_type,
         value_serdes_type=table_meta.value_serdes_type,
@@ -814,79 +1094,139 @@ def _load_table(session, data_dir: str, name: str, namespace: str, need_cleanup=
 
 
 class _TaskInputInfo:
-    def __init__(self, data_dir: str, namespace: str, name: str, num_partitions: int):
+    def __init__(
+        self,
+        data_dir: str,
+        namespace: str,
+        name: str,
+        num_partitions: int,
+        cache_level: Optional[str] = None,
+        cache_memory_budget: Optional[int] = None,
+    ):
         self.data_dir = data_dir
         self.namespace = namespace
         self.name = name
         self.num_partitions = num_partitions
+        self.cache_level = cache_level
+        self.cache_memory_budget = cache_memory_budget
+
+    def read_partition(self, stack: ExitStack, pid):
+        if self.cache_level is None:
+            env = stack.enter_context(self.get_env(pid, write=False))
+            return _generator_from_cursor(stack.enter_context(stack.enter_context(env.begin(write=False)).cursor()))
+        return _WorkerPartitionCache.get(self, pid)
+
+    def get_dir(self):
+        return Path(self.data_dir).joinpath(self.namespace, self.name)
 
     def get_env(self, pid, write=False):
-        return _get_env_with_data_dir(self.data_dir, self.namespace, self.name, str(pid), write=write)
+        return _get_cached_env_with_data_dir(self.data_dir, self.namespace, self.name, str(pid), write=write)
 
 
 class _TaskOutputInfo:
-    def __init__(self, data_dir: str, namespace: str, name: str, num_partitions: int, partitioner):
+    def __init__(self, data_dir: str, namespace: str, name: str, num_partitions: int, partitioner, spill_size=None):
         self.data_dir = data_dir
         self.namespace = namespace
         self.name = name
         self.num_partitions = num_partitions
         self.partitioner = partitioner
+        self.spill_size = spill_size
+
+    def get_dir(self):
+        return Path(self.data_dir).joinpath(self.namespace, self.name)
 
     def get_env(self, pid, write=True):
-        return _get_env_with_data_dir(self.data_dir, self.namespace, self.name, str(pid), write=write)
+        return _get_cached_env_with_data_dir(self.data_dir, self.namespace, self.name, str(pid), write=write)
 
     def get_partition_id(self, key):
         if self.partitioner is None:
             raise RuntimeError("partitioner is None")
         return self.partitioner(key, self.num_partitions)
 
+    def get_partition_ids(self, keys: List[bytes]):
+        if self.partitioner is None:
+            raise RuntimeError("partitioner is None")
+        return _get_partition_ids(self.partitioner, keys, self.num_partitions)
+
 
-class _MapReduceFunctorInfo:
+class _FunctorCacheMiss(Exception):
+    def __str__(self):
+        return f"functor {self.args[0].hex()} not cached in worker and no payload shipped"
+
+
+class _WorkerFunctorCache:
+    """
+    deserialized functors cached in worker process, keyed by the sha256 digest of the pickled bytes
+    """
+
+    capacity = 128
+    _functors = OrderedDict()
+
+    @classmethod
+    def load(cls, functor_id: bytes, functor_bytes: Optional[bytes]):
+        if functor_id in cls._functors:
+            cls._functors.move_to_end(functor_id)
+            return cls._functors[functor_id]
+        if functor_bytes is None:
+            raise _FunctorCacheMiss(functor_id)
+        functor = f_pickle.loads(functor_bytes)
+        cls._functors[functor_id] = functor
+        while len(cls._functors) > cls.capacity:
+            cls._functors.popitem(last=False)
+        return functor
+
+
+class _FunctorInfo:
+    def __init__(self, **functors):
+        self._functors = {}
+        for name, functor in functors.items():
+            if functor is not None:
+                functor_bytes = f_pickle.dumps(functor)
+                self._functors[name] = (hashlib.sha256(functor_bytes).digest(), functor_bytes)
+
+    def functor_ids(self):
+        return [functor_id for functor_id, _ in self._functors.values()]
+
+    def without_payload(self):
+        info = copy.copy(self)
+        info._functors = {name: (functor_id, None) for name, (functor_id, _) in self._functors.items()}
+        return info
+
+    def preload(self):
+        for functor_id, functor_bytes in self._functors.values():
+            _WorkerFunctorCache.load(functor_id, functor_bytes)
+
+    def _get(self, name):
+        if name not in self._functors:
+            raise RuntimeError(f"{name} is None")
+        return _WorkerFunctorCache.load(*self._functors[name])
+
+
+class _MapReduceFunctorInfo(_FunctorInfo):
     def __init__(self, mapper, reducer):
-        if mapper is not None:
-            self.mapper_bytes = f_pickle.dumps(mapper)
-        else:
-            self.mapper_bytes = None
-        if reducer is not None:
-            self.reducer_bytes = f_pickle.dumps(reducer)
-        else:
-            self.reducer_bytes = None
+        super().__init__(mapper=mapper, reducer=reducer)
 
     def get_mapper(self):
-        if self.mapper_bytes is None:
-            raise RuntimeError("mapper is None")
-        return f_pickle.loads(self.mapper_bytes)
+        return self._get("mapper")
 
     def get_reducer(self):
-        if self.reducer_bytes is None:
-            raise RuntimeError("reducer is None")
-        return f_pickle.loads(self.reducer_bytes)
+        return self._get("reducer")
 
 
-class _BinarySortedMapFunctorInfo:
+class _BinarySortedMapFunctorInfo(_FunctorInfo):
     def __init__(self, mapper):
-        if mapper is not None:
-            self.mapper_bytes = f_pickle.dumps(mapper)
-        else:
-            self.mapper_bytes = None
+        super().__init__(mapper=mapper)
 
     def get_mapper(self):
-        if self.mapper_bytes is None:
-            raise RuntimeError("mapper is None")
-        return f_pickle.loads(self.mapper_bytes)
+        return self._get("mapper")
 
 
-class _ReduceFunctorInfo:
+class _ReduceFunctorInfo(_FunctorInfo):
     def __init__(self, reducer):
-        if reducer is not None:
-            self.reducer_bytes = f_pickle.dumps(reducer)
-        else:
-            self.reducer_bytes = None
+        super().__init__(reducer=reducer)
 
     def get_reducer(self):
-        if self.reducer_bytes is None:
-            raise RuntimeError("reducer is None")
-        return f_pickle.loads(self.reducer_bytes)
+        return self._get("reducer")
 
 
 class _ReduceProcess:
@@ -906,6 +1246,19 @@ class _ReduceProcess:
     def input_cursor(self, stack: ExitStack):
         return stack.enter_context(stack.enter_context(self.as_input_env(self.partition_id).begin()).cursor())
 
+    def input_partition(self, stack: ExitStack):
+        return self.input_info.read_partition(stack, self.partition_id)
+
+    def get_reducer(self):
+        return self.operator_info.get_reducer()
+
+
+class _TreeReduceProcess:
+    def __init__(self, partition_id: int, values: List[bytes], operator_info: _ReduceFunctorInfo):
+        self.partition_id = partition_id
+        self.values = values
+        self.operator_info = operator_info
+
     def get_reducer(self):
         return self.operator_info.get_reducer()
 
@@ -944,6 +1297,9 @@ class _MapReduceProcess:
             stack.enter_context(stack.enter_context(self.get_input_env(pid, write=False)).begin(write=False)).cursor()
         )
 
+    def get_input_partition(self, stack: ExitStack):
+        return self.input_info.read_partition(stack, self.partition_id)
+
     def has_partition(self, pid):
         return pid < self.input_info.num_partitions
 
@@ -953,6 +1309,9 @@ class _MapReduceProcess:
     def get_output_partition_id(self, key: bytes):
         return self.output_info.get_partition_id(key)
 
+    def get_output_partition_ids(self, records: List[Tuple[bytes, bytes]]):
+        return self.output_info.get_partition_ids([k for k, _ in records])
+
     def get_mapper(self):
         return self.operator_info.get_mapper()
 
@@ -1008,6 +1367,12 @@ class _BinarySortedMapProcess:
             ).cursor()
         )
 
+    def get_first_input_partition(self, stack: ExitStack):
+        return self.first_input.read_partition(stack, self.partition_id)
+
+    def get_second_input_partition(self, stack: ExitStack):
+        return self.second_input.read_partition(stack, self.partition_id)
+
     def get_output_transaction(self, pid, stack: ExitStack):
         return stack.enter_context(stack.enter_context(self.get_output_env(pid, write=True)).begin(write=True))
 
@@ -1023,6 +1388,138 @@ def _get_env_with_data_dir(data_dir: str, *args, write=False):
     return _open_env(_path, write=write)
 
 
+class _WorkerEnvCache:
+    """
+    lmdb environments kept open in worker process across tasks.
+
+    an environment is reopened if its data file has been replaced, and environments of destroyed tables are
+    closed at task boundaries, so that the disk space of dropped tables is released in time.
+    """
+
+    capacity = 128
+    _envs = OrderedDict()
+
+    @classmethod
+    def get(cls, path: Path, write=False):
+        key = path.as_posix()
+        if (cached := cls._envs.get(key)) is not None:
+            env, locked, inode = cached
+            if (locked or not write) and _get_data_file_inode(path) == inode:
+                cls._envs.move_to_end(key)
+                return env
+            del cls._envs[key]
+            env.close()
+        env = _open_env(path, write=write)
+        cls._envs[key] = (env, write, _get_data_file_inode(path))
+        return env
+
+    @classmethod
+    def trim(cls):
+        for key, (env, _, inode) in list(cls._envs.items()):
+            if _get_data_file_inode(Path(key)) != inode:
+                del cls._envs[key]
+                env.close()
+        while len(cls._envs) > cls.capacity:
+            _, (env, _, _) = cls._envs.popitem(last=False)
+            env.close()
+
+
+_CACHE_LEVELS = (None, "memory", "memory_serialized")
+_DEFAULT_CACHE_MEMORY_BUDGET = 512 * 1024 * 1024
+
+
+class _CachedPartition:
+    """
+    records of a partition held in worker memory, iterating it yields raw (k_bytes, v_bytes) pairs as a cursor does.
+
+    with `memory` level, deserialized records are kept as well, the computing api asks for them
+    through `deserialized` instead of deserializing the raw pairs again.
+    """
+
+    def __init__(self, items: List[Tuple[bytes, bytes]], level: str, version):
+        self.level = level
+        self.version = version
+        self.size = sum(len(k) + len(v) for k, v in items)
+        if level == "memory":
+            # rough estimate of the deserialized values
+            self.size *= 2
+        self._items = items
+        self._deserialized = {}
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def deserialized(self, key_serdes, value_serdes):
+        if self.level != "memory":
+            return None
+        serdes_key = (_get_serdes_key(key_serdes), _get_serdes_key(value_serdes))
+        if serdes_key not in self._deserialized:
+            if key_serdes is None:
+                self._deserialized[serdes_key] = [(k, value_serdes.deserialize(v)) for k, v in self._items]
+            else:
+                self._deserialized[serdes_key] = [
+                    (key_serdes.deserialize(k), value_serdes.deserialize(v)) for k, v in self._items
+                ]
+        return iter(self._deserialized[serdes_key])
+
+
+def _get_serdes_key(serdes):
+    # serdes are either classes or instances whose state only depends on the config of this process
+    if serdes is None or isinstance(serdes, type):
+        return serdes
+    return type(serdes)
+
+
+class _WorkerPartitionCache:
+    """
+    lru cache of partitions of cached tables in worker process, bounded by the estimated size in bytes
+    """
+
+    _partitions = OrderedDict()
+    _size = 0
+
+    @classmethod
+    def get(cls, input_info: "_TaskInputInfo", pid):
+        path = Path(input_info.data_dir).joinpath(input_info.namespace, input_info.name, str(pid))
+        key = path.as_posix()
+        with input_info.get_env(pid, write=False) as env:
+            with env.begin(write=False) as txn:
+                # a read transaction sees the id of the last committed write, so the cached records are
+                # dropped once the partition is written to, as well as when the table is replaced
+                version = (_get_data_file_inode(path), txn.id())
+                if (cached := cls._partitions.get(key)) is not None:
+                    if cached.version == version and cached.level == input_info.cache_level:
+                        cls._partitions.move_to_end(key)
+                        return cached
+                    cls._evict(key)
+                with txn.cursor() as cursor:
+                    items = list(cursor)
+        partition = _CachedPartition(items, input_info.cache_level, version)
+        if partition.size <= input_info.cache_memory_budget:
+            cls._partitions[key] = partition
+            cls._size += partition.size
+            while cls._size > input_info.cache_memory_budget:
+                cls._evict(next(iter(cls._partitions)))
+        return partition
+
+    @classmethod
+    def _evict(cls, key):
+        cls._size -= cls._partitions.pop(key).size
+
+
+def _get_data_file_inode(path: Path):
+    try:
+        return path.joinpath("data.mdb").stat().st_ino
+    except FileNotFoundError:
+        return None
+
+
+def _get_cached_env_with_data_dir(data_dir: str, *args, write=False):
+    # cached env is owned by the cache, so the returned context manager should not close it
+    _path = Path(data_dir).joinpath(*args)
+    return nullcontext(_WorkerEnvCache.get(_path, write=write))
+
+
 def _open_env(path, write=False):
     path.mkdir(parents=True, exist_ok=True)
 
@@ -1057,8 +1554,7 @@ def _do_mrwi_no_shuffle(p: _MapReduceProcess):
     rtn = p.output_info
     with ExitStack() as s:
         dst_txn = p.get_output_transaction(p.partition_id, s)
-        cursor = p.get_input_cursor(s)
-        v = p.get_mapper()(p.partition_id, _generator_from_cursor(cursor))
+        v = p.get_mapper()(p.partition_id, p.get_input_partition(s))
         for k1, v1 in v:
             dst_txn.put(k1, v1)
         return rtn
@@ -1068,96 +1564,188 @@ def _do_mrwi_shuffle_no_reduce(p: _MapReduceProcess):
     rtn = p.output_info
     if p.has_partition(p.partition_id):
         with ExitStack() as s:
-            cursor = p.get_input_cursor(s)
+            partition = p.get_input_partition(s)
             txn_map = {}
             for output_partition_id in range(p.get_output_partition_num()):
                 txn_map[output_partition_id] = p.get_output_transaction(output_partition_id, s)
-            output_kv_iter = p.get_mapper()(p.partition_id, _generator_from_cursor(cursor))
-            for k_bytes, v_bytes in output_kv_iter:
-                partition_id = p.get_output_partition_id(k_bytes)
-                txn_map[partition_id].put(k_bytes, v_bytes)
+            output_kv_iter = p.get_mapper()(p.partition_id, partition)
+            for batch in _batched(output_kv_iter, _PARTITION_BATCH_SIZE):
+                for partition_id, (k_bytes, v_bytes) in zip(p.get_output_partition_ids(batch), batch):
+                    txn_map[partition_id].put(k_bytes, v_bytes)
+    return rtn
+
+
+def _do_coalesce(p: _MapReduceProcess):
+    rtn = p.output_info
+    with ExitStack() as s:
+        # keys of different source partitions never collide, so they could be written concurrently
+        dst_txn = p.get_output_transaction(p.partition_id % p.get_output_partition_num(), s)
+        for k_bytes, v_bytes in p.get_input_partition(s):
+            dst_txn.put(k_bytes, v_bytes)
     return rtn
 
 
 def _do_binary_sorted_map_with_index(p: _BinarySortedMapProcess):
     rtn = p.output_info
     with ExitStack() as s:
-        first_cursor = p.get_first_input_cursor(s)
-        second_cursor = p.get_second_input_cursor(s)
+        first_partition = p.get_first_input_partition(s)
+        second_partition = p.get_second_input_partition(s)
         dst_txn = p.get_output_transaction(p.partition_id, s)
-        output_kv_iter = p.get_func()(
-            p.partition_id, _generator_from_cursor(first_cursor), _generator_from_cursor(second_cursor)
-        )
+        output_kv_iter = p.get_func()(p.partition_id, first_partition, second_partition)
         for k_bytes, v_bytes in output_kv_iter:
             dst_txn.put(k_bytes, v_bytes)
         return rtn
 
 
-def _serialize_shuffle_write_key(iteration_index: int, k_bytes: bytes) -> bytes:
-    iteration_bytes = iteration_index.to_bytes(4, "big")  # 4 bytes for the iteration index
-    serialized_key = iteration_bytes + k_bytes
-
-    return serialized_key
+_DEFAULT_SHUFFLE_SPILL_SIZE = 64 * 1024 * 1024
+_DEFAULT_TREE_REDUCE_FAN_IN = 4
+_SHUFFLE_RECORD_HEADER = struct.Struct(">II")
+# records are assigned to partitions a batch at a time, so that vectorized partitioners hash them in one call
+_PARTITION_BATCH_SIZE = 4096
+# rough python memory overhead of a buffered record: the tuple and two bytes objects
+_SHUFFLE_RECORD_OVERHEAD = 128
 
 
-def _deserialize_shuffle_write_key(serialized_key: bytes) -> (int, int, bytes):
-    iteration_bytes = serialized_key[:4]
-    k_bytes = serialized_key[4:]
-    iteration_index = int.from_bytes(iteration_bytes, "big")
-    return iteration_index, k_bytes
+class _ShuffleWriter:
+    """
+    buffers map outputs of one source partition grouped by destination partition, and spills them to disk
+    as a sorted run once the buffered size exceeds `spill_size`.
 
+    a run consists of two files:
+        `{source}_{run}.run`: records sorted by (destination partition, key), encoded as (len(k), len(v), k, v)
+        `{source}_{run}.index`: offsets of each destination partition's segment in the run file
+    records with the same key keep their emitted order, so that reducers are applied in a deterministic order.
+    """
 
-def _get_shuffle_partition_id(shuffle_source_partition_id: int, shuffle_destination_partition_id: int) -> str:
-    return f"{shuffle_source_partition_id}_{shuffle_destination_partition_id}"
+    def __init__(self, shuffle_dir: Path, source_partition_id: int, num_partitions: int, partitioner, spill_size):
+        self._shuffle_dir = shuffle_dir
+        self._source_partition_id = source_partition_id
+        self._num_partitions = num_partitions
+        self._partitioner = partitioner
+        self._spill_size = spill_size
+        self._buffers = [[] for _ in range(num_partitions)]
+        self._buffered_size = 0
+        self._num_runs = 0
+
+    def write_all(self, records: List[Tuple[bytes, bytes]]):
+        partition_ids = _get_partition_ids(self._partitioner, [k for k, _ in records], self._num_partitions)
+        for partition_id, (k_bytes, v_bytes) in zip(partition_ids, records):
+            self._buffers[partition_id].append((k_bytes, v_bytes))
+            self._buffered_size += len(k_bytes) + len(v_bytes) + _SHUFFLE_RECORD_OVERHEAD
+        if self._buffered_size >= self._spill_size:
+            self.spill()
+
+    def spill(self):
+        if self._buffered_size == 0:
+            return
+        self._shuffle_dir.mkdir(parents=True, exist_ok=True)
+        run_name = f"{self._source_partition_id}_{self._num_runs}"
+        offsets = [0]
+        with open(self._shuffle_dir.joinpath(f"{run_name}.run"), "wb") as f:
+            for i, buffer in enumerate(self._buffers):
+                buffer.sort(key=itemgetter(0))
+                for k_bytes, v_bytes in buffer:
+                    f.write(_SHUFFLE_RECORD_HEADER.pack(len(k_bytes), len(v_bytes)))
+                    f.write(k_bytes)
+                    f.write(v_bytes)
+                offsets.append(f.tell())
+                self._buffers[i] = []
+        with open(self._shuffle_dir.joinpath(f"{run_name}.index"), "wb") as f:
+            f.write(struct.pack(f">{len(offsets)}Q", *offsets))
+        self._buffered_size = 0
+        self._num_runs += 1
+
+
+def _batched(iterable, n):
+    it = iter(iterable)
+    while batch := list(itertools.islice(it, n)):
+        yield batch
+
+
+def _get_partition_ids(partitioner, keys: List[bytes], total_partitions):
+    if (batch := getattr(partitioner, "batch", None)) is not None:
+        return batch(keys, total_partitions)
+    return [partitioner(key, total_partitions) for key in keys]
+
+
+def _list_shuffle_runs(shuffle_dir: Path):
+    runs = []
+    for index_path in shuffle_dir.glob("*.index"):
+        source_partition_id, run_id = map(int, index_path.stem.split("_"))
+        runs.append((source_partition_id, run_id, index_path.with_suffix(".run"), index_path))
+    # the order matters: records of same key are merged in the order of (source partition, run)
+    runs.sort(key=itemgetter(0, 1))
+    return runs
+
+
+def _read_shuffle_run_segment(stack: ExitStack, run_path: Path, index_path: Path, partition_id: int):
+    with open(index_path, "rb") as f:
+        f.seek(partition_id * 8)
+        start, end = struct.unpack(">QQ", f.read(16))
+    if start == end:
+        return
+    f = stack.enter_context(open(run_path, "rb"))
+    f.seek(start)
+    header_size = _SHUFFLE_RECORD_HEADER.size
+    position = start
+    while position < end:
+        k_len, v_len = _SHUFFLE_RECORD_HEADER.unpack(f.read(header_size))
+        yield f.read(k_len), f.read(v_len)
+        position += header_size + k_len + v_len
 
 
 def _do_mrwi_map_and_shuffle_write(p: _MapReduceProcess):
     rtn = p.output_info
     if p.has_partition(p.partition_id):
         with ExitStack() as s:
-            cursor = p.get_input_cursor(s)
-            shuffle_write_txn_map = {}
-            for output_partition_id in range(p.get_output_partition_num()):
-                shuffle_partition_id = _get_shuffle_partition_id(p.partition_id, output_partition_id)
-                shuffle_write_txn_map[output_partition_id] = p.get_output_transaction(shuffle_partition_id, s)
-
-            output_kv_iter = p.get_mapper()(p.partition_id, _generator_from_cursor(cursor))
-            for index, (k_bytes, v_bytes) in enumerate(output_kv_iter):
-                shuffle_write_txn_map[p.get_output_partition_id(k_bytes)].put(
-                    _serialize_shuffle_write_key(index, k_bytes), v_bytes, overwrite=False
-                )
+            partition = p.get_input_partition(s)
+            writer = _ShuffleWriter(
+                shuffle_dir=p.output_info.get_dir(),
+                source_partition_id=p.partition_id,
+                num_partitions=p.get_output_partition_num(),
+                partitioner=p.output_info.partitioner,
+                spill_size=p.output_info.spill_size or _DEFAULT_SHUFFLE_SPILL_SIZE,
+            )
+            for batch in _batched(p.get_mapper()(p.partition_id, partition), _PARTITION_BATCH_SIZE):
+                writer.write_all(batch)
+            writer.spill()
     return rtn
 
 
 def _do_mrwi_shuffle_read_and_reduce(p: _MapReduceProcess):
     rtn = p.output_info
+    if p.partition_id >= p.get_output_partition_num():
+        return rtn
     reducer = p.get_reducer()
     with ExitStack() as s:
         dst_txn = p.get_output_transaction(p.partition_id, s)
-        for input_partition_id in range(p.get_input_partition_num()):
-            for k_bytes, v_bytes in p.get_input_cursor(
-                s, pid=_get_shuffle_partition_id(input_partition_id, p.partition_id)
-            ):
-                _, key = _deserialize_shuffle_write_key(k_bytes)
-                if (old := dst_txn.get(key)) is None:
-                    dst_txn.put(key, v_bytes)
-                else:
-                    dst_txn.put(key, reducer(old, v_bytes))
+        segments = [
+            _read_shuffle_run_segment(s, run_path, index_path, p.partition_id)
+            for _, _, run_path, index_path in _list_shuffle_runs(p.input_info.get_dir())
+        ]
+        # runs are sorted by key, so the merged stream is sorted and grouped by key,
+        # which allows reducing without lookups and appending to the output in order
+        for key, group in itertools.groupby(merge(*segments, key=itemgetter(0)), key=itemgetter(0)):
+            dst_txn.put(key, reduce(reducer, (v_bytes for _, v_bytes in group)), append=True)
     return rtn
 
 
 def _do_reduce(p: _ReduceProcess):
     value = None
+    reducer = p.get_reducer()
     with ExitStack() as s:
-        cursor = p.input_cursor(s)
-        for _, v_bytes in cursor:
+        for _, v_bytes in p.input_partition(s):
             if value is None:
                 value = v_bytes
             else:
-                value = p.get_reducer()(value, v_bytes)
+                value = reducer(value, v_bytes)
     return value
 
 
+def _do_tree_reduce(p: _TreeReduceProcess):
+    return reduce(p.get_reducer(), p.values)
+
+
 class _FederationMetaManager:
     STATUS_TABLE_NAME_PREFIX = "__federation_status__"
     OBJECT_TABLE_NAME_PREFIX = "__federation_object__"
@@ -1167,19 +1755,33 @@ class _FederationMetaManager:
         self.party = party
         self._data_dir = data_dir
         self._env = {}
+        self._notifier = _FederationNotifier(data_dir, session_id, party)
+
+    def close(self):
+        self._notifier.close()
 
     def wait_status_set(self, key: bytes) -> bytes:
-        value = self.get_status(key)
-        while value is None:
-            time.sleep(0.001)
-            value = self.get_status(key)
-        return key
+        return self.wait_any_status_set([key])
+
+    def wait_any_status_set(self, keys: List[bytes]) -> bytes:
+        while True:
+            # take the generation before checking, so that a notification in between is not missed
+            generation = self._notifier.generation
+            for key in keys:
+                if self.get_status(key) is not None:
+                    return key
+            if self._notifier.enabled:
+                self._notifier.wait(generation, timeout=_FEDERATION_NOTIFIED_POLL_INTERVAL)
+            else:
+                time.sleep(_FEDERATION_POLL_INTERVAL)
 
     def get_status(self, key: bytes):
         return self._get(self._get_status_table_name(self.party), key)
 
     def set_status(self, party: Tuple[str, str], key: bytes, value: bytes):
-        return self._set(self._get_status_table_name(party), key, value)
+        rtn = self._set(self._get_status_table_name(party), key, value)
+        self._notifier.notify(party)
+        return rtn
 
     def ack_status(self, key: bytes):
         return self._ack(self._get_status_table_name(self.party), key)
@@ -1220,6 +1822,106 @@ class _FederationMetaManager:
             txn.delete(key)
 
 
+_FEDERATION_POLL_INTERVAL = 0.001
+# waiters woken by notifications still poll at this interval in case one is lost
+_FEDERATION_NOTIFIED_POLL_INTERVAL = 0.1
+
+
+class _FederationNotifier:
+    """
+    wakes up parties waiting for federation status keys.
+
+    each party binds a unix datagram socket under the federation dir, and parties setting a status key send
+    one byte to the socket of the destination party. notifications are best effort: if sockets are not
+    available, waiters fall back to polling.
+    """
+
+    def __init__(self, data_dir: str, session_id: str, party: Tuple[str, str]):
+        self._dir = Path(data_dir).joinpath(session_id, "__federation_notify__")
+        self._sock = None
+        self._sender = None
+        self._listener = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._generation = 0
+        if not hasattr(socket, "AF_UNIX"):
+            return
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            path = self._get_path(party)
+            path.unlink(missing_ok=True)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(path.as_posix())
+            self._sock = sock
+            self._path = path
+        except OSError as e:
+            logger.debug(f"federation notification disabled, fallback to polling: {e}")
+
+    @property
+    def enabled(self):
+        return self._sock is not None
+
+    @property
+    def generation(self):
+        with self._cond:
+            return self._generation
+
+    def _get_path(self, party: Tuple[str, str]):
+        return self._dir.joinpath(f"{party[0]}_{party[1]}.sock")
+
+    def notify(self, party: Tuple[str, str]):
+        if not hasattr(socket, "AF_UNIX"):
+            return
+        try:
+            if self._sender is None:
+                self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                self._sender.setblocking(False)
+            self._sender.sendto(b"\x00", self._get_path(party).as_posix())
+        except OSError:
+            # party not listening or its socket buffer is full, it will see the status when it checks
+            pass
+
+    def wait(self, generation: int, timeout: float):
+        with self._cond:
+            if self._listener is None and self._sock is not None and not self._closed:
+                self._listener = threading.Thread(target=self._listen, args=(self._sock,), daemon=True)
+                self._listener.start()
+            self._cond.wait_for(lambda: self._generation != generation, timeout=timeout)
+
+    def _listen(self, sock: socket.socket):
+        # the socket is passed in, `close` resets the attribute while this thread may still be looping
+        while True:
+            try:
+                sock.recv(64)
+            except OSError:
+                return
+            with self._cond:
+                if self._closed:
+                    return
+                self._generation += 1
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            listener, self._listener = self._listener, None
+        if self._sock is not None:
+            if listener is not None:
+                # closing the socket does not reliably wake a thread blocked in recv, send it one byte instead
+                try:
+                    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as waker:
+                        waker.sendto(b"\x00", self._path.as_posix())
+                except OSError:
+                    pass
+                listener.join(timeout=1)
+            self._sock.close()
+            self._path.unlink(missing_ok=True)
+            self._sock = None
+        if self._sender is not None:
+            self._sender.close()
+            self._sender = None
+
+
 def _hash_namespace_name_to_partition(namespace: str, name: str, partitions: int) -> Tuple[bytes, int]:
     k_bytes = f"{name}.{namespace}".encode("utf-8")
     partition_id = int.from_bytes(hashlib.sha256(k_bytes).digest(), "big") % partitions
@@ -1278,6 +1980,60 @@ class _TableMetaManager:
         shutil.rmtree(path, ignore_errors=True)
 
 
+class _SharedTableRefManager:
+    """
+    reference counts of tables shared across parties, stored in lmdb so that updates from processes of
+    different parties are atomic
+    """
+
+    namespace = "__META__"
+    name = "shared_refs"
+    _envs = {}
+
+    @classmethod
+    def _get_env(cls, data_dir: str):
+        if (env := cls._envs.get(data_dir)) is None:
+            env = _get_env_with_data_dir(data_dir, cls.namespace, cls.name, str(0), write=True)
+            cls._envs[data_dir] = env
+        return env
+
+    @classmethod
+    def acquire(cls, data_dir: str, namespace: str, name: str, num_refs: int, owned: bool):
+        k_bytes = _serialize_tuple_of_str(name, namespace)
+        with cls._get_env(data_dir).begin(write=True) as txn:
+            if (value := txn.get(k_bytes)) is not None:
+                num_refs += int.from_bytes(value[:8], "big")
+                owned = bool(value[8])
+            txn.put(k_bytes, num_refs.to_bytes(8, "big") + bytes([owned]))
+
+    @classmethod
+    def release(cls, data_dir: str, namespace: str, name: str) -> Tuple[int, bool]:
+        k_bytes = _serialize_tuple_of_str(name, namespace)
+        with cls._get_env(data_dir).begin(write=True) as txn:
+            value = txn.get(k_bytes)
+            if value is None:
+                raise RuntimeError(f"shared table not found: name={name}, namespace={namespace}")
+            remaining, owned = int.from_bytes(value[:8], "big") - 1, bool(value[8])
+            if remaining > 0:
+                txn.put(k_bytes, remaining.to_bytes(8, "big") + value[8:])
+            else:
+                txn.delete(k_bytes)
+            return remaining, owned
+
+    @classmethod
+    def release_if_last(cls, data_dir: str, namespace: str, name: str) -> bool:
+        """
+        release the reference only if no other is left
+        """
+        k_bytes = _serialize_tuple_of_str(name, namespace)
+        with cls._get_env(data_dir).begin(write=True) as txn:
+            value = txn.get(k_bytes)
+            if value is None or int.from_bytes(value[:8], "big") > 1:
+                return False
+            txn.delete(k_bytes)
+            return True
+
+
 class _TableMeta:
     def __init__(self, num_partitions: int, key_serdes_type: int, value_serdes_type: int, partitioner_type: int):
         self.num_partitions = num_partitions
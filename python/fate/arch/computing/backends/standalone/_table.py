@@ -17,7 +17,7 @@ import logging
 from typing import Callable, Iterable, Any, Tuple
 
 from fate.arch.computing.api import ComputingEngine, KVTable, K, V
-from fate.arch.unify import URI
+from fate.arch.unify import URI, uuid
 from ._standalone import Table as StandaloneTable
 
 LOGGER = logging.getLogger(__name__)
@@ -45,10 +45,19 @@ class Table(KVTable):
     def _destroy(self):
         pass
 
+    def _cache(self, level):
+        self._table.cache(level)
+
+    def _coalesce(self, num_partitions: int):
+        return Table(table=self._table.coalesce(num_partitions))
+
     def _drop_num(self, num: int, partitioner):
-        for k, v in self._table.take(num=num):
-            self._table.delete(k, partitioner=partitioner)
-        return Table(table=self._table)
+        table = self._table
+        if table.read_only:
+            table = table.copy_as(name=f"{table.name}_{uuid()}", namespace=table.namespace, need_cleanup=True)
+        for k, v in table.take(num=num):
+            table.delete(k, partitioner=partitioner)
+        return Table(table=table)
 
     def _impl_map_reduce_partitions_with_index(
         self,
@@ -13,6 +13,18 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import numpy as np
+
 
 def integer_partitioner(key: bytes, total_partitions):
     return int.from_bytes(key, "big") % total_partitions
+
+
+def integer_partitioner_batch(keys, total_partitions):
+    # keys of integer serdes are 8 bytes, decode them all at once
+    if all(len(key) == 8 for key in keys):
+        return (np.frombuffer(b"".join(keys), dtype=">u8") % total_partitions).tolist()
+    return [int.from_bytes(key, "big") % total_partitions for key in keys]
+
+
+integer_partitioner.batch = integer_partitioner_batch
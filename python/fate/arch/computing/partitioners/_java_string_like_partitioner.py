@@ -15,6 +15,8 @@
 
 import hashlib
 
+import numpy as np
+
 
 def _java_string_like_partitioner(key, total_partitions):
     _key = hashlib.sha1(key).digest()
@@ -25,3 +27,24 @@ def _java_string_like_partitioner(key, total_partitions):
         _key = ((_key * 2862933555777941757) + 1) & 0xFFFFFFFFFFFFFFFF
         j = float(b + 1) * (float(1 << 31) / float((_key >> 33) + 1))
     return int(b)
+
+
+def _java_string_like_partitioner_batch(keys, total_partitions):
+    # only the lowest 64 bits of the digest survive the first masked step, which fit in uint64 lanes
+    digests = b"".join(hashlib.sha1(key).digest()[:8] for key in keys)
+    _key = np.frombuffer(digests, dtype="<u8").copy()
+    b = np.full(len(keys), -1, dtype=np.int64)
+    j = np.zeros(len(keys), dtype=np.float64)
+    active = j < total_partitions
+    with np.errstate(over="ignore"):
+        while active.any():
+            b[active] = j[active].astype(np.int64)
+            _key[active] = _key[active] * np.uint64(2862933555777941757) + np.uint64(1)
+            j[active] = (b[active] + 1).astype(np.float64) * (
+                float(1 << 31) / ((_key[active] >> np.uint64(33)) + np.uint64(1)).astype(np.float64)
+            )
+            active = j < total_partitions
+    return b.tolist()
+
+
+_java_string_like_partitioner.batch = _java_string_like_partitioner_batch
@@ -13,8 +13,17 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import mmh3
+import numpy as np
 
-def mmh3_partitioner(key: bytes, total_partitions):
-    import mmh3
 
+def mmh3_partitioner(key: bytes, total_partitions):
     return mmh3.hash(key) % total_partitions
+
+
+def mmh3_partitioner_batch(keys, total_partitions):
+    hashes = np.fromiter(map(mmh3.hash, keys), dtype=np.int64, count=len(keys))
+    return (hashes % total_partitions).tolist()
+
+
+mmh3_partitioner.batch = mmh3_partitioner_batch
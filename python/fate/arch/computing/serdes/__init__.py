@@ -32,5 +32,9 @@ def get_serdes_by_type(serdes_type: int):
         from ._integer_serdes import get_integer_serdes
 
         return get_integer_serdes()
+    elif serdes_type == 2:
+        from ._numeric_serdes import get_numeric_serdes
+
+        return get_numeric_serdes(fallback_serdes=get_serdes_by_type(0))
     else:
         raise ValueError(f"serdes type `{serdes_type}` not supported")
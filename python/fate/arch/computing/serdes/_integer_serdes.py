@@ -13,6 +13,8 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import numpy as np
+
 
 def get_integer_serdes():
     return IntegerSerdes()
@@ -27,3 +29,10 @@ class IntegerSerdes:
 
     def deserialize(self, bytes) -> object:
         return int.from_bytes(bytes, "big")
+
+    def serialize_batch(self, objs) -> list:
+        data = np.asarray(objs, dtype=">u8").tobytes()
+        return [data[i : i + 8] for i in range(0, len(data), 8)]
+
+    def deserialize_batch(self, bytes_list) -> list:
+        return np.frombuffer(b"".join(bytes_list), dtype=">u8").tolist()
@@ -0,0 +1,148 @@
+#
+#  Copyright 2019 The FATE Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import struct
+import sys
+
+import numpy as np
+
+_TAG = struct.Struct(">B")
+_COUNT = struct.Struct(">I")
+_LENGTH = struct.Struct(">Q")
+
+_FALLBACK = 0
+_NDARRAY = 1
+_TENSOR = 2
+_LIST = 3
+_TUPLE = 4
+
+
+def get_numeric_serdes(fallback_serdes):
+    return NumericSerdes(fallback_serdes)
+
+
+class NumericSerdes:
+    """
+    serdes for numeric blocks: numpy arrays and cpu tensors are written as a small header (dtype and shape)
+    followed by their raw buffer, lists and tuples holding them are encoded element by element.
+
+    any other value is encoded by `fallback_serdes`, so the safety policy of pickle based serdes still applies
+    to them, while numeric payloads never go through unpickling.
+    """
+
+    def __init__(self, fallback_serdes):
+        self._fallback_serdes = fallback_serdes
+
+    def serialize(self, obj) -> bytes:
+        # pieces are joined once at the end, array buffers are copied only once
+        pieces = []
+        self._write(pieces, obj)
+        return b"".join(pieces)
+
+    def deserialize(self, bytes) -> object:
+        view = memoryview(bytes)
+        obj, _ = self._read(view, 0, len(view))
+        return obj
+
+    def _write(self, pieces: list, obj) -> int:
+        if _is_plain_array(obj):
+            pieces.append(_TAG.pack(_NDARRAY))
+            return _TAG.size + _write_array(pieces, obj, obj.dtype.str)
+        if _is_plain_tensor(obj):
+            pieces.append(_TAG.pack(_TENSOR))
+            return _TAG.size + _write_array(pieces, obj.numpy(), str(obj.dtype)[len("torch.") :])
+        if isinstance(obj, (list, tuple)) and any(_is_plain_array(x) or _is_plain_tensor(x) for x in obj):
+            pieces.append(_TAG.pack(_LIST if isinstance(obj, list) else _TUPLE))
+            pieces.append(_COUNT.pack(len(obj)))
+            size = _TAG.size + _COUNT.size
+            for item in obj:
+                length_index = len(pieces)
+                pieces.append(None)
+                length = self._write(pieces, item)
+                pieces[length_index] = _LENGTH.pack(length)
+                size += _LENGTH.size + length
+            return size
+        obj_bytes = self._fallback_serdes.serialize(obj)
+        pieces.append(_TAG.pack(_FALLBACK))
+        pieces.append(obj_bytes)
+        return _TAG.size + len(obj_bytes)
+
+    def _read(self, view: memoryview, offset: int, end: int):
+        (tag,) = _TAG.unpack_from(view, offset)
+        offset += _TAG.size
+        if tag == _NDARRAY:
+            return _read_array(view, offset)
+        if tag == _TENSOR:
+            import torch
+
+            array, offset = _read_array(view, offset)
+            return torch.from_numpy(array), offset
+        if tag == _LIST or tag == _TUPLE:
+            (count,) = _COUNT.unpack_from(view, offset)
+            offset += _COUNT.size
+            items = []
+            for _ in range(count):
+                (length,) = _LENGTH.unpack_from(view, offset)
+                offset += _LENGTH.size
+                item, offset = self._read(view, offset, offset + length)
+                items.append(item)
+            return (items if tag == _LIST else tuple(items)), offset
+        if tag == _FALLBACK:
+            return self._fallback_serdes.deserialize(bytes(view[offset:end])), end
+        raise ValueError(f"unknown numeric serdes tag `{tag}`")
+
+
+def _is_plain_array(obj):
+    return isinstance(obj, np.ndarray) and obj.dtype.kind in "biufc"
+
+
+def _is_plain_tensor(obj):
+    # tensors could only exist if torch is imported already, avoid importing it for every value
+    torch = sys.modules.get("torch")
+    if torch is None or not isinstance(obj, torch.Tensor):
+        return False
+    # autograd state, non cpu devices and dtypes unknown to numpy are kept by the fallback serdes
+    return obj.device.type == "cpu" and not obj.requires_grad and obj.dtype != torch.bfloat16
+
+
+def _write_array(pieces: list, array: np.ndarray, dtype_name: str) -> int:
+    array = np.require(array, requirements="C")
+    dtype_name = dtype_name.encode("ascii")
+    header = b"".join(
+        [
+            _TAG.pack(len(dtype_name)),
+            dtype_name,
+            _TAG.pack(array.ndim),
+            struct.pack(f">{array.ndim}Q", *array.shape),
+        ]
+    )
+    pieces.append(header)
+    pieces.append(memoryview(array.reshape(-1).view(np.uint8)))
+    return len(header) + array.nbytes
+
+
+def _read_array(view: memoryview, offset: int):
+    (dtype_length,) = _TAG.unpack_from(view, offset)
+    offset += _TAG.size
+    dtype = np.dtype(bytes(view[offset : offset + dtype_length]).decode("ascii"))
+    offset += dtype_length
+    (ndim,) = _TAG.unpack_from(view, offset)
+    offset += _TAG.size
+    shape = struct.unpack_from(f">{ndim}Q", view, offset)
+    offset += _LENGTH.size * ndim
+    count = int(np.prod(shape, dtype=np.int64))
+    # copy out of the serialized buffer, deserialized blocks are expected to be writable
+    array = np.frombuffer(view, dtype=dtype, count=count, offset=offset).reshape(shape).copy()
+    return array, offset + count * dtype.itemsize
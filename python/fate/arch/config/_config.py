@@ -70,6 +70,10 @@ class Config(object):
         else:
             return default
 
+    @property
+    def computing(self):
+        return self.config.computing
+
     @property
     def federation(self):
         return self.config.federation
@@ -268,6 +268,15 @@ class Context:
     @auto_trace
     def destroy(self):
         if not self._is_destroyed:
+            if self._mpc is not None:
+                from fate.arch.protocol.mpc.communicator import Communicator
+
+                # coalesced mpc messages still buffered are sent before federation goes away
+                try:
+                    Communicator.shutdown()
+                except Exception as e:
+                    logger.exception(f"mpc communicator shutdown failed: {e}")
+
             try:
                 self.federation.destroy()
                 logger.debug("federation engine destroy done")
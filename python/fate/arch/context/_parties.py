@@ -12,7 +12,9 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import functools
 import logging
+import time
 import typing
 from typing import List, Tuple, TypeVar, Union
 
@@ -40,6 +42,9 @@ class _KeyedParty:
     def get(self):
         return self._party.get(self._key)
 
+    def get_as_completed(self):
+        return self._party.get_as_completed(self._key)
+
 
 class Party:
     def __init__(
@@ -90,20 +95,26 @@ class Party:
             kvs = kwargs.items()
 
         for k, v in kvs:
-            return _push(
-                federation=self.federation,
-                computing=self.computing,
-                name=k,
-                namespace=self.namespace,
-                parties=[self.party],
-                value=v,
-                max_message_size=self.federation.get_default_max_message_size(),
-                num_partitions_of_slice_table=self.federation.get_default_partition_num(),
+            return self.federation.submit_push(
+                functools.partial(
+                    _push,
+                    federation=self.federation,
+                    computing=self.computing,
+                    name=k,
+                    namespace=self.namespace,
+                    parties=[self.party],
+                    value=v,
+                    max_message_size=self.federation.get_default_max_message_size(),
+                    num_partitions_of_slice_table=self.federation.get_default_partition_num(),
+                )
             )
 
     def get(self, name: str):
         return _pull(self._ctx, self.federation, name, self.namespace, [self.party])[0]
 
+    def get_as_completed(self, name: str):
+        return _pull_as_completed(self._ctx, self.federation, name, self.namespace, [self.party])
+
     def get_int(self, name: str):
         ...
 
@@ -156,20 +167,29 @@ class Parties:
         else:
             kvs = kwargs.items()
         for k, v in kvs:
-            return _push(
-                federation=self.federation,
-                computing=self.computing,
-                name=k,
-                namespace=self.namespace,
-                parties=[p[1] for p in self.parties],
-                value=v,
-                max_message_size=self.federation.get_default_max_message_size(),
-                num_partitions_of_slice_table=self.federation.get_default_partition_num(),
+            return self.federation.submit_push(
+                functools.partial(
+                    _push,
+                    federation=self.federation,
+                    computing=self.computing,
+                    name=k,
+                    namespace=self.namespace,
+                    parties=[p[1] for p in self.parties],
+                    value=v,
+                    max_message_size=self.federation.get_default_max_message_size(),
+                    num_partitions_of_slice_table=self.federation.get_default_partition_num(),
+                )
             )
 
     def get(self, name: str):
         return _pull(self._ctx, self.federation, name, self.namespace, [p[1] for p in self.parties])
 
+    def get_as_completed(self, name: str):
+        """
+        yield `(index, value)` pairs in the order parties' values arrive, `index` locates the party in parties
+        """
+        return _pull_as_completed(self._ctx, self.federation, name, self.namespace, [p[1] for p in self.parties])
+
 
 def _push(
     federation: "Federation",
@@ -192,6 +212,7 @@ def _push(
         parties,
         max_message_size=max_message_size,
         num_partitions_of_slice_table=num_partitions_of_slice_table,
+        timer=timer,
     )
     timer.done()
 
@@ -203,15 +224,38 @@ def _pull(
     namespace: NS,
     parties: List[PartyMeta],
 ):
+    values = [None] * len(parties)
+    for index, value in _pull_as_completed(ctx, federation, name, namespace, parties):
+        values[index] = value
+    return values
+
+
+def _pull_as_completed(
+    ctx: "Context",
+    federation: "Federation",
+    name: str,
+    namespace: NS,
+    parties: List[PartyMeta],
+):
+    # pending async pushes go first, federation clients are not shared across threads
+    federation.wait_pushes()
     tag = namespace.federation_tag
     timer = federation_get_timer(name=name, full_name=name, tag=tag, local=federation.local_party, parties=parties)
-    buffer_list = federation.pull_bytes(
-        name=name,
-        tag=tag,
-        parties=parties,
-    )
-    values = []
-    for party, buffers in zip(parties, buffer_list):
-        values.append(TableRemotePersistentUnpickler.pull(buffers, ctx, federation, name, tag, party))
-    timer.done()
-    return values
+    # each party's payload is unpickled as soon as it arrives, so slow parties do not hold back the others
+    arrivals = iter(federation.pull_bytes_as_completed(name=name, tag=tag, parties=parties))
+    # the timer is finalized even if the consumer stops early or unpickling fails
+    try:
+        while True:
+            # only time spent blocked on arrivals counts as waiting, not the consumer's work between them
+            start = time.perf_counter()
+            try:
+                index, buffers = next(arrivals)
+            except StopIteration:
+                break
+            timer.add_wait_time(time.perf_counter() - start)
+            value = TableRemotePersistentUnpickler.pull(
+                buffers, ctx, federation, name, tag, parties[index], timer=timer
+            )
+            yield index, value
+    finally:
+        timer.done()
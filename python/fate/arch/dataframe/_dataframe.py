@@ -173,6 +173,19 @@ class DataFrame(object):
             enable_type_align_checking=enable_type_align_checking,
         )
 
+    @auto_trace
+    def apply_batch(self, func, columns: list, dtype="float32", with_label=False, with_weight=False):
+        from .ops._apply_batch import apply_batch
+
+        return apply_batch(
+            self,
+            func,
+            columns=columns,
+            dtype=dtype,
+            with_label=with_label,
+            with_weight=with_weight,
+        )
+
     @auto_trace
     def create_frame(self, with_label=False, with_weight=False, columns: Union[list, pd.Index] = None) -> "DataFrame":
         if columns is not None and isinstance(columns, pd.Index):
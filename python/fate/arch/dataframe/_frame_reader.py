@@ -13,11 +13,12 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 import functools
+import os
 import pandas as pd
 from typing import Union
 
 
-from .conf.default_config import DATAFRAME_BLOCK_ROW_SIZE
+from .conf.default_config import DATAFRAME_BLOCK_ROW_SIZE, DATAFRAME_BLOCK_SERDES_TYPE, DATAFRAME_CSV_CHUNK_ROWS
 from .entity import types
 from ._dataframe import DataFrame
 from .manager import DataManager
@@ -107,7 +108,9 @@ class TableReader(object):
             retrieval_index_dict=retrieval_index_dict,
             partition_order_mappings=partition_order_mappings,
         )
-        block_table = table.mapPartitions(to_block_func, use_previous_behavior=False)
+        block_table = table.mapPartitions(
+            to_block_func, use_previous_behavior=False, output_value_serdes_type=DATAFRAME_BLOCK_SERDES_TYPE
+        )
 
         return DataFrame(
             ctx=ctx,
@@ -130,7 +133,11 @@ class ImageReader(object):
 
 
 class CSVReader(object):
-    # TODO: fast data read
+    """
+    csv files are parsed `chunk_rows` rows at a time and streamed into a table, then converted to blocks
+    partition by partition, so the whole file is never held in memory.
+    """
+
     def __init__(
         self,
         sample_id_name: Union[None, str] = None,
@@ -143,8 +150,9 @@ class CSVReader(object):
         weight_type: str = "float32",
         dtype: str = "float32",
         na_values: Union[None, str, list, dict] = None,
-        partition: int = 4,
+        partition: Union[None, int] = None,
         block_row_size: int = None,
+        chunk_rows: int = None,
     ):
         self._sample_id_name = sample_id_name
         self._match_id_list = match_id_list
@@ -158,23 +166,73 @@ class CSVReader(object):
         self._na_values = na_values
         self._partition = partition
         self._block_row_size = block_row_size if block_row_size is not None else DATAFRAME_BLOCK_ROW_SIZE
+        self._chunk_rows = chunk_rows if chunk_rows is not None else DATAFRAME_CSV_CHUNK_ROWS
+
+        if self._sample_id_name and not self._match_id_name:
+            raise ValueError(f"As sample_id {self._sample_id_name} is given, match_id should be given too")
+
+        if not isinstance(self._chunk_rows, int) or self._chunk_rows <= 0:
+            raise ValueError("chunk_rows should be positive integer")
 
     @auto_trace
     def to_frame(self, ctx, path):
-        # TODO: use table put data instead of read all data
-        df = pd.read_csv(path, delimiter=self._delimiter, na_values=self._na_values)
+        header = pd.read_csv(path, delimiter=self._delimiter, nrows=0).columns.tolist()
+        if self._sample_id_name:
+            sample_id_name = self._sample_id_name
+            columns = [column for column in header if column != sample_id_name]
+        else:
+            sample_id_name = types.DEFAULT_SID_NAME
+            columns = header
 
-        return PandasReader(
-            sample_id_name=self._sample_id_name,
+        data_manager = DataManager(block_row_size=self._block_row_size)
+        retrieval_index_dict = data_manager.init_from_local_file(
+            sample_id_name=sample_id_name,
+            columns=columns,
             match_id_list=self._match_id_list,
             match_id_name=self._match_id_name,
             label_name=self._label_name,
-            label_type=self._label_type,
             weight_name=self._weight_name,
+            label_type=self._label_type,
+            weight_type=self._weight_type,
             dtype=self._dtype,
-            partition=self._partition,
-            block_row_size=self._block_row_size,
-        ).to_frame(ctx, df)
+            default_type=types.DEFAULT_DATA_TYPE,
+        )
+
+        partition = self._partition
+        if partition is None:
+            partition = ctx.computing.suggest_num_partitions(num_bytes=os.path.getsize(path), default=4)
+        table = ctx.computing.parallelize(self._read_rows(path, header), include_key=True, partition=partition)
+
+        return _raw_table_to_frame(ctx, table, data_manager, retrieval_index_dict)
+
+    def _read_rows(self, path, header):
+        # types inferred by pandas could change from one chunk to another, e.g. when some chunk has missing values,
+        # so ids are always read as strings and label and weight as floats. rows are emitted column by column,
+        # otherwise `chunk.values` upcasts all values of a row to a common type.
+        dtype = {}
+        id_names = [self._sample_id_name, self._match_id_name, *(self._match_id_list or [])]
+        for name in header:
+            if name in id_names:
+                dtype[name] = str
+            elif name in (self._label_name, self._weight_name):
+                dtype[name] = "float64"
+
+        chunks = pd.read_csv(
+            path,
+            delimiter=self._delimiter,
+            na_values=self._na_values,
+            chunksize=self._chunk_rows,
+            dtype=dtype,
+        )
+        offset = 0
+        for chunk in chunks:
+            if self._sample_id_name:
+                sample_ids = chunk.pop(self._sample_id_name).tolist()
+            else:
+                sample_ids = range(offset, offset + len(chunk))
+            offset += len(chunk)
+            rows = zip(*[chunk[column].tolist() for column in chunk.columns])
+            yield from zip(sample_ids, map(list, rows))
 
 
 class HiveReader(object):
@@ -211,7 +269,7 @@ class PandasReader(object):
         weight_name: Union[None, str] = None,
         weight_type: str = "float32",
         dtype: str = "float32",
-        partition: int = 4,
+        partition: Union[None, int] = None,
         block_row_size: int = None,
     ):
         self._sample_id_name = sample_id_name
@@ -250,34 +308,48 @@ class PandasReader(object):
             default_type=types.DEFAULT_DATA_TYPE,
         )
 
-        site_name = ctx.local.name
-        local_role = ctx.local.party[0]
+        partition = self._partition
+        if partition is None:
+            partition = ctx.computing.suggest_num_partitions(
+                num_rows=len(df), num_bytes=int(df.memory_usage(index=True).sum()), default=4
+            )
+        buf = zip(df.index.tolist(), df.values.tolist())
+        table = ctx.computing.parallelize(buf, include_key=True, partition=partition)
 
-        if local_role != "local":
-            data_manager.fill_anonymous_site_name(site_name=site_name)
+        return _raw_table_to_frame(ctx, table, data_manager, retrieval_index_dict)
 
-        buf = zip(df.index.tolist(), df.values.tolist())
-        table = ctx.computing.parallelize(buf, include_key=True, partition=self._partition)
 
-        from .ops._indexer import get_partition_order_by_raw_table
+def _raw_table_to_frame(ctx, table, data_manager: "DataManager", retrieval_index_dict):
+    """
+    table: (sample_id, row values except the sample id)
+    """
+    site_name = ctx.local.name
+    local_role = ctx.local.party[0]
 
-        partition_order_mappings = get_partition_order_by_raw_table(table, data_manager.block_row_size)
-        # partition_order_mappings = _get_partition_order(table)
-        to_block_func = functools.partial(
-            _to_blocks,
-            data_manager=data_manager,
-            retrieval_index_dict=retrieval_index_dict,
-            partition_order_mappings=partition_order_mappings,
-        )
+    if local_role != "local":
+        data_manager.fill_anonymous_site_name(site_name=site_name)
 
-        block_table = table.mapPartitions(to_block_func, use_previous_behavior=False)
+    from .ops._indexer import get_partition_order_by_raw_table
 
-        return DataFrame(
-            ctx=ctx,
-            block_table=block_table,
-            partition_order_mappings=partition_order_mappings,
-            data_manager=data_manager,
-        )
+    partition_order_mappings = get_partition_order_by_raw_table(table, data_manager.block_row_size)
+    # partition_order_mappings = _get_partition_order(table)
+    to_block_func = functools.partial(
+        _to_blocks,
+        data_manager=data_manager,
+        retrieval_index_dict=retrieval_index_dict,
+        partition_order_mappings=partition_order_mappings,
+    )
+
+    block_table = table.mapPartitions(
+        to_block_func, use_previous_behavior=False, output_value_serdes_type=DATAFRAME_BLOCK_SERDES_TYPE
+    )
+
+    return DataFrame(
+        ctx=ctx,
+        block_table=block_table,
+        partition_order_mappings=partition_order_mappings,
+        data_manager=data_manager,
+    )
 
 
 def _to_blocks(kvs, data_manager=None, retrieval_index_dict=None, partition_order_mappings=None, na_values=None):
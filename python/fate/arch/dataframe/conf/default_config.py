@@ -15,3 +15,7 @@
 #
 DATAFRAME_BLOCK_ROW_SIZE = 2**7
 BLOCK_COMPRESS_THRESHOLD = 5
+# numeric serdes, blocks are stored as raw buffers instead of pickles, see `fate.arch.computing.serdes`
+DATAFRAME_BLOCK_SERDES_TYPE = 2
+# rows parsed at a time when reading csv files, bounds the memory of ingestion
+DATAFRAME_CSV_CHUNK_ROWS = 2**16
@@ -0,0 +1,153 @@
+#
+#  Copyright 2019 The FATE Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import functools
+from typing import List, Union
+
+import numpy as np
+import torch
+
+from .._dataframe import DataFrame
+from ..manager.block_manager import BlockType
+from ..manager.data_manager import DataManager
+
+
+def apply_batch(
+    df: "DataFrame",
+    func,
+    columns: List[str],
+    dtype: Union[str, list, dict] = "float32",
+    with_label=False,
+    with_weight=False,
+) -> "DataFrame":
+    """
+    func is called once per partition block with a dict mapping each field name to its whole column,
+    a 1-D tensor or ndarray, and returns the new columns as one of:
+        1. a dict mapping each name in `columns` to a column of the same length
+        2. a 2-D tensor or ndarray with one column per name in `columns`
+        3. a 1-D tensor or ndarray if only one column is declared
+    output types are taken from `dtype` instead of being inferred value by value,
+    a single type keeps all new columns in one block.
+    """
+    if not columns:
+        raise ValueError("apply_batch requires the output columns to be declared")
+
+    if isinstance(dtype, dict):
+        block_types = [BlockType.get_block_type(dtype[column]) for column in columns]
+    elif isinstance(dtype, list):
+        if len(dtype) != len(columns):
+            raise ValueError(f"apply_batch declares {len(columns)} columns but {len(dtype)} dtypes")
+        block_types = [BlockType.get_block_type(_dtype) for _dtype in dtype]
+    else:
+        block_types = BlockType.get_block_type(dtype)
+
+    if BlockType.phe_tensor in (block_types if isinstance(block_types, list) else [block_types]):
+        raise ValueError("apply_batch does not support phe_tensor outputs, use apply_row instead")
+
+    data_manager = df.data_manager
+    dst_data_manager, _ = data_manager.derive_new_data_manager(
+        with_sample_id=True, with_match_id=True, with_label=not with_label, with_weight=not with_weight, columns=None
+    )
+
+    non_operable_field_names = dst_data_manager.get_field_name_list()
+    non_operable_blocks = [
+        data_manager.loc_block(field_name, with_offset=False) for field_name in non_operable_field_names
+    ]
+
+    fields_name = data_manager.get_field_name_list(
+        with_sample_id=False, with_match_id=False, with_label=with_label, with_weight=with_weight
+    )
+    fields_loc = data_manager.loc_block(fields_name)
+
+    dst_block_indexes = dst_data_manager.append_columns(columns, block_types)
+    # positions in `columns` of the fields each new block holds
+    dst_block_columns = []
+    for bid in dst_block_indexes:
+        field_indexes = dst_data_manager.blocks[bid].field_indexes
+        dst_block_columns.append(
+            [columns.index(dst_data_manager.get_field_name(field_index)) for field_index in field_indexes]
+        )
+
+    _apply_func = functools.partial(
+        _apply,
+        func=func,
+        src_fields_name=fields_name,
+        src_fields_loc=fields_loc,
+        src_non_operable_blocks=non_operable_blocks,
+        ret_columns=columns,
+        dst_dm=dst_data_manager,
+        dst_block_indexes=dst_block_indexes,
+        dst_block_columns=dst_block_columns,
+    )
+
+    dst_block_table = df.block_table.mapValues(_apply_func)
+
+    return DataFrame(df._ctx, dst_block_table, df.partition_order_mappings, dst_data_manager)
+
+
+def _apply(
+    blocks,
+    func=None,
+    src_fields_name=None,
+    src_fields_loc=None,
+    src_non_operable_blocks=None,
+    ret_columns=None,
+    dst_dm: "DataManager" = None,
+    dst_block_indexes=None,
+    dst_block_columns=None,
+):
+    # columns are views into the blocks, nothing is copied before func runs
+    batch = {name: blocks[bid][:, offset] for name, (bid, offset) in zip(src_fields_name, src_fields_loc)}
+    num_rows = len(blocks[0])
+
+    apply_ret = _to_columns(func(batch), ret_columns, num_rows)
+
+    ret_blocks = [None] * (len(src_non_operable_blocks) + len(dst_block_indexes))
+    for idx, bid in enumerate(src_non_operable_blocks):
+        ret_blocks[idx] = blocks[bid]
+
+    for bid, column_indexes in zip(dst_block_indexes, dst_block_columns):
+        block_columns = [apply_ret[column_index] for column_index in column_indexes]
+        if all(isinstance(column, torch.Tensor) for column in block_columns):
+            block = torch.hstack(block_columns)
+        else:
+            block = np.hstack([np.asarray(column) for column in block_columns])
+        ret_blocks[bid] = dst_dm.blocks[bid].convert_block(block)
+
+    return ret_blocks
+
+
+def _to_columns(ret, columns, num_rows):
+    if isinstance(ret, dict):
+        missing = [column for column in columns if column not in ret]
+        if missing:
+            raise ValueError(f"apply_batch func does not return declared columns {missing}")
+        ret_columns = [ret[column] for column in columns]
+    elif isinstance(ret, (torch.Tensor, np.ndarray)):
+        if ret.ndim == 1:
+            ret = ret.reshape(-1, 1)
+        if ret.shape[1] != len(columns):
+            raise ValueError(f"apply_batch func returns {ret.shape[1]} columns, but {len(columns)} are declared")
+        ret_columns = [ret[:, i] for i in range(ret.shape[1])]
+    else:
+        raise ValueError(f"apply_batch func should return a dict, tensor or ndarray, got {type(ret)}")
+
+    ret_columns = [column.reshape(-1, 1) if column.ndim == 1 else column for column in ret_columns]
+    for column, name in zip(ret_columns, columns):
+        if column.shape != (num_rows, 1):
+            raise ValueError(
+                f"column `{name}` of apply_batch has shape {tuple(column.shape)}, expected ({num_rows}, 1)"
+            )
+
+    return ret_columns
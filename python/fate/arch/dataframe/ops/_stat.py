@@ -111,47 +111,9 @@ def mean(df: "DataFrame") -> "pd.Series":
 def var(df: "DataFrame", ddof=1) -> "pd.Series":
     data_manager = df.data_manager
     operable_blocks = data_manager.infer_operable_blocks()
-    n = df.shape[0]
-
-    def _mapper(blocks, op_bids):
-        ret = []
-        for bid in op_bids:
-            block = blocks[bid]
-            if isinstance(block, torch.Tensor):
-                ret.append(
-                    (
-                        torch.sum(torch.square(block), dim=0, keepdim=True),
-                        torch.sum(block, dim=0, keepdim=True),
-                    )
-                )
-            else:
-                ret.append((np.sum(np.square(block), axis=0), np.sum(block, axis=0)))
+    reduce_ret = _moments(df, operable_blocks)
 
-        return ret
-
-    def _reducer(blocks1, block2):
-        ret = []
-        for block1, block2 in zip(blocks1, block2):
-            if isinstance(block1, torch.Tensor):
-                ret.append((torch.add(block1[0], block2[0]), torch.add(block1[1], block2[1])))
-            else:
-                ret.append((np.add(block1[0], block2[0]), np.add(block1[1], block2[1])))
-
-        return ret
-
-    mapper_func = functools.partial(_mapper, op_bids=operable_blocks)
-    reduce_ret = df.block_table.mapValues(mapper_func).reduce(_reducer)
-
-    ret_blocks = []
-    for lhs, rhs in reduce_ret:
-        if isinstance(lhs, torch.Tensor):
-            rhs = torch.mul(torch.square(torch.div(rhs, n)), n)
-            ret_blocks.append(torch.div(torch.sub(lhs, rhs), n - ddof))
-        else:
-            rhs = np.mul(np.square(np.div(rhs, n)), n)
-            ret_blocks.append(np.div(np.sub(lhs, rhs), n - ddof))
-
-    return _post_process(ret_blocks, operable_blocks, data_manager)
+    return _post_process([_var(moments, ddof) for moments in reduce_ret], operable_blocks, data_manager)
 
 
 def std(df: "DataFrame", ddof=1) -> "pd.Series":
@@ -166,22 +128,10 @@ def skew(df: "DataFrame", unbiased=False):
         field_names = data_manager.infer_operable_field_names()
         return pd.Series([np.nan for _ in range(len(field_names))], index=field_names)
 
-    _mean = mean(df)
-    m1 = df - _mean
-    m2 = (m1**2).mean()
-    m3 = (m1**3).mean()
-
-    """
-    if abs(value) in m2 < eps=1e-14, we regard it as 0, but eps=1e-14 should be global instead of this file.
-    """
-    non_zero_mask = abs(m2) >= FLOATING_POINT_ZERO
-    m3[~non_zero_mask] = 0
-    m2[~non_zero_mask] = 1
+    operable_blocks = data_manager.infer_operable_blocks()
+    reduce_ret = _moments(df, operable_blocks)
 
-    if unbiased:
-        return (n * (n - 1)) ** 0.5 / (n - 2) * (m3 / m2**1.5)
-    else:
-        return m3 / m2**1.5
+    return _post_process([_skew(moments, unbiased) for moments in reduce_ret], operable_blocks, data_manager)
 
 
 def kurt(df: "DataFrame", unbiased=False):
@@ -191,43 +141,168 @@ def kurt(df: "DataFrame", unbiased=False):
         field_names = data_manager.infer_operable_field_names()
         return pd.Series([np.nan for _ in range(len(field_names))], index=field_names)
 
-    _mean = mean(df)
-    m1 = df - _mean
-    m2 = m1**2
-    m4 = m2**2
-    m2 = m2.mean()
-    m4 = m4.mean()
+    operable_blocks = data_manager.infer_operable_blocks()
+    reduce_ret = _moments(df, operable_blocks)
 
-    non_zero_mask = abs(m2) >= FLOATING_POINT_ZERO
-    m4[~non_zero_mask] = 0
-    m2[~non_zero_mask] = 1
-
-    if unbiased:
-        return (n - 1) / ((n - 2) * (n - 3)) * ((n + 1) * m4 / m2**2 - 3 * (n - 1))
-    else:
-        return m4 / m2**4 - 3
+    return _post_process([_kurt(moments, unbiased) for moments in reduce_ret], operable_blocks, data_manager)
 
 
 def variation(df: "DataFrame", ddof=1):
-    return std(df, ddof=ddof) / mean(df)
+    data_manager = df.data_manager
+    operable_blocks = data_manager.infer_operable_blocks()
+    reduce_ret = _moments(df, operable_blocks)
+
+    return _post_process(
+        [torch.sqrt(_var(moments, ddof)) / _mean(moments) for moments in reduce_ret], operable_blocks, data_manager
+    )
 
 
 def describe(df: "DataFrame", ddof=1, unbiased=False):
+    """
+    all metrics are derived from the moments of a single pass over the table
+    """
+    data_manager = df.data_manager
+    operable_blocks = data_manager.infer_operable_blocks()
+    n = df.shape[0]
+    reduce_ret = _moments(df, operable_blocks)
+
+    def _stat(func):
+        return _post_process([func(moments) for moments in reduce_ret], operable_blocks, data_manager)
+
+    def _nan_stat():
+        field_names = data_manager.infer_operable_field_names()
+        return pd.Series([np.nan for _ in range(len(field_names))], index=field_names)
+
     stat_metrics = dict()
-    stat_metrics["sum"] = sum(df)
-    stat_metrics["min"] = min(df)
-    stat_metrics["max"] = max(df)
-    stat_metrics["mean"] = mean(df)
-    stat_metrics["std"] = std(df, ddof=ddof)
-    stat_metrics["var"] = var(df, ddof=ddof)
-    stat_metrics["variation"] = variation(df, ddof=ddof)
-    stat_metrics["skew"] = skew(df, unbiased=unbiased)
-    stat_metrics["kurt"] = kurt(df, unbiased=unbiased)
-    stat_metrics["na_count"] = df.isna().sum()
+    stat_metrics["sum"] = _stat(lambda moments: moments[2])
+    stat_metrics["min"] = _stat(lambda moments: moments[3])
+    stat_metrics["max"] = _stat(lambda moments: moments[4])
+    stat_metrics["mean"] = _stat(_mean)
+    stat_metrics["std"] = _stat(lambda moments: torch.sqrt(_var(moments, ddof)))
+    stat_metrics["var"] = _stat(lambda moments: _var(moments, ddof))
+    stat_metrics["variation"] = _stat(lambda moments: torch.sqrt(_var(moments, ddof)) / _mean(moments))
+    stat_metrics["skew"] = _nan_stat() if unbiased and n < 3 else _stat(lambda moments: _skew(moments, unbiased))
+    stat_metrics["kurt"] = _nan_stat() if unbiased and n < 4 else _stat(lambda moments: _kurt(moments, unbiased))
+    stat_metrics["na_count"] = _stat(lambda moments: moments[1])
 
     return pd.DataFrame(stat_metrics)
 
 
+def _moments(df: "DataFrame", operable_blocks):
+    """
+    per operable block, reduce (count, na_count, sum, min, max, mean, m2, m3, m4) of its columns in one pass,
+    where m2, m3 and m4 are sums of powers of deviations from the mean, merged pairwise across partitions.
+    """
+
+    def _mapper(blocks, op_bids):
+        return [_block_moments(blocks[bid]) for bid in op_bids]
+
+    def _reducer(blocks1, blocks2):
+        return [_merge_moments(moments1, moments2) for moments1, moments2 in zip(blocks1, blocks2)]
+
+    mapper_func = functools.partial(_mapper, op_bids=operable_blocks)
+
+    return df.block_table.mapValues(mapper_func).reduce(_reducer)
+
+
+def _block_moments(block):
+    if isinstance(block, torch.Tensor):
+        block = block.to(torch.float64)
+    else:
+        block = torch.from_numpy(np.asarray(block, dtype=np.float64))
+
+    n = block.shape[0]
+    block_mean = block.mean(dim=0)
+    deviation = block - block_mean
+    square_deviation = torch.square(deviation)
+    return (
+        n,
+        torch.isnan(block).sum(dim=0),
+        block.sum(dim=0),
+        block.min(dim=0).values,
+        block.max(dim=0).values,
+        block_mean,
+        square_deviation.sum(dim=0),
+        (square_deviation * deviation).sum(dim=0),
+        torch.square(square_deviation).sum(dim=0),
+    )
+
+
+def _merge_moments(moments1, moments2):
+    n1, na_count1, sum1, min1, max1, mean1, m2_1, m3_1, m4_1 = moments1
+    n2, na_count2, sum2, min2, max2, mean2, m2_2, m3_2, m4_2 = moments2
+    if n1 == 0:
+        return moments2
+    if n2 == 0:
+        return moments1
+
+    # pairwise update of Chan et al., stable against the cancellation of sum-of-powers formulas
+    n = n1 + n2
+    delta = mean2 - mean1
+    delta_n = delta / n
+    m2 = m2_1 + m2_2 + delta * delta_n * n1 * n2
+    m3 = m3_1 + m3_2 + delta * torch.square(delta_n) * n1 * n2 * (n1 - n2) + 3 * delta_n * (n1 * m2_2 - n2 * m2_1)
+    m4 = (
+        m4_1
+        + m4_2
+        + delta * torch.pow(delta_n, 3) * n1 * n2 * (n1 * n1 - n1 * n2 + n2 * n2)
+        + 6 * torch.square(delta_n) * (n1 * n1 * m2_2 + n2 * n2 * m2_1)
+        + 4 * delta_n * (n1 * m3_2 - n2 * m3_1)
+    )
+    return (
+        n,
+        na_count1 + na_count2,
+        sum1 + sum2,
+        torch.minimum(min1, min2),
+        torch.maximum(max1, max2),
+        mean1 + delta_n * n2,
+        m2,
+        m3,
+        m4,
+    )
+
+
+def _mean(moments):
+    return moments[2] / moments[0]
+
+
+def _var(moments, ddof):
+    return moments[6] / (moments[0] - ddof)
+
+
+def _skew(moments, unbiased):
+    n = moments[0]
+    m2 = moments[6] / n
+    m3 = moments[7] / n
+
+    """
+    if abs(value) in m2 < eps=1e-14, we regard it as 0, but eps=1e-14 should be global instead of this file.
+    """
+    non_zero_mask = torch.abs(m2) >= FLOATING_POINT_ZERO
+    m3 = torch.where(non_zero_mask, m3, torch.zeros_like(m3))
+    m2 = torch.where(non_zero_mask, m2, torch.ones_like(m2))
+
+    if unbiased:
+        return (n * (n - 1)) ** 0.5 / (n - 2) * (m3 / m2**1.5)
+    else:
+        return m3 / m2**1.5
+
+
+def _kurt(moments, unbiased):
+    n = moments[0]
+    m2 = moments[6] / n
+    m4 = moments[8] / n
+
+    non_zero_mask = torch.abs(m2) >= FLOATING_POINT_ZERO
+    m4 = torch.where(non_zero_mask, m4, torch.zeros_like(m4))
+    m2 = torch.where(non_zero_mask, m2, torch.ones_like(m2))
+
+    if unbiased:
+        return (n - 1) / ((n - 2) * (n - 3)) * ((n + 1) * m4 / m2**2 - 3 * (n - 1))
+    else:
+        return m4 / m2**2 - 3
+
+
 def _post_process(reduce_ret, operable_blocks, data_manager: "DataManager") -> "pd.Series":
     field_names = data_manager.infer_operable_field_names()
     field_indexes = [data_manager.get_field_offset(name) for name in field_names]
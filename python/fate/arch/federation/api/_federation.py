@@ -14,14 +14,18 @@
 #  limitations under the License.
 
 import logging
+import queue
+import threading
 import typing
-from typing import List
+from concurrent.futures import Future
+from typing import Any, Callable, Iterator, List, Optional, Tuple
 
 from fate.arch.trace import (
     federation_push_table_trace,
     federation_pull_table_trace,
     federation_push_bytes_trace,
     federation_pull_bytes_trace,
+    federation_pull_bytes_as_completed_trace,
 )
 from ._table_meta import TableMeta
 from ._type import PartyMeta
@@ -42,6 +46,9 @@ class Federation:
         self._parties = parties
         self._push_history = set()
         self._pull_history = set()
+        self._push_queue = None
+        self._push_queue_lock = threading.Lock()
+        self._transfer_hooks = []
 
     def get_default_max_message_size(self):
         from fate.arch.config import cfg
@@ -86,6 +93,15 @@ class Federation:
     ) -> List[bytes]:
         raise NotImplementedError(f"pull bytes is not supported in {self.__class__.__name__}")
 
+    def _pull_bytes_as_completed(
+        self,
+        name: str,
+        tag: str,
+        parties: List[PartyMeta],
+    ) -> Iterator[Tuple[int, bytes]]:
+        # backends without a way to wait on any party pull all parties at once, then yield them in order
+        yield from enumerate(self._pull_bytes(name=name, tag=tag, parties=parties))
+
     def _push_table(
         self,
         table: "KVTable",
@@ -108,8 +124,66 @@ class Federation:
         raise NotImplementedError(f"destroy is not supported in {self.__class__.__name__}")
 
     def destroy(self):
+        try:
+            self.wait_pushes()
+        finally:
+            if self._push_queue is not None:
+                self._push_queue.close()
+                self._push_queue = None
         self._destroy()
 
+    def submit_push(self, fn: Callable[[], Any]) -> Future:
+        """
+        run push function `fn`, in a background thread if async push is enabled.
+
+        pushes run one at a time in submission order, so values sent with the same tag keep their order.
+        """
+        self.run_transfer_hooks()
+        push_queue = self._get_push_queue()
+        if push_queue is None:
+            future = Future()
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            return future
+        return push_queue.submit(fn)
+
+    def wait_pushes(self):
+        """
+        wait for pending async pushes, raise the first error occurred since last wait if any
+        """
+        self.run_transfer_hooks()
+        if self._push_queue is not None:
+            self._push_queue.join()
+
+    def add_transfer_hook(self, hook: Callable[[], None]):
+        """
+        add `hook` to run on the calling thread before each push and before waiting for pushes ahead of pulls,
+        so that messages buffered outside of federation, e.g. coalesced mpc messages, are sent first
+        """
+        self._transfer_hooks.append(hook)
+
+    def remove_transfer_hook(self, hook: Callable[[], None]):
+        if hook in self._transfer_hooks:
+            self._transfer_hooks.remove(hook)
+
+    def run_transfer_hooks(self):
+        for hook in list(self._transfer_hooks):
+            hook()
+
+    def _get_push_queue(self) -> Optional["_PushQueue"]:
+        if self._push_queue is None:
+            from fate.arch.config import cfg
+
+            if not cfg.federation.async_push.enable:
+                return None
+            with self._push_queue_lock:
+                if self._push_queue is None:
+                    self._push_queue = _PushQueue(cfg.federation.async_push.max_pending)
+        return self._push_queue
+
     @federation_push_table_trace
     def push_table(
         self,
@@ -189,3 +263,64 @@ class Federation:
             tag=tag,
             parties=parties,
         )
+
+    @federation_pull_bytes_as_completed_trace
+    def pull_bytes_as_completed(
+        self,
+        name: str,
+        tag: str,
+        parties: List[PartyMeta],
+    ) -> Iterator[Tuple[int, bytes]]:
+        """
+        pull bytes from parties, yield `(index, bytes)` pairs as soon as each party's bytes arrive,
+        where index is the position of the party in `parties`
+        """
+        for party in parties:
+            if (name, tag, party) in self._pull_history:
+                raise ValueError(f"pull bytes from {party} with duplicate name and tag: name={name}, tag={tag}")
+            self._pull_history.add((name, tag, party))
+        return self._pull_bytes_as_completed(
+            name=name,
+            tag=tag,
+            parties=parties,
+        )
+
+
+class _PushQueue:
+    def __init__(self, max_pending: int):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._errors = []
+        self._thread = threading.Thread(target=self._run, name="federation-push", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable[[], Any]) -> Future:
+        future = Future()
+        # blocks when `max_pending` pushes are queued
+        self._queue.put((future, fn))
+        return future
+
+    def join(self):
+        self._queue.join()
+        if self._errors:
+            error, self._errors = self._errors[0], []
+            raise error
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            future, fn = item
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn())
+                except BaseException as e:
+                    logger.exception(f"async push failed: {e}")
+                    self._errors.append(e)
+                    future.set_exception(e)
+            self._queue.task_done()
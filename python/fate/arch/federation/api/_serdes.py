@@ -12,10 +12,12 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import functools
 import io
 import logging
 import pickle
 import struct
+import time
 import typing
 from typing import Any, List, Tuple, TypeVar
 
@@ -30,6 +32,7 @@ if typing.TYPE_CHECKING:
     from fate.arch.context import Context
     from fate.arch.federation.api import Federation
     from fate.arch.computing.api import KVTableContext, KVTable
+    from fate.arch.trace._profile import _FederationTimer
     import torch
     import numpy as np
 
@@ -80,52 +83,212 @@ class _ContextPersistentId:
 
 
 class _TorchSafeTensorPersistentId:
-    def __init__(self, bytes) -> None:
+    def __init__(self, bytes, codec_type=0, shuffle=0) -> None:
         self.bytes = bytes
+        self.codec_type = codec_type
+        self.shuffle = shuffle
 
     @staticmethod
-    def dump(_pickler: "TableRemotePersistentPickler", obj: "torch.Tensor") -> Any:
+    def dump(pickler: "TableRemotePersistentPickler", obj: "torch.Tensor") -> Any:
         import torch
         import safetensors.torch
 
         assert isinstance(obj, torch.Tensor)
         tensor_bytes = safetensors.torch.save({"t": obj})
-        return _TorchSafeTensorPersistentId(tensor_bytes)
+        itemsize = obj.element_size() if obj.is_floating_point() else 0
+        return _TorchSafeTensorPersistentId(*pickler._compress_tensor(tensor_bytes, itemsize))
 
     def load(self, _unpickler: "TableRemotePersistentUnpickler"):
         import safetensors.torch
 
-        return safetensors.torch.load(self.bytes)["t"]
+        # ids pushed by peers without codec support carry no codec fields
+        tensor_bytes = _FederationCodec.decompress_tensor(
+            self.bytes, getattr(self, "codec_type", 0), getattr(self, "shuffle", 0)
+        )
+        return safetensors.torch.load(tensor_bytes)["t"]
 
 
 class _NumpySafeTensorPersistentId:
-    def __init__(self, bytes) -> None:
+    def __init__(self, bytes, codec_type=0, shuffle=0) -> None:
         self.bytes = bytes
+        self.codec_type = codec_type
+        self.shuffle = shuffle
 
     @staticmethod
-    def dump(_pickler: "TableRemotePersistentPickler", obj: "np.ndarray") -> Any:
+    def dump(pickler: "TableRemotePersistentPickler", obj: "np.ndarray") -> Any:
         import numpy as np
         import safetensors.numpy
 
         assert isinstance(obj, np.ndarray)
         if obj.dtype != np.dtype("object"):
             tensor_bytes = safetensors.numpy.save({"n": obj})
-            return _NumpySafeTensorPersistentId(tensor_bytes)
+            itemsize = obj.dtype.itemsize if obj.dtype.kind == "f" else 0
+            return _NumpySafeTensorPersistentId(*pickler._compress_tensor(tensor_bytes, itemsize))
 
     def load(self, _unpickler: "TableRemotePersistentUnpickler"):
         import safetensors.numpy
 
-        return safetensors.numpy.load(self.bytes)["n"]
+        tensor_bytes = _FederationCodec.decompress_tensor(
+            self.bytes, getattr(self, "codec_type", 0), getattr(self, "shuffle", 0)
+        )
+        return safetensors.numpy.load(tensor_bytes)["n"]
+
+
+_NO_CODEC = 0
+_CODEC_TYPES = {"none": _NO_CODEC, "zlib": 1, "lz4": 2, "zstd": 3}
+
+
+class _FederationCodec:
+    """
+    compression applied to pushed objects, the codec type is sent along with the compressed bytes.
+
+    float tensors are byte-shuffled before compression, and streams holding ciphertexts are sent as is,
+    since ciphertexts are incompressible.
+    """
+
+    def __init__(self, codec: str = "none", level: int = 1, min_size: int = 0, shuffle_float_tensors: bool = True):
+        if codec not in _CODEC_TYPES:
+            raise ValueError(f"invalid federation compression codec: {codec}, expected one of {list(_CODEC_TYPES)}")
+        self._codec_type = _CODEC_TYPES[codec]
+        self._level = level
+        self._min_size = min_size
+        self._shuffle_float_tensors = shuffle_float_tensors
+
+    @classmethod
+    def from_config(cls):
+        return cls(
+            codec=cfg.federation.compression.codec,
+            level=cfg.federation.compression.level,
+            min_size=cfg.federation.compression.min_size,
+            shuffle_float_tensors=cfg.federation.compression.shuffle_float_tensors,
+        )
+
+    @property
+    def enabled(self):
+        return self._codec_type != _NO_CODEC
+
+    @property
+    def min_size(self):
+        return self._min_size
+
+    def compress(self, data: bytes) -> Tuple[int, bytes]:
+        if not self.enabled or len(data) < self._min_size:
+            return _NO_CODEC, data
+        compressed = _compress(self._codec_type, self._level, data)
+        # keep the raw bytes if they do not shrink
+        if len(compressed) >= len(data):
+            return _NO_CODEC, data
+        return self._codec_type, compressed
+
+    def compress_tensor(self, tensor_bytes: bytes, itemsize: int) -> Tuple[bytes, int, int]:
+        if not self.enabled or len(tensor_bytes) < self._min_size:
+            return tensor_bytes, _NO_CODEC, 0
+        shuffle = itemsize if self._shuffle_float_tensors and itemsize > 1 else 0
+        shuffled = _shuffle_safetensors_data(tensor_bytes, shuffle, unshuffle=False) if shuffle else tensor_bytes
+        codec_type, compressed = self.compress(shuffled)
+        if codec_type == _NO_CODEC:
+            return tensor_bytes, _NO_CODEC, 0
+        return compressed, codec_type, shuffle
+
+    @staticmethod
+    def decompress(codec_type: int, data: bytes) -> bytes:
+        if codec_type == _NO_CODEC:
+            return data
+        return _decompress(codec_type, data)
+
+    @classmethod
+    def decompress_tensor(cls, data: bytes, codec_type: int, shuffle: int) -> bytes:
+        tensor_bytes = cls.decompress(codec_type, data)
+        if shuffle:
+            tensor_bytes = _shuffle_safetensors_data(tensor_bytes, shuffle, unshuffle=True)
+        return tensor_bytes
+
+
+def _compress(codec_type: int, level: int, data: bytes) -> bytes:
+    if codec_type == 1:
+        import zlib
+
+        return zlib.compress(data, level)
+    if codec_type == 2:
+        import lz4.frame
+
+        return lz4.frame.compress(data, compression_level=level)
+    if codec_type == 3:
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    raise ValueError(f"invalid codec type: {codec_type}")
+
+
+def _decompress(codec_type: int, data: bytes) -> bytes:
+    if codec_type == 1:
+        import zlib
+
+        return zlib.decompress(data)
+    if codec_type == 2:
+        import lz4.frame
+
+        return lz4.frame.decompress(data)
+    if codec_type == 3:
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"invalid codec type: {codec_type}")
+
+
+def _shuffle_safetensors_data(tensor_bytes: bytes, itemsize: int, unshuffle: bool) -> bytes:
+    # safetensors layout: 8 bytes little endian header size, json header, then the raw tensor data
+    import numpy as np
+
+    data_offset = 8 + int.from_bytes(tensor_bytes[:8], "little")
+    data = np.frombuffer(tensor_bytes, dtype=np.uint8, offset=data_offset)
+    if data.size % itemsize:
+        raise ValueError(f"tensor data of {data.size} bytes could not be shuffled by itemsize {itemsize}")
+    if unshuffle:
+        data = data.reshape(itemsize, -1).T
+    else:
+        data = data.reshape(-1, itemsize).T
+    return tensor_bytes[:data_offset] + data.tobytes()
+
+
+@functools.lru_cache(maxsize=None)
+def _phe_tensor_type():
+    # imported on first use, fate.arch.tensor imports federation
+    from fate.arch.tensor.phe import PHETensor
+
+    return PHETensor
+
+
+def _is_ciphertext(obj) -> bool:
+    if isinstance(obj, _phe_tensor_type()):
+        return True
+    # ciphertext vectors of fate_utils, e.g. `fate_utils.paillier.CiphertextVector`
+    cls = type(obj)
+    return "Ciphertext" in cls.__name__ and cls.__module__.startswith("fate_utils")
 
 
 class _FederationBytesCoder:
+    """
+    modes 0 and 1 carry uncompressed bytes, directly or split into a slice table.
+    modes 2 and 3 are their compressed counterparts, with the codec type following the mode.
+    mode 4 announces bytes pushed in chunks, with the codec type following the mode.
+    """
+
     @staticmethod
-    def encode_base(v: bytes) -> bytes:
-        return struct.pack("!B", 0) + v
+    def encode_base(v: bytes, codec_type: int = _NO_CODEC) -> bytes:
+        if codec_type == _NO_CODEC:
+            return struct.pack("!B", 0) + v
+        return struct.pack("!BB", 2, codec_type) + v
 
     @staticmethod
-    def encode_split(slice_table_meta: "TableMeta", total_size: int, num_slice: int, slice_size: int) -> bytes:
-        return struct.pack("!B", 1) + struct.pack(
+    def encode_split(
+        slice_table_meta: "TableMeta", total_size: int, num_slice: int, slice_size: int, codec_type: int = _NO_CODEC
+    ) -> bytes:
+        if codec_type == _NO_CODEC:
+            prefix = struct.pack("!B", 1)
+        else:
+            prefix = struct.pack("!BB", 3, codec_type)
+        return prefix + struct.pack(
             "!IIIIIII",
             total_size,
             num_slice,
@@ -136,13 +299,27 @@ class _FederationBytesCoder:
             slice_table_meta.partitioner_type,
         )
 
+    @staticmethod
+    def encode_chunked(total_size: int, num_chunks: int, chunk_size: int, codec_type: int = _NO_CODEC) -> bytes:
+        return struct.pack("!BBQII", 4, codec_type, total_size, num_chunks, chunk_size)
+
     @classmethod
     def decode_mode(cls, v: bytes) -> int:
         return struct.unpack("!B", v[:1])[0]
 
+    @classmethod
+    def decode_codec_type(cls, v: bytes) -> int:
+        if cls.decode_mode(v) in {2, 3, 4}:
+            return struct.unpack("!B", v[1:2])[0]
+        return _NO_CODEC
+
+    @classmethod
+    def _header_size(cls, v: bytes) -> int:
+        return 1 if cls.decode_mode(v) in {0, 1} else 2
+
     @classmethod
     def decode_base(cls, v: bytes) -> bytes:
-        return v[1:]
+        return v[cls._header_size(v) :]
 
     @classmethod
     def decode_split(cls, v: bytes) -> Tuple["TableMeta", int, int, int]:
@@ -154,7 +331,7 @@ class _FederationBytesCoder:
             key_serdes_type,
             value_serdes_type,
             partitioner_type,
-        ) = struct.unpack("!IIIIIII", v[1:29])
+        ) = struct.unpack_from("!IIIIIII", v, cls._header_size(v))
         table_meta = TableMeta(
             num_partitions=num_partitions,
             key_serdes_type=key_serdes_type,
@@ -163,12 +340,21 @@ class _FederationBytesCoder:
         )
         return table_meta, total_size, num_slice, slice_size
 
+    @classmethod
+    def decode_chunked(cls, v: bytes) -> Tuple[int, int, int]:
+        total_size, num_chunks, chunk_size = struct.unpack_from("!QII", v, cls._header_size(v))
+        return total_size, num_chunks, chunk_size
+
 
 class _SplitTableUtil:
     @staticmethod
     def get_split_table_key(name):
         return f"{name}__table_persistent_split__"
 
+    @staticmethod
+    def get_chunk_key(name, index):
+        return f"{name}__chunk_{index}__"
+
 
 class TableRemotePersistentPickler(pickle.Pickler):
     def __init__(
@@ -178,11 +364,15 @@ class TableRemotePersistentPickler(pickle.Pickler):
         tag: str,
         parties: List[PartyMeta],
         f,
+        codec: "_FederationCodec" = None,
     ) -> None:
         self._federation = federation
         self._name = name
         self._tag = tag
         self._parties = parties
+        self._codec = codec if codec is not None else _FederationCodec()
+        self._has_ciphertext = False
+        self._encoded_tensor_bytes = 0
 
         self._tables = {}
         self._table_index = 0
@@ -210,6 +400,16 @@ class TableRemotePersistentPickler(pickle.Pickler):
         if isinstance(obj, np.ndarray) and obj.dtype != np.dtype("object"):
             return _NumpySafeTensorPersistentId.dump(self, obj)
 
+        if self._codec.enabled and not self._has_ciphertext and _is_ciphertext(obj):
+            self._has_ciphertext = True
+
+    def _compress_tensor(self, tensor_bytes: bytes, itemsize: int):
+        compressed, codec_type, shuffle = self._codec.compress_tensor(tensor_bytes, itemsize)
+        if self._codec.enabled and len(tensor_bytes) >= self._codec.min_size:
+            # whether compressed or left as is because they do not shrink, these bytes are not worth compressing again
+            self._encoded_tensor_bytes += len(compressed)
+        return compressed, codec_type, shuffle
+
     def _push_table(self, table, key):
         self._federation.push_table(table=table, name=key, tag=self._tag, parties=self._parties)
         self._table_index += 1
@@ -226,43 +426,93 @@ class TableRemotePersistentPickler(pickle.Pickler):
         parties: List[PartyMeta],
         max_message_size: int,
         num_partitions_of_slice_table: int,
+        timer: "_FederationTimer" = None,
     ):
+        codec = _FederationCodec.from_config()
+        start = time.perf_counter()
         with io.BytesIO() as f:
-            pickler = TableRemotePersistentPickler(federation, name, tag, parties, f)
+            pickler = TableRemotePersistentPickler(federation, name, tag, parties, f, codec=codec)
             pickler.dump(value)
-            if f.tell() > max_message_size:
-                total_size = f.tell()
-                num_slice = (total_size - 1) // max_message_size + 1
-                # create a table to store the slice
-                f.seek(0)
-                data = [(i, f.read(max_message_size)) for i in range(num_slice)]
-                slice_table = computing.parallelize(
-                    data,
-                    partition=num_partitions_of_slice_table,
-                    key_serdes_type=0,
-                    value_serdes_type=0,
-                    partitioner_type=0,
-                )
-                split_table_meta = TableMeta(
-                    num_partitions=num_partitions_of_slice_table,
-                    key_serdes_type=0,
-                    value_serdes_type=0,
-                    partitioner_type=0,
-                )
-                # push the slice table with a special key
-                federation.push_table(slice_table, _SplitTableUtil.get_split_table_key(name), tag=tag, parties=parties)
-                # push the slice table info
+            payload = f.getvalue()
+        raw_size = len(payload)
+        # ciphertexts are incompressible, and tensors already went through the codec when pickled,
+        # so the whole stream is compressed only when tensors do not make up most of it
+        if pickler._has_ciphertext or 2 * pickler._encoded_tensor_bytes >= raw_size:
+            codec_type = _NO_CODEC
+        else:
+            codec_type, payload = codec.compress(payload)
+        if timer is not None:
+            # tables embedded in the object are pushed while pickling, so their push time is included here
+            timer.add_serdes_time(time.perf_counter() - start)
+            timer.add_tables(pickler._table_index)
+        if len(payload) > max_message_size and cfg.federation.split_large_object.stream_chunks:
+            total_size = len(payload)
+            num_chunks = (total_size - 1) // max_message_size + 1
+            if timer is not None:
+                timer.add_bytes(raw_size, total_size, 1 + num_chunks)
+            federation.push_bytes(
+                v=_FederationBytesCoder.encode_chunked(
+                    total_size, num_chunks, max_message_size, codec_type=codec_type
+                ),
+                name=name,
+                tag=tag,
+                parties=parties,
+            )
+            # chunks are cut from a view of the payload, each is copied once into its message
+            view = memoryview(payload)
+            for i in range(num_chunks):
                 federation.push_bytes(
-                    v=_FederationBytesCoder.encode_split(split_table_meta, total_size, num_slice, max_message_size),
-                    name=name,
+                    v=bytes(view[i * max_message_size : (i + 1) * max_message_size]),
+                    name=_SplitTableUtil.get_chunk_key(name, i),
                     tag=tag,
                     parties=parties,
                 )
+        elif len(payload) > max_message_size:
+            total_size = len(payload)
+            num_slice = (total_size - 1) // max_message_size + 1
+            if timer is not None:
+                timer.add_bytes(raw_size, total_size, 1)
+                timer.add_tables(1)
+            # create a table to store the slice
+            view = memoryview(payload)
+            data = [(i, bytes(view[i * max_message_size : (i + 1) * max_message_size])) for i in range(num_slice)]
+            num_partitions_of_slice_table = computing.suggest_num_partitions(
+                num_rows=num_slice, num_bytes=total_size, default=num_partitions_of_slice_table
+            )
+            slice_table = computing.parallelize(
+                data,
+                partition=num_partitions_of_slice_table,
+                key_serdes_type=0,
+                value_serdes_type=0,
+                partitioner_type=0,
+            )
+            split_table_meta = TableMeta(
+                num_partitions=num_partitions_of_slice_table,
+                key_serdes_type=0,
+                value_serdes_type=0,
+                partitioner_type=0,
+            )
+            # push the slice table with a special key
+            federation.push_table(slice_table, _SplitTableUtil.get_split_table_key(name), tag=tag, parties=parties)
+            # push the slice table info
+            federation.push_bytes(
+                v=_FederationBytesCoder.encode_split(
+                    split_table_meta, total_size, num_slice, max_message_size, codec_type=codec_type
+                ),
+                name=name,
+                tag=tag,
+                parties=parties,
+            )
 
-            else:
-                federation.push_bytes(
-                    v=_FederationBytesCoder.encode_base(f.getvalue()), name=name, tag=tag, parties=parties
-                )
+        else:
+            if timer is not None:
+                timer.add_bytes(raw_size, len(payload), 1)
+            federation.push_bytes(
+                v=_FederationBytesCoder.encode_base(payload, codec_type=codec_type),
+                name=name,
+                tag=tag,
+                parties=parties,
+            )
 
 
 class TableRemotePersistentUnpickler(pickle.Unpickler):
@@ -294,9 +544,12 @@ class TableRemotePersistentUnpickler(pickle.Unpickler):
         self._name = name
         self._tag = tag
         self._party = party
+        self._num_tables = 0
         super().__init__(f)
 
     def persistent_load(self, pid: Any) -> Any:
+        if isinstance(pid, _TablePersistentId):
+            self._num_tables += 1
         if isinstance(
             pid,
             (
@@ -341,16 +594,19 @@ class TableRemotePersistentUnpickler(pickle.Unpickler):
         name: str,
         tag: str,
         party: PartyMeta,
+        timer: "_FederationTimer" = None,
     ):
         mode = _FederationBytesCoder.decode_mode(buffers)
-        if mode == 0:
-            with io.BytesIO(_FederationBytesCoder.decode_base(buffers)) as f:
-                unpickler = TableRemotePersistentUnpickler(ctx, federation, name, tag, party, f)
-                return unpickler.load()
-        elif mode == 1:
+        codec_type = _FederationBytesCoder.decode_codec_type(buffers)
+        if mode in {0, 2}:
+            payload = _FederationBytesCoder.decode_base(buffers)
+            wire_size = len(payload)
+            messages = 1
+        elif mode in {1, 3}:
             # get num_slice and slice_size
             table_meta, total_size, num_slice, slice_size = _FederationBytesCoder.decode_split(buffers)
 
+            start = time.perf_counter()
             # pull the slice table with a special key
             slice_table = federation.pull_table(
                 name=_SplitTableUtil.get_split_table_key(name), tag=tag, parties=[party], table_metas=[table_meta]
@@ -360,8 +616,37 @@ class TableRemotePersistentUnpickler(pickle.Unpickler):
                 for i, b in slice_table.collect():
                     f.seek(i * slice_size)
                     f.write(b)
-                f.seek(0)
-                unpickler = TableRemotePersistentUnpickler(ctx, federation, name, tag, party, f)
-                return unpickler.load()
+                payload = f.getvalue()
+            if timer is not None:
+                timer.add_wait_time(time.perf_counter() - start)
+                timer.add_tables(1)
+            wire_size = total_size
+            messages = 1
+        elif mode == 4:
+            total_size, num_chunks, chunk_size = _FederationBytesCoder.decode_chunked(buffers)
+            start = time.perf_counter()
+            # chunks are written into a preallocated buffer as they are pulled
+            payload = bytearray(total_size)
+            view = memoryview(payload)
+            for i in range(num_chunks):
+                chunk = federation.pull_bytes(name=_SplitTableUtil.get_chunk_key(name, i), tag=tag, parties=[party])[0]
+                view[i * chunk_size : i * chunk_size + len(chunk)] = chunk
+                del chunk
+            view.release()
+            if timer is not None:
+                timer.add_wait_time(time.perf_counter() - start)
+            wire_size = total_size
+            messages = 1 + num_chunks
         else:
             raise ValueError(f"invalid mode: {mode}")
+
+        start = time.perf_counter()
+        payload = _FederationCodec.decompress(codec_type, payload)
+        with io.BytesIO(payload) as f:
+            unpickler = TableRemotePersistentUnpickler(ctx, federation, name, tag, party, f)
+            value = unpickler.load()
+        if timer is not None:
+            timer.add_serdes_time(time.perf_counter() - start)
+            timer.add_bytes(len(payload), wire_size, messages)
+            timer.add_tables(unpickler._num_tables)
+        return value
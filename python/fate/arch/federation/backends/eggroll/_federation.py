@@ -86,6 +86,12 @@ class EggrollFederation(Federation):
 
         return [rtn[party] for party in parties]
 
+    def _pull_bytes_as_completed(self, name: str, tag: str, parties: List[PartyMeta]):
+        rs = self._rsc.load(name=name, tag=tag)
+        future_map = dict(zip(rs.pull(parties=parties), range(len(parties))))
+        for future in concurrent.futures.as_completed(future_map):
+            yield future_map[future], future.result()
+
     def _push_table(self, table: Table, name: str, tag: str, parties: List[PartyMeta]):
         rs = self._rsc.load(name=name, tag=tag)
         futures = rs.push_rp(table._rp, parties=parties)
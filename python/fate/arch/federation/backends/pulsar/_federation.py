@@ -418,6 +418,10 @@ class PulsarFederation(MessageQueueBasedFederation):
             extra_args=conf,
         )
 
+    def _release_channel(self, channel_info):
+        # cancel would close the pulsar clients, the subscribed consumer is kept warm for the next pull instead
+        return
+
     def _get_consume_message(self, channel_info):
         while True:
             message = channel_info.consume()
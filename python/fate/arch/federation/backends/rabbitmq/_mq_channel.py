@@ -112,6 +112,9 @@ class MQChannel(object):
         self._get_channel()
         return self._channel.cancel()
 
+    def close(self):
+        self._clear()
+
     def _get_channel(self):
         if self._check_alive():
             return
@@ -68,5 +68,8 @@ class StandaloneFederation(Federation):
 
         return [Table(r) if isinstance(r, standalone_raw.Table) else r for r in rtn]
 
+    def _pull_bytes_as_completed(self, name: str, tag: str, parties: List[PartyMeta]):
+        return self._federation.pull_bytes_as_completed(name=name, tag=tag, parties=parties)
+
     def _destroy(self):
         self._federation.destroy()
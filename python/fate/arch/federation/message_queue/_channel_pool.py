@@ -0,0 +1,73 @@
+#
+#  Copyright 2019 The FATE Authors. All Rights Reserved.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+import logging
+import threading
+import time
+import typing
+
+LOGGER = logging.getLogger(__name__)
+
+SEND = "send"
+RECEIVE = "receive"
+
+
+class ChannelPool(object):
+    """
+    keeps channels created by federation warm across push and pull calls, channels idle for more than
+    `idle_timeout` seconds are closed on the next access
+    """
+
+    def __init__(self, idle_timeout: float):
+        self._idle_timeout = idle_timeout
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, create: typing.Callable[[], typing.Any]):
+        now = time.monotonic()
+        with self._lock:
+            self._close_idle(now)
+            if key in self._channels:
+                channel, _ = self._channels[key]
+            else:
+                channel = create()
+            self._channels[key] = (channel, now)
+            return channel
+
+    def close_all(self):
+        with self._lock:
+            channels, self._channels = self._channels, {}
+        for channel, _ in channels.values():
+            _close_channel(channel)
+
+    def _close_idle(self, now):
+        if self._idle_timeout is None:
+            return
+        for key, (channel, last_used) in list(self._channels.items()):
+            if now - last_used > self._idle_timeout:
+                LOGGER.debug(f"closing idle channel: {channel}")
+                del self._channels[key]
+                _close_channel(channel)
+
+
+def _close_channel(channel):
+    close = getattr(channel, "close", None)
+    if close is None:
+        close = channel.cancel
+    try:
+        close()
+    except Exception as e:
+        LOGGER.debug(f"meet {e} when trying to close channel {channel}")
@@ -17,7 +17,11 @@
 
 import io
 import json
+import struct
 import sys
+import zlib
+
+_LENGTH = struct.Struct(">I")
 
 
 # Datastream is a wraper of StringIO, it receives kv pairs and dump it to json string
@@ -42,3 +46,53 @@ class Datastream(object):
     def clear(self):
         self._string.close()
         self.__init__()
+
+
+# BinaryDatastream receives kv pairs and packs them as length prefixed records, optionally compressed with zlib
+class BinaryDatastream(object):
+    def __init__(self, compress_level: int = 0):
+        self._compress_level = compress_level
+        self._pieces = []
+        self._size = 0
+
+    def get_size(self):
+        return self._size
+
+    def get_data(self):
+        data = b"".join(self._pieces)
+        if self._compress_level > 0:
+            data = zlib.compress(data, self._compress_level)
+        return data
+
+    def append(self, k: bytes, v: bytes):
+        self._pieces.append(_LENGTH.pack(len(k)))
+        self._pieces.append(k)
+        self._pieces.append(_LENGTH.pack(len(v)))
+        self._pieces.append(v)
+        self._size += 2 * _LENGTH.size + len(k) + len(v)
+
+    def clear(self):
+        self.__init__(self._compress_level)
+
+
+def decode_binary_batch(data: bytes, compressed: bool = False):
+    if compressed:
+        data = zlib.decompress(data)
+    view = memoryview(data)
+    offset, end = 0, len(view)
+    records = []
+    while offset < end:
+        (k_len,) = _LENGTH.unpack_from(view, offset)
+        offset += _LENGTH.size
+        k = bytes(view[offset : offset + k_len])
+        offset += k_len
+        (v_len,) = _LENGTH.unpack_from(view, offset)
+        offset += _LENGTH.size
+        v = bytes(view[offset : offset + v_len])
+        offset += v_len
+        records.append((k, v))
+    return records
+
+
+def decode_json_batch(data: bytes):
+    return [(bytes.fromhex(el["k"]), bytes.fromhex(el["v"])) for el in json.loads(data.decode())]
@@ -23,13 +23,17 @@ from typing import List
 
 from fate.arch.computing.api import KVTableContext
 from fate.arch.federation.api import Federation, PartyMeta, TableMeta
-from ._datastream import Datastream
+from ._channel_pool import RECEIVE, SEND, ChannelPool
+from ._datastream import BinaryDatastream, Datastream, decode_binary_batch, decode_json_batch
 from ._parties import Party
 
 LOGGER = logging.getLogger(__name__)
 
 _SPLIT_ = "^"
 
+_JSON_TABLE_FORMAT = "json"
+_BINARY_TABLE_FORMAT = "binary"
+
 
 class MessageQueueBasedFederation(Federation):
     def __init__(
@@ -45,7 +49,6 @@ class MessageQueueBasedFederation(Federation):
     ):
         self._mq = mq
         self._topic_map = {}
-        self._channels_map = {}
         self._message_cache = {}
         self._max_message_size = max_message_size
         if self._max_message_size is None:
@@ -54,6 +57,14 @@ class MessageQueueBasedFederation(Federation):
         self._conf = conf
         self.computing_session = computing_session
 
+        from fate.arch.config import cfg
+
+        self._table_format = cfg.federation.message_queue.table_format
+        if self._table_format not in {_JSON_TABLE_FORMAT, _BINARY_TABLE_FORMAT}:
+            raise ValueError(f"invalid message queue table_format: {self._table_format}")
+        self._table_compress_level = cfg.federation.message_queue.table_compress_level
+        self._channel_pool = ChannelPool(cfg.federation.message_queue.channel_idle_timeout)
+
         super().__init__(session_id, party, parties)
 
         # TODO: remove this
@@ -97,7 +108,7 @@ class MessageQueueBasedFederation(Federation):
         _parties = [Party(role=p[0], party_id=p[1]) for p in parties]
         rtn = []
         party_topic_infos = self._get_party_topic_infos_by_name(_parties, name)
-        channel_infos = self._get_channels(party_topic_infos=party_topic_infos)
+        channel_infos = self._get_channels(party_topic_infos=party_topic_infos, direction=RECEIVE)
         for i, info in enumerate(channel_infos):
             obj = self._receive_obj(info, name, tag)
             rtn.append(obj)
@@ -113,7 +124,7 @@ class MessageQueueBasedFederation(Federation):
     ):
         _parties = [Party(role=p[0], party_id=p[1]) for p in parties]
         party_topic_infos = self._get_party_topic_infos_by_name(_parties, name)
-        channel_infos = self._get_channels(party_topic_infos=party_topic_infos)
+        channel_infos = self._get_channels(party_topic_infos=party_topic_infos, direction=SEND)
         self._send_obj(name=name, tag=tag, data=v, channel_infos=channel_infos)
 
     def _pull_table(
@@ -166,6 +177,8 @@ class MessageQueueBasedFederation(Federation):
             mq=self._mq,
             max_message_size=self._max_message_size,
             conf=self._conf,
+            table_format=self._table_format,
+            compress_level=self._table_compress_level,
         )
         # noinspection PyProtectedMember
         table.mapPartitionsWithIndexNoSerdes(
@@ -200,14 +213,14 @@ class MessageQueueBasedFederation(Federation):
         topic_pair = self._topic_map[(party, topic_suffix)]
         return party, topic_suffix, topic_pair
 
-    def _get_channels(self, party_topic_infos):
+    def _get_channels(self, party_topic_infos, direction=SEND):
+        # pooled channels only serve one direction, so that a channel holds either a producer or a consumer
         channel_infos = []
         for e in party_topic_infos:
             for party, topic_suffix, topic_pair in e:
-                info = self._channels_map.get((party, topic_suffix))
-
-                if info is None:
-                    info = self._get_channel(
+                info = self._channel_pool.get(
+                    (party, topic_suffix, direction),
+                    lambda: self._get_channel(
                         topic_pair=topic_pair,
                         src_party_id=self.local_party[1],
                         src_role=self.local_party[0],
@@ -215,12 +228,22 @@ class MessageQueueBasedFederation(Federation):
                         dst_role=party.role,
                         mq=self._mq,
                         conf=self._conf,
-                    )
-
-                    self._channels_map[(party, topic_suffix)] = info
+                    ),
+                )
                 channel_infos.append(info)
         return channel_infos
 
+    def _release_channel(self, channel_info):
+        """
+        stop consuming from a pooled channel after receiving an object, the channel itself is kept for reuse
+        """
+        channel_info.cancel()
+
+    def destroy(self):
+        self.wait_pushes()
+        self._channel_pool.close_all()
+        super().destroy()
+
     def _get_channels_index(
         self,
         index,
@@ -257,17 +280,34 @@ class MessageQueueBasedFederation(Federation):
             LOGGER.debug(f"[federation._send_obj]properties:{properties}.")
             info.produce(body=data, properties=properties)
 
-    def _send_kv(self, name, tag, data, channel_infos, partition_size, partitions, message_key):
-        headers = json.dumps(
-            {
-                "partition_size": partition_size,
-                "partitions": partitions,
-                "message_key": message_key,
-            }
-        )
+    def _send_kv(
+        self,
+        name,
+        tag,
+        data,
+        channel_infos,
+        partition_size,
+        partitions,
+        message_key,
+        table_format=_JSON_TABLE_FORMAT,
+        compressed=False,
+    ):
+        header = {
+            "partition_size": partition_size,
+            "partitions": partitions,
+            "message_key": message_key,
+        }
+        # peers without binary support only read json batches, which carry no format field
+        if table_format == _BINARY_TABLE_FORMAT:
+            content_type = "application/octet-stream"
+            header["format"] = _BINARY_TABLE_FORMAT
+            header["compressed"] = compressed
+        else:
+            content_type = "application/json"
+        headers = json.dumps(header)
         for info in channel_infos:
             properties = {
-                "content_type": "application/json",
+                "content_type": content_type,
                 "app_id": info._dst_party_id,
                 "message_id": name,
                 "correlation_id": tag,
@@ -287,6 +327,8 @@ class MessageQueueBasedFederation(Federation):
         mq,
         max_message_size,
         conf: dict,
+        table_format=_JSON_TABLE_FORMAT,
+        compress_level=0,
     ):
         def _fn(index, kvs):
             return self._partition_send(
@@ -301,6 +343,8 @@ class MessageQueueBasedFederation(Federation):
                 mq=mq,
                 max_message_size=max_message_size,
                 conf=conf,
+                table_format=table_format,
+                compress_level=compress_level,
             )
 
         return _fn
@@ -318,6 +362,8 @@ class MessageQueueBasedFederation(Federation):
         mq,
         max_message_size,
         conf: dict,
+        table_format=_JSON_TABLE_FORMAT,
+        compress_level=0,
     ):
         channel_infos = self._get_channels_index(
             index=index,
@@ -328,30 +374,46 @@ class MessageQueueBasedFederation(Federation):
             conf=conf,
         )
 
-        datastream = Datastream()
+        binary = table_format == _BINARY_TABLE_FORMAT
+        datastream = BinaryDatastream(compress_level) if binary else Datastream()
+        compressed = binary and compress_level > 0
         base_message_key = str(index)
         message_key_idx = 0
         count = 0
 
+        def _get_data():
+            data = datastream.get_data()
+            return data if binary else data.encode()
+
         for k, v in kvs:
             count += 1
-            el = {"k": k.hex(), "v": v.hex()}
-            # roughly caculate the size of package to avoid serialization ;)
-            if datastream.get_size() + sys.getsizeof(el["k"]) + sys.getsizeof(el["v"]) >= max_message_size:
+            if binary:
+                # records are packed as is, the size is exact before compression
+                el_size = 8 + len(k) + len(v)
+            else:
+                el = {"k": k.hex(), "v": v.hex()}
+                # roughly caculate the size of package to avoid serialization ;)
+                el_size = sys.getsizeof(el["k"]) + sys.getsizeof(el["v"])
+            if datastream.get_size() + el_size >= max_message_size:
                 LOGGER.debug(f"[federation._partition_send]The size of message is: {datastream.get_size()}")
                 message_key_idx += 1
                 message_key = base_message_key + "_" + str(message_key_idx)
                 self._send_kv(
                     name=name,
                     tag=tag,
-                    data=datastream.get_data().encode(),
+                    data=_get_data(),
                     channel_infos=channel_infos,
                     partition_size=-1,
                     partitions=partitions,
                     message_key=message_key,
+                    table_format=table_format,
+                    compressed=compressed,
                 )
                 datastream.clear()
-            datastream.append(el)
+            if binary:
+                datastream.append(k, v)
+            else:
+                datastream.append(el)
 
         message_key_idx += 1
         message_key = _SPLIT_.join([base_message_key, str(message_key_idx)])
@@ -359,11 +421,13 @@ class MessageQueueBasedFederation(Federation):
         self._send_kv(
             name=name,
             tag=tag,
-            data=datastream.get_data().encode(),
+            data=_get_data(),
             channel_infos=channel_infos,
             partition_size=count,
             partitions=partitions,
             message_key=message_key,
+            table_format=table_format,
+            compressed=compressed,
         )
 
         return []
@@ -390,7 +454,7 @@ class MessageQueueBasedFederation(Federation):
                 self._consume_ack(channel_info, _id)
                 LOGGER.debug(f"[federation._receive_obj] cache_key: {cache_key}, wish_cache_key: {wish_cache_key}")
                 if cache_key == wish_cache_key:
-                    channel_info.cancel()
+                    self._release_channel(channel_info)
                     return recv_bytes
                 else:
                     self._message_cache[cache_key] = recv_bytes
@@ -451,10 +515,11 @@ class MessageQueueBasedFederation(Federation):
             conf=conf,
         )
 
+        # records are yielded batch by batch as messages arrive, so only the batch being decoded is kept in memory
+        # and the partition writer consumes it while the next message is still in flight
         message_key_cache = set()
         count = 0
         partition_size = -1
-        all_data = []
 
         while True:
             try:
@@ -468,7 +533,7 @@ class MessageQueueBasedFederation(Federation):
                         )
                         continue
 
-                    if properties["content_type"] == "application/json":
+                    if properties["content_type"] in {"application/json", "application/octet-stream"}:
                         header = json.loads(properties["headers"])
                         message_key = header["message_key"]
                         if message_key in message_key_cache:
@@ -481,25 +546,23 @@ class MessageQueueBasedFederation(Federation):
                         if header["partition_size"] >= 0:
                             partition_size = header["partition_size"]
 
-                        data = json.loads(body.decode())
-                        data_iter = (
-                            (
-                                bytes.fromhex(el["k"]),
-                                bytes.fromhex(el["v"]),
-                            )
-                            for el in data
-                        )
+                        # messages from peers without binary support carry no format field
+                        if header.get("format", _JSON_TABLE_FORMAT) == _BINARY_TABLE_FORMAT:
+                            data = decode_binary_batch(body, compressed=header.get("compressed", False))
+                        else:
+                            data = decode_json_batch(body)
                         count += len(data)
                         LOGGER.debug(f"[federation._partition_receive] count: {count}")
-                        all_data.extend(data_iter)
+                        yield from data
+                        del data
                         self._consume_ack(channel_info, id)
 
                         if count == partition_size:
                             channel_info.cancel()
-                            return all_data
+                            return
                     else:
-                        ValueError(
-                            f"[federation._partition_receive]properties.content_type is {properties['content_type']}, but must be application/json"
+                        raise ValueError(
+                            f"[federation._partition_receive]properties.content_type is {properties['content_type']}, but must be application/json or application/octet-stream"
                         )
 
             except Exception as e:
@@ -507,7 +570,7 @@ class MessageQueueBasedFederation(Federation):
                 # avoid hang on consume()
                 if count == partition_size:
                     channel_info.cancel()
-                    return all_data
+                    return
                 else:
                     raise e
 
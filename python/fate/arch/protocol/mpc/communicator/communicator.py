@@ -1,6 +1,8 @@
 import functools
 import logging
 import sys
+import threading
+import time
 import timeit
 from concurrent.futures import ThreadPoolExecutor
 
@@ -83,6 +85,19 @@ class Communicator:
         self._pool = trace.instrument_thread_pool_executor(ThreadPoolExecutor(max_workers=world_size))
         self.main_group = main_group
 
+        from fate.arch.protocol.mpc.config import cfg
+
+        self._coalescer = None
+        if cfg.safety.mpc.communicator.coalesce:
+            self._coalescer = _MessageCoalescer(
+                self,
+                namespace=ctx.namespace.sub_ns("mpc_coalesced"),
+                window=cfg.safety.mpc.communicator.coalesce_window,
+                max_bytes=cfg.safety.mpc.communicator.coalesce_max_bytes,
+            )
+            # plain federation gets and puts of this party could wait on messages still buffered here
+            ctx.federation.add_transfer_hook(self._coalescer.flush)
+
     @classmethod
     def is_initialized(cls):
         return cls.instance is not None
@@ -130,7 +145,17 @@ class Communicator:
 
     @classmethod
     def shutdown(cls):
-        pass
+        if cls.instance is not None:
+            cls.instance.flush()
+            if cls.instance._coalescer is not None:
+                cls.instance.ctx.federation.remove_transfer_hook(cls.instance._coalescer.flush)
+
+    def flush(self):
+        """
+        send coalesced messages still buffered
+        """
+        if self._coalescer is not None:
+            self._coalescer.flush()
 
     def send(self, tensor, dst, group=None):
         if group is None:
@@ -185,24 +210,30 @@ class Communicator:
     def scatter(self, scatter_list, src, size=None, async_op=False):
         raise NotImplementedError
 
-    def reduce(self, tensor, dst, op=None, async_op=False, group=None):
+    def reduce(self, tensor, dst, op=None, async_op=False, group=None, batched=False):
         if group is None:
             group = self.main_group
         if self.rank not in group.ranks:
             raise ValueError(f"rank {self.rank} not in group {group}")
+        if batched:
+            assert isinstance(tensor, list), "batched reduce input must be a list"
         recv_index = group.tensor_recv_index_inc()
         send_index = group.tensor_send_index_inc()
         if self.rank == dst:
             for i in range(self.world_size):
                 if i != dst:
-                    tensor.add_(
-                        self._recv(
-                            index=recv_index,
-                            tensor=None,
-                            src=i,
-                            group=group,
-                        )
+                    received = self._recv(
+                        index=recv_index,
+                        tensor=None,
+                        src=i,
+                        group=group,
                     )
+                    # batched tensors are sent together in one message
+                    if batched:
+                        for t, r in zip(tensor, received):
+                            t.add_(r)
+                    else:
+                        tensor.add_(received)
             return tensor
         else:
             self._send(
@@ -218,18 +249,21 @@ class Communicator:
             group = self.main_group
         if batched:
             assert isinstance(input, list), "batched reduce input must be a list"
-            results = []
-            for tensor in input:
-                results.append(self.all_reduce(tensor, op, batched=False))
-            return results
+            # gather all tensors at once, one message per party instead of one per tensor
+            ag = self.all_gather(input, group=group)
+            return [self._reduce_gathered([gathered[i] for gathered in ag], op) for i in range(len(input))]
         else:
             ag = self.all_gather(input, group=group)
-            if op == torch.distributed.ReduceOp.SUM:
-                return self._sum(ag)
-            elif op == torch.distributed.ReduceOp.BXOR:
-                return functools.reduce(torch.bitwise_xor, ag)
-            else:
-                raise NotImplementedError(f"op {op} is not implemented")
+            return self._reduce_gathered(ag, op)
+
+    @classmethod
+    def _reduce_gathered(cls, tensor_list, op):
+        if op == torch.distributed.ReduceOp.SUM:
+            return cls._sum(tensor_list)
+        elif op == torch.distributed.ReduceOp.BXOR:
+            return functools.reduce(torch.bitwise_xor, tensor_list)
+        else:
+            raise NotImplementedError(f"op {op} is not implemented")
 
     @staticmethod
     def _sum(tensor_list):
@@ -258,15 +292,16 @@ class Communicator:
         )
         # self.barrier.wait()
         recv_index = group.tensor_recv_index_inc()
+        batched = isinstance(tensor, list)
         result = []
         for i in range(self.world_size):
             if i == self.rank:
-                result.append(tensor.clone())
+                result.append([t.clone() for t in tensor] if batched else tensor.clone())
             else:
                 result.append(
                     self._recv(
                         index=recv_index,
-                        tensor=tensor.clone(),
+                        tensor=None if batched else tensor.clone(),
                         src=i,
                         group=group,
                     )
@@ -277,10 +312,22 @@ class Communicator:
         self._assert_initialized()
         group = self.main_group if group is None else group
         if batched:
-            assert isinstance(input, list), "batched reduce input must be a list"
-            reqs = []
-            for tensor in input:
-                reqs.append(self.broadcast(tensor.data, src, group=group, batched=False))
+            assert isinstance(input, list), "batched broadcast input must be a list"
+            # broadcast all tensors at once, one message per party instead of one per tensor
+            send_index = group.tensor_send_index_inc()
+            recv_index = group.tensor_recv_index_inc()
+            if src == self.rank:
+                self._send_many(
+                    index=send_index,
+                    tensor=[tensor.data for tensor in input],
+                    dst_list=[rank for rank in group.ranks if rank != self.rank],
+                    group=group,
+                )
+            else:
+                recv_tensors = self._recv(index=recv_index, tensor=None, src=src, group=group)
+                for tensor, recv_tensor in zip(input, recv_tensors):
+                    tensor.data.copy_(recv_tensor)
+            return input
         else:
             send_index = group.tensor_send_index_inc()
             recv_index = group.tensor_recv_index_inc()
@@ -383,6 +430,8 @@ class Communicator:
     def _send(self, index, tensor, dst, group=None):
         if group is None:
             group = self.main_group
+        if self._coalescer is not None:
+            return self._coalescer.put([dst], group.namespace_tensor.indexed_ns(index).federation_tag, tensor)
         parties = self._get_parties_by_rank(dst, group.namespace_tensor)
         logger.debug(f"[{self.ctx.local}]sending, index={index}, dst={dst}, parties={parties}")
         parties.put(group.namespace_tensor.indexed_ns(index).federation_tag, tensor)
@@ -390,6 +439,8 @@ class Communicator:
     def _send_obj(self, index, obj, dst, group=None):
         if group is None:
             group = self.main_group
+        if self._coalescer is not None:
+            return self._coalescer.put([dst], group.namespace_obj.indexed_ns(index).federation_tag, obj)
         parties = self._get_parties_by_rank(dst, group.namespace_obj)
         logger.debug(f"[{self.ctx.local}]sending obj, index={index}, dst={dst}, parties={parties}")
         parties.put(group.namespace_obj.indexed_ns(index).federation_tag, obj)
@@ -397,9 +448,12 @@ class Communicator:
     def _recv(self, index, tensor, src, group=None):
         if group is None:
             group = self.main_group
-        parties = self._get_parties_by_rank(src, group.namespace_tensor)
-        logger.debug(f"[{self.ctx.local}]receiving, index={index}, src={src}, parties={parties}")
-        got_tensor = parties.get(group.namespace_tensor.indexed_ns(index).federation_tag)[0]
+        if self._coalescer is not None:
+            got_tensor = self._coalescer.get(src, group.namespace_tensor.indexed_ns(index).federation_tag)
+        else:
+            parties = self._get_parties_by_rank(src, group.namespace_tensor)
+            logger.debug(f"[{self.ctx.local}]receiving, index={index}, src={src}, parties={parties}")
+            got_tensor = parties.get(group.namespace_tensor.indexed_ns(index).federation_tag)[0]
         if tensor is None:
             return got_tensor
         else:
@@ -409,6 +463,8 @@ class Communicator:
     def _recv_obj(self, index, src, group=None):
         if group is None:
             group = self.main_group
+        if self._coalescer is not None:
+            return self._coalescer.get(src, group.namespace_obj.indexed_ns(index).federation_tag)
         parties = self._get_parties_by_rank(src, group.namespace_obj)
         logger.debug(f"[{self.ctx.local}]receiving, index={index}, src={src}, parties={parties}")
         got_obj = parties.get(group.namespace_obj.indexed_ns(index).federation_tag)[0]
@@ -417,6 +473,8 @@ class Communicator:
     def _send_many(self, index, tensor, dst_list, group=None):
         if group is None:
             group = self.main_group
+        if self._coalescer is not None:
+            return self._coalescer.put(dst_list, group.namespace_tensor.indexed_ns(index).federation_tag, tensor)
         parties = self._get_parties_by_ranks(dst_list, group.namespace_tensor)
         logger.debug(f"[{self.ctx.local}]sending, index={index}, dst={dst_list}, parties={parties}")
         parties.put(group.namespace_tensor.indexed_ns(index).federation_tag, tensor)
@@ -424,11 +482,110 @@ class Communicator:
     def _send_obj_many(self, index, obj, dst_list, group=None):
         if group is None:
             group = self.main_group
+        if self._coalescer is not None:
+            return self._coalescer.put(dst_list, group.namespace_obj.indexed_ns(index).federation_tag, obj)
         parties = self._get_parties_by_ranks(dst_list, group.namespace_obj)
         logger.debug(f"[{self.ctx.local}]sending, index={index}, dst={dst_list}, parties={parties}")
         parties.put(group.namespace_obj.indexed_ns(index).federation_tag, obj)
 
 
+class _MessageCoalescer:
+    """
+    batches messages sent to the same rank into one federation message, received batches are demultiplexed
+    by message tag.
+
+    batches to each rank are sent and received in sequence, a batch is sent before anything is received,
+    so that a party never waits for messages it still buffers itself, when it grows over `max_bytes`,
+    by the first put `window` seconds after its first message, before any other federation push or pull,
+    and on explicit flush or shutdown.
+    batches are always sent by the thread putting or receiving, never from a background thread.
+    """
+
+    def __init__(self, communicator: "Communicator", namespace: NS, window: float, max_bytes: int):
+        self._communicator = communicator
+        self._namespace = namespace
+        self._window = window
+        self._max_bytes = max_bytes
+
+        self._lock = threading.RLock()
+        self._outbox = {}
+        self._outbox_bytes = {}
+        self._send_seq = {}
+        self._first_put_time = None
+        self._sending = False
+
+        self._recv_lock = threading.Lock()
+        self._recv_locks = {}
+        self._recv_seq = {}
+        self._inbox = {}
+
+    def put(self, dst_list: List[int], tag: str, value):
+        # messages are sent later, keep a snapshot of tensors modified in place meanwhile
+        if isinstance(value, torch.Tensor):
+            value = value.detach().clone()
+        elif isinstance(value, list) and all(isinstance(v, torch.Tensor) for v in value):
+            value = [v.detach().clone() for v in value]
+        nbytes = _approx_nbytes(value)
+        with self._lock:
+            for dst in dst_list:
+                self._outbox.setdefault(dst, []).append((tag, value))
+                self._outbox_bytes[dst] = self._outbox_bytes.get(dst, 0) + nbytes
+                if self._outbox_bytes[dst] >= self._max_bytes:
+                    self._flush_dst(dst)
+            if not self._outbox:
+                self._first_put_time = None
+            elif self._first_put_time is None:
+                self._first_put_time = time.monotonic()
+            elif time.monotonic() - self._first_put_time >= self._window:
+                self.flush()
+
+    def flush(self):
+        with self._lock:
+            # sends of a batch run federation transfer hooks, which flush again
+            if self._sending:
+                return
+            self._first_put_time = None
+            for dst in list(self._outbox):
+                self._flush_dst(dst)
+
+    def _flush_dst(self, dst):
+        messages = self._outbox.pop(dst, None)
+        self._outbox_bytes.pop(dst, None)
+        if not messages:
+            return
+        seq = self._send_seq.get(dst, 0)
+        self._send_seq[dst] = seq + 1
+        parties = self._communicator._get_parties_by_rank(dst, self._namespace)
+        logger.debug(f"sending {len(messages)} coalesced messages, seq={seq}, dst={dst}")
+        self._sending = True
+        try:
+            parties.put(self._namespace.indexed_ns(seq).federation_tag, messages)
+        finally:
+            self._sending = False
+
+    def get(self, src: int, tag: str):
+        self.flush()
+        with self._recv_lock:
+            src_lock = self._recv_locks.setdefault(src, threading.Lock())
+        with src_lock:
+            while (src, tag) not in self._inbox:
+                seq = self._recv_seq.get(src, 0)
+                self._recv_seq[src] = seq + 1
+                parties = self._communicator._get_parties_by_rank(src, self._namespace)
+                logger.debug(f"receiving coalesced messages, seq={seq}, src={src}")
+                for message_tag, value in parties.get(self._namespace.indexed_ns(seq).federation_tag)[0]:
+                    self._inbox[(src, message_tag)] = value
+            return self._inbox.pop((src, tag))
+
+
+def _approx_nbytes(value):
+    if isinstance(value, torch.Tensor):
+        return value.element_size() * value.nelement()
+    if isinstance(value, list):
+        return sum(_approx_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
 class WaitableFuture:
     def __init__(self, future, tag):
         self.future = future
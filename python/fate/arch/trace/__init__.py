@@ -17,6 +17,7 @@ from ._trace import (
     get_tracer,
     auto_trace,
     federation_pull_bytes_trace,
+    federation_pull_bytes_as_completed_trace,
     federation_push_table_trace,
     federation_pull_table_trace,
     federation_push_bytes_trace,
@@ -27,4 +28,11 @@ from ._trace import (
     extract_carrier,
     instrument_thread_pool_executor,
 )
-from ._profile import computing_profile, profile_start, profile_ends, federation_get_timer, federation_remote_timer
+from ._profile import (
+    computing_profile,
+    profile_start,
+    profile_ends,
+    federation_get_timer,
+    federation_remote_timer,
+    federation_transfer_statistics,
+)
@@ -16,6 +16,7 @@
 import hashlib
 import inspect
 import logging
+import threading
 import time
 import typing
 from functools import wraps
@@ -61,6 +62,48 @@ class _TimerItem(object):
         return self.__str__()
 
 
+class _FederationTransferItem(object):
+    def __init__(self):
+        self.count = 0
+        self.messages = 0
+        self.tables = 0
+        self.raw_bytes = 0
+        self.wire_bytes = 0
+        self.serdes_time = 0.0
+        self.wait_time = 0.0
+
+    def union(self, other: "_FederationTransferItem"):
+        self.count += other.count
+        self.messages += other.messages
+        self.tables += other.tables
+        self.raw_bytes += other.raw_bytes
+        self.wire_bytes += other.wire_bytes
+        self.serdes_time += other.serdes_time
+        self.wait_time += other.wait_time
+
+    def as_list(self):
+        return [
+            self.count,
+            self.messages,
+            self.tables,
+            self.raw_bytes,
+            self.wire_bytes,
+            self.serdes_time,
+            self.wait_time,
+        ]
+
+    def dict(self):
+        return dict(
+            count=self.count,
+            messages=self.messages,
+            tables=self.tables,
+            raw_bytes=self.raw_bytes,
+            wire_bytes=self.wire_bytes,
+            serdes_time=self.serdes_time,
+            wait_time=self.wait_time,
+        )
+
+
 class _ComputingTimerItem(object):
     def __init__(self, function_name: str, function_stack):
         self.function_name = function_name
@@ -152,6 +195,78 @@ class _ComputingTimer(object):
 class _FederationTimer(object):
     _GET_STATS: typing.MutableMapping[str, _TimerItem] = {}
     _REMOTE_STATS: typing.MutableMapping[str, _TimerItem] = {}
+    _GET_TRANSFER_STATS: typing.MutableMapping[str, _FederationTransferItem] = {}
+    _REMOTE_TRANSFER_STATS: typing.MutableMapping[str, _FederationTransferItem] = {}
+    # timers are updated from push threads as well as the main thread
+    _LOCK = threading.Lock()
+
+    _transfer: _FederationTransferItem
+
+    def add_bytes(self, raw_bytes: int, wire_bytes: int, messages: int):
+        """
+        record bytes of serialized payloads, before (`raw_bytes`) and after (`wire_bytes`) compression
+        """
+        with self._LOCK:
+            self._transfer.raw_bytes += raw_bytes
+            self._transfer.wire_bytes += wire_bytes
+            self._transfer.messages += messages
+
+    def add_tables(self, tables: int):
+        with self._LOCK:
+            self._transfer.tables += tables
+
+    def add_serdes_time(self, elapse: float):
+        with self._LOCK:
+            self._transfer.serdes_time += elapse
+
+    def add_wait_time(self, elapse: float):
+        with self._LOCK:
+            self._transfer.wait_time += elapse
+
+    @classmethod
+    def _snapshot(cls, stats, item_type):
+        with cls._LOCK:
+            snapshot = {}
+            for name, item in stats.items():
+                snapshot[name] = item_type()
+                snapshot[name].union(item)
+            return snapshot
+
+    @classmethod
+    def federation_transfer_statistics(cls):
+        with cls._LOCK:
+            return {
+                "get": {name: item.dict() for name, item in cls._GET_TRANSFER_STATS.items()},
+                "remote": {name: item.dict() for name, item in cls._REMOTE_TRANSFER_STATS.items()},
+            }
+
+    @classmethod
+    def federation_transfer_table(cls):
+        import beautifultable
+
+        transfer_table = beautifultable.BeautifulTable(120)
+        transfer_table.columns.header = [
+            "name",
+            "direction",
+            "n",
+            "messages",
+            "tables",
+            "raw bytes",
+            "wire bytes",
+            "serdes(s)",
+            "wait(s)",
+        ]
+        total = _FederationTransferItem()
+        for direction, stats in [("get", cls._GET_TRANSFER_STATS), ("remote", cls._REMOTE_TRANSFER_STATS)]:
+            for name, item in cls._snapshot(stats, _FederationTransferItem).items():
+                transfer_table.rows.append([name, direction, *item.as_list()])
+                total.union(item)
+        transfer_table.rows.append(["total", "", *total.as_list()])
+        transfer_table.border.left = ""
+        transfer_table.border.right = ""
+        transfer_table.border.bottom = ""
+        transfer_table.border.top = ""
+        return str(transfer_table)
 
     @classmethod
     def federation_statistics_table(cls, timer_aggregator: _TimerItem = None):
@@ -160,7 +275,7 @@ class _FederationTimer(object):
         total = _TimerItem()
         get_table = beautifultable.BeautifulTable(110)
         get_table.columns.header = ["name", "n", "sum(s)", "mean(s)", "max(s)"]
-        for name, item in cls._GET_STATS.items():
+        for name, item in cls._snapshot(cls._GET_STATS, _TimerItem).items():
             get_table.rows.append([name, *item.as_list()])
             total.union(item)
         get_table.rows.sort("sum(s)", reverse=True)
@@ -170,7 +285,7 @@ class _FederationTimer(object):
         get_table.border.top = ""
         remote_table = beautifultable.BeautifulTable(110)
         remote_table.columns.header = ["name", "n", "sum(s)", "mean(s)", "max(s)"]
-        for name, item in cls._REMOTE_STATS.items():
+        for name, item in cls._snapshot(cls._REMOTE_STATS, _TimerItem).items():
             remote_table.rows.append([name, *item.as_list()])
             total.union(item)
         remote_table.rows.sort("sum(s)", reverse=True)
@@ -199,12 +314,16 @@ class _FederationRemoteTimer(_FederationTimer):
         self._start_time = time.time()
         self._end_time = None
 
-        if self._full_name not in self._REMOTE_STATS:
-            self._REMOTE_STATS[self._full_name] = _TimerItem()
+        with self._LOCK:
+            if self._full_name not in self._REMOTE_STATS:
+                self._REMOTE_STATS[self._full_name] = _TimerItem()
+            self._transfer = self._REMOTE_TRANSFER_STATS.setdefault(self._full_name, _FederationTransferItem())
 
     def done(self):
         self._end_time = time.time()
-        self._REMOTE_STATS[self._full_name].add(self.elapse)
+        with self._LOCK:
+            self._REMOTE_STATS[self._full_name].add(self.elapse)
+            self._transfer.count += 1
         profile_logger.debug(
             f"[federation.remote.{self._full_name}.{self._tag}]" f"{self._local_party}->{self._parties} done"
         )
@@ -224,12 +343,16 @@ class _FederationGetTimer(_FederationTimer):
         self._start_time = time.time()
         self._end_time = None
 
-        if self._full_name not in self._GET_STATS:
-            self._GET_STATS[self._full_name] = _TimerItem()
+        with self._LOCK:
+            if self._full_name not in self._GET_STATS:
+                self._GET_STATS[self._full_name] = _TimerItem()
+            self._transfer = self._GET_TRANSFER_STATS.setdefault(self._full_name, _FederationTransferItem())
 
     def done(self):
         self._end_time = time.time()
-        self._GET_STATS[self._full_name].add(self.elapse)
+        with self._LOCK:
+            self._GET_STATS[self._full_name].add(self.elapse)
+            self._transfer.count += 1
         profile_logger.debug(
             f"[federation.get.{self._full_name}.{self._tag}]" f"{self._local_party}<-{self._parties} done"
         )
@@ -249,6 +372,13 @@ def federation_get_timer(name, full_name, tag, local, parties):
     return _FederationGetTimer(name, full_name, tag, local, parties)
 
 
+def federation_transfer_statistics():
+    """
+    transfer counters of federation gets and remotes, keyed by name
+    """
+    return _FederationTimer.federation_transfer_statistics()
+
+
 def profile_start():
     global _PROFILE_LOG_ENABLED
     _PROFILE_LOG_ENABLED = True
@@ -271,6 +401,7 @@ def profile_ends():
         computing_detailed_table,
     ) = _ComputingTimer.computing_statistics_table(timer_aggregator=computing_timer_aggregator)
     federation_base_table = _FederationTimer.federation_statistics_table(timer_aggregator=federation_timer_aggregator)
+    federation_transfer_table = _FederationTimer.federation_transfer_table()
     timer_aggregator.union(computing_timer_aggregator)
     timer_aggregator.union(federation_timer_aggregator)
 
@@ -288,6 +419,7 @@ def profile_ends():
         )
     )
     profile_logger.info(f"\nComputing:\n{computing_base_table}\n\nFederation:\n{federation_base_table}\n")
+    profile_logger.info(f"\nFederation Transfer:\n{federation_transfer_table}\n")
     profile_logger.debug(f"\nDetailed Computing:\n{computing_detailed_table}\n")
 
     global _PROFILE_LOG_ENABLED
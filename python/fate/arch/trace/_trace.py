@@ -183,6 +183,29 @@ def federation_pull_bytes_trace(func):
     return wrapper
 
 
+def federation_pull_bytes_as_completed_trace(func):
+    @functools.wraps(func)
+    def wrapper(
+        self,
+        name: str,
+        tag: str,
+        parties: List["PartyMeta"],
+    ):
+        logger.debug(f"function {func.__qualname__} is calling on name={name}, tag={tag}, parties={parties}")
+        out = func(self, name, tag, parties)
+        # the pull is done once all arrivals are consumed, not when the iterator is returned
+        return _traced_arrivals(func.__qualname__, out, name, tag, parties)
+
+    return wrapper
+
+
+def _traced_arrivals(qualname, arrivals, name, tag, parties):
+    for index, v in arrivals:
+        logger.debug(f"function {qualname} received from {parties[index]} on name={name}, tag={tag}")
+        yield index, v
+    logger.debug(f"function {qualname} is called on name={name}, tag={tag}, parties={parties}")
+
+
 def federation_auto_trace(func):
     if not _is_tracing_enabled():
 
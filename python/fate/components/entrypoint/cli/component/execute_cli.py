@@ -94,7 +94,7 @@ def execute_component_from_config(config: "TaskConfigSpec", output_path):
     import traceback
 
     from fate.arch import CipherKit, Context
-    from fate.arch.trace import profile_ends, profile_start
+    from fate.arch.trace import federation_transfer_statistics, profile_ends, profile_start
     from fate.components.core import (
         ComponentExecutionIO,
         Role,
@@ -146,6 +146,11 @@ def execute_component_from_config(config: "TaskConfigSpec", output_path):
         # execute
         component.execute(ctx, role, **execution_io.get_kwargs())
 
+        # report federation transfer counters along with the component's metrics
+        federation_transfer = federation_transfer_statistics()
+        if federation_transfer["get"] or federation_transfer["remote"]:
+            ctx.metrics.log_metrics(data=federation_transfer, name="federation_transfer", type="federation_transfer")
+
         # finalize metric handler
         metrics_handler.finalize()
         # final execution io meta
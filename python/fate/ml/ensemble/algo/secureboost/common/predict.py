@@ -16,6 +16,7 @@ import pandas as pd
 import numpy as np
 from typing import List
 from fate.arch import Context
+from fate.arch.computing.api import Broadcast
 from fate.arch.dataframe import DataFrame
 import copy
 from fate.ml.ensemble.learner.decision_tree.tree_core.decision_tree import DecisionTree, _make_decision, Node
@@ -70,12 +71,12 @@ def go_deep(s: pd.Series, tree: List[Node], sitename, cur_node_id, tree_idx=None
                 node = tree[node.r]
 
 
-def traverse_tree(s: pd.Series, trees: List[List[Node]], sitename: str):
+def traverse_tree(s: pd.Series, trees: Broadcast, sitename: str):
     sample_pos = s["sample_pos"]
     new_sample_pos = np.copy(sample_pos)  # deepcopy to avoid inplace modification, for spark
 
     tree_idx = 0
-    for node_pos, tree in zip(sample_pos, trees):
+    for node_pos, tree in zip(sample_pos, trees.value):
         if node_pos < 0:  # sample already reaches leaf node in this tree
             tree_idx += 1
             continue
@@ -124,6 +125,8 @@ def predict_leaf_guest(ctx: Context, trees: List[DecisionTree], data: DataFrame)
     result_sample_pos = sample_pos.empty_frame()
 
     sitename = ctx.local.name
+    # trees are shared by every round, ship them once instead of with every task
+    broadcast_trees = ctx.computing.broadcast(tree_list)
 
     # start loop here
     comm_round = 0
@@ -136,7 +139,7 @@ def predict_leaf_guest(ctx: Context, trees: List[DecisionTree], data: DataFrame)
 
         sample_with_pos = DataFrame.hstack([predict_data, sample_pos])
         logger.info("predict round {} has {} samples to predict".format(comm_round, len(sample_with_pos)))
-        map_func = functools.partial(traverse_tree, trees=tree_list, sitename=sitename)
+        map_func = functools.partial(traverse_tree, trees=broadcast_trees, sitename=sitename)
         new_pos = sample_with_pos.create_frame()
         new_pos["sample_pos"] = sample_with_pos.apply_row(map_func)
         done_sample_idx = new_pos.apply_row(
@@ -174,7 +177,7 @@ def predict_leaf_guest(ctx: Context, trees: List[DecisionTree], data: DataFrame)
 def predict_leaf_host(ctx: Context, trees: List[DecisionTree], data: DataFrame):
     tree_list = [tree.get_nodes() for tree in trees]
     sitename = ctx.local.name
-    map_func = functools.partial(traverse_tree, trees=tree_list, sitename=sitename)
+    map_func = functools.partial(traverse_tree, trees=ctx.computing.broadcast(tree_list), sitename=sitename)
 
     # help guest to traverse tree
     comm_round = 0
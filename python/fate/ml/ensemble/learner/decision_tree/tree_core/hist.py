@@ -145,7 +145,10 @@ class SBTHistogramBuilder(object):
         # root node
         if 0 in weak_nodes:
             return sample_pos
-        is_on_weak = sample_pos.apply_row(lambda s: s["node_idx"] in weak_nodes)
+        weak_node_ids = torch.tensor(list(weak_nodes), dtype=torch.int64)
+        is_on_weak = sample_pos.apply_batch(
+            lambda batch: torch.isin(batch["node_idx"].long(), weak_node_ids), columns=["is_on_weak"], dtype="bool"
+        )
         weak_sample_pos = sample_pos.iloc(is_on_weak)
         return weak_sample_pos
 
@@ -204,13 +207,21 @@ class SBTHistogramBuilder(object):
             node_mapping=node_mapping,
         )
 
+        # node ids are looked up for a whole block at once, via a dense table indexed by node id
+        node_ids = torch.tensor(list(node_map.keys()), dtype=torch.int64)
+        node_table = torch.full((int(node_ids.max()) + 1,), -1, dtype=torch.int32)
+        node_table[node_ids] = torch.tensor(list(node_map.values()), dtype=torch.int32)
+
+        def node_lookup(batch):
+            return node_table[batch["node_idx"].long()]
+
         # if goss is enabled
         if len(sample_pos) > len(gh):
             sample_pos = sample_pos.loc(gh.get_indexer(target="sample_id"), preserve_order=True)
-            map_sample_pos = sample_pos.apply_row(lambda x: node_map[x["node_idx"]])
+            map_sample_pos = sample_pos.apply_batch(node_lookup, columns=["node_idx"], dtype="int32")
             bin_train_data = bin_train_data.loc(gh.get_indexer(target="sample_id"), preserve_order=True)
         else:
-            map_sample_pos = sample_pos.apply_row(lambda x: node_map[x["node_idx"]])
+            map_sample_pos = sample_pos.apply_batch(node_lookup, columns=["node_idx"], dtype="int32")
 
         stat_obj = bin_train_data.distributed_hist_stat(hist, map_sample_pos, gh)
 
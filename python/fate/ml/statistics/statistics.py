@@ -68,7 +68,8 @@ class StatisticsSummary(Module):
 
     def get_from_describe(self, data, metric):
         if self._describe is None:
-            self._describe = data.describe(ddof=self.ddof, unbiased=~self.bias)
+            # every moment and missing count comes out of one fused pass
+            self._describe = data.describe(ddof=self.ddof, unbiased=not self.bias)
         return self._describe[metric]
 
     def get_from_quantile_summary(self, data, metric):
@@ -81,6 +82,9 @@ class StatisticsSummary(Module):
         res = pd.DataFrame(columns=data.schema.columns)
         q_metrics = [metric for metric in metrics if re.match(r"^(100|\d{1,2})%$", metric)]
         self._q_pts = [int(metric[:-1]) / 100 for metric in q_metrics]
+        # median shares the quantile summary with the percentile metrics
+        if "median" in metrics and 0.5 not in self._q_pts:
+            self._q_pts.append(0.5)
         for metric in metrics:
             metric_val = None
             """if metric == "describe":
@@ -97,8 +101,7 @@ class StatisticsSummary(Module):
                     self._count = data.count()
                 metric_val = self._count
             elif metric == "median":
-                metric_val = data.quantile(q=0.5, relative_error=self.relative_error)
-                metric_val = metric_val.loc[0.5]
+                metric_val = self.get_from_quantile_summary(data, "50%")
             elif metric == "coefficient_of_variation":
                 metric_val = self.get_from_describe(data, "variation")
             elif metric == "missing_count":
@@ -0,0 +1,26 @@
+import random
+
+import pytest
+from fate.arch.computing.partitioners import get_partitioner_by_type
+from fate.arch.computing.serdes import get_serdes_by_type
+
+
+def _keys():
+    rng = random.Random(0)
+    integer_serdes = get_serdes_by_type(1)
+    return [
+        [integer_serdes.serialize(i) for i in [0, 1, 7, 2**32, 2**63 + 5]],
+        [rng.randbytes(rng.randint(0, 40)) for _ in range(500)],
+        [str(i).encode() for i in range(200)],
+        [],
+    ]
+
+
+@pytest.mark.parametrize("partitioner_type", [0, 1, 2, 3])
+@pytest.mark.parametrize("total_partitions", [1, 3, 16, 1000])
+def test_batch_partitioner_matches_single(partitioner_type, total_partitions):
+    partitioner = get_partitioner_by_type(partitioner_type)
+    for keys in _keys():
+        expected = [partitioner(key, total_partitions) for key in keys]
+        assert partitioner.batch(keys, total_partitions) == expected
+        assert all(0 <= p < total_partitions for p in expected)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from fate.arch.computing.serdes import get_serdes_by_type
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        np.arange(12, dtype=np.float64).reshape(3, 4),
+        np.array([1, 2, 3], dtype=np.int32),
+        np.zeros((0, 2), dtype=np.float32),
+        [np.ones(3), (np.arange(2), "label")],
+        {"fallback": [1, 2.5, "a"]},
+        3.5,
+        None,
+    ],
+)
+def test_numeric_serdes_round_trip(obj):
+    serdes = get_serdes_by_type(2)
+    restored = serdes.deserialize(serdes.serialize(obj))
+    _assert_same(restored, obj)
+
+
+def test_numeric_serdes_keeps_dtype_and_layout():
+    serdes = get_serdes_by_type(2)
+    array = np.asfortranarray(np.arange(6, dtype=">i8").reshape(2, 3))
+    restored = serdes.deserialize(serdes.serialize(array))
+    assert restored.dtype == array.dtype
+    np.testing.assert_array_equal(restored, array)
+    np.testing.assert_array_equal(serdes.deserialize(serdes.serialize(array[:, 1])), array[:, 1])
+
+
+def test_integer_serdes_batch_matches_single():
+    serdes = get_serdes_by_type(1)
+    keys = [0, 1, 255, 256, 2**40, 2**63]
+    assert serdes.serialize_batch(keys) == [serdes.serialize(k) for k in keys]
+    assert serdes.deserialize_batch([serdes.serialize(k) for k in keys]) == keys
+
+
+def _assert_same(restored, obj):
+    if isinstance(obj, np.ndarray):
+        assert isinstance(restored, np.ndarray) and restored.dtype == obj.dtype
+        np.testing.assert_array_equal(restored, obj)
+    elif isinstance(obj, (list, tuple)):
+        assert type(restored) == type(obj) and len(restored) == len(obj)
+        for r, o in zip(restored, obj):
+            _assert_same(r, o)
+    else:
+        assert restored == obj
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+from fate.arch import Context
+from fate.arch.computing.backends.standalone import CSession
+from fate.arch.dataframe import PandasReader
+from fate.arch.federation.backends.standalone import StandaloneFederation
+
+
+@pytest.fixture
+def ctx(tmp_path):
+    computing = CSession(data_dir=str(tmp_path))
+    federation = StandaloneFederation(computing, "federation", ("guest", "10000"), [("guest", "10000")])
+    ctx = Context(computing=computing, federation=federation)
+    yield ctx
+    ctx.destroy()
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "sample_id": [str(i) for i in range(100)],
+            "match_id": [str(i) for i in range(100)],
+            "y": rng.integers(0, 2, size=100),
+            "x0": rng.normal(size=100),
+            "x1": rng.normal(size=100),
+        }
+    )
+
+
+@pytest.fixture
+def df(ctx, data):
+    reader = PandasReader(
+        sample_id_name="sample_id", match_id_name="match_id", label_name="y", dtype="float64", partition=3
+    )
+    return reader.to_frame(ctx, data.copy())
+
+
+def _by_match_id(df):
+    return df.as_pd_df().set_index("match_id").sort_index(key=lambda index: index.astype(int))
+
+
+def test_apply_batch_dict(df, data):
+    ret = df.apply_batch(
+        lambda batch: {"sum": batch["x0"] + batch["x1"], "diff": batch["x0"] - batch["x1"]},
+        columns=["sum", "diff"],
+        dtype="float64",
+    )
+    assert ret.schema.columns.tolist() == ["sum", "diff"]
+    ret = _by_match_id(ret)
+    np.testing.assert_allclose(ret["sum"], data["x0"] + data["x1"])
+    np.testing.assert_allclose(ret["diff"], data["x0"] - data["x1"])
+    # the label is kept unless it is consumed
+    np.testing.assert_array_equal(ret["y"], data["y"])
+
+
+def test_apply_batch_tensor_with_mixed_dtypes(df, data):
+    def _func(batch):
+        return torch.stack([batch["x0"] * 2, (batch["x1"] > 0).to(batch["x0"].dtype)], dim=1)
+
+    ret = _by_match_id(df.apply_batch(_func, columns=["double", "positive"], dtype=["float64", "int32"]))
+    np.testing.assert_allclose(ret["double"], data["x0"] * 2)
+    np.testing.assert_array_equal(ret["positive"], (data["x1"] > 0).astype(int))
+
+
+def test_apply_batch_single_column_with_label(df, data):
+    ret = df.apply_batch(
+        lambda batch: np.asarray(batch["x0"]) * np.asarray(batch["y"]),
+        columns=["masked"],
+        dtype="float64",
+        with_label=True,
+    )
+    assert ret.label is None
+    ret = _by_match_id(ret)
+    np.testing.assert_allclose(ret["masked"], data["x0"] * data["y"])
+
+
+def test_apply_batch_rejects_invalid_declarations(df):
+    with pytest.raises(ValueError, match="output columns"):
+        df.apply_batch(lambda batch: batch, columns=[])
+    with pytest.raises(ValueError, match="2 columns but 1 dtypes"):
+        df.apply_batch(lambda batch: batch, columns=["a", "b"], dtype=["float32"])
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fate.arch import Context
+from fate.arch.computing.backends.standalone import CSession
+from fate.arch.dataframe import CSVReader
+from fate.arch.federation.backends.standalone import StandaloneFederation
+
+
+@pytest.fixture
+def ctx(tmp_path):
+    computing = CSession(data_dir=str(tmp_path / "session"))
+    federation = StandaloneFederation(computing, "federation", ("guest", "10000"), [("guest", "10000")])
+    ctx = Context(computing=computing, federation=federation)
+    yield ctx
+    ctx.destroy()
+
+
+@pytest.fixture
+def path(tmp_path):
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(
+        {
+            "sample_id": range(100),
+            "id": range(1000, 1100),
+            "y": rng.integers(0, 2, size=100),
+            "x0": rng.normal(size=100),
+            # an integer column with a missing value in one chunk only
+            "x1": [np.nan if i == 42 else i for i in range(100)],
+        }
+    )
+    path = tmp_path / "data.csv"
+    data.to_csv(path, index=False)
+    return str(path)
+
+
+def _read(ctx, path, chunk_rows):
+    reader = CSVReader(
+        sample_id_name="sample_id", match_id_name="id", label_name="y", dtype="float64", chunk_rows=chunk_rows
+    )
+    return reader.to_frame(ctx, path).as_pd_df().set_index("sample_id").sort_index(key=lambda index: index.astype(int))
+
+
+def test_chunked_read_equals_single_read(ctx, path):
+    single = _read(ctx, path, chunk_rows=1000)
+    chunked = _read(ctx, path, chunk_rows=7)
+    pd.testing.assert_frame_equal(chunked, single)
+    # match ids are read as strings whatever the other columns of their chunk hold
+    assert chunked["id"].tolist() == [str(i) for i in range(1000, 1100)]
+    assert np.isnan(chunked["x1"].iloc[42])
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+from fate.arch import Context
+from fate.arch.computing.backends.standalone import CSession
+from fate.arch.dataframe import PandasReader
+from fate.arch.federation.backends.standalone import StandaloneFederation
+from fate.arch.dataframe.ops._stat import _block_moments, _kurt, _merge_moments, _skew
+
+
+@pytest.fixture
+def ctx(tmp_path):
+    computing = CSession(data_dir=str(tmp_path))
+    federation = StandaloneFederation(computing, "federation", ("guest", "10000"), [("guest", "10000")])
+    ctx = Context(computing=computing, federation=federation)
+    yield ctx
+    ctx.destroy()
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(
+        {
+            "normal": rng.normal(size=1000),
+            "skewed": rng.exponential(size=1000),
+            # a large offset cancels out in sum-of-powers formulas
+            "offset": 1e8 + rng.normal(size=1000),
+        }
+    )
+    data["sample_id"] = [str(i) for i in range(1000)]
+    data["match_id"] = [str(i) for i in range(1000)]
+    return data
+
+
+def test_merged_moments_equal_two_pass_reference(data):
+    values = data[["normal", "skewed", "offset"]].values
+    merged = _block_moments(torch.tensor(values[:10]))
+    for start, end in [(10, 300), (300, 301), (301, 1000)]:
+        merged = _merge_moments(merged, _block_moments(torch.tensor(values[start:end])))
+
+    deviation = values - values.mean(axis=0)
+    reference = [
+        len(values),
+        np.zeros(3, dtype=np.int64),
+        values.sum(axis=0),
+        values.min(axis=0),
+        values.max(axis=0),
+        values.mean(axis=0),
+        *[(deviation**k).sum(axis=0) for k in [2, 3, 4]],
+    ]
+    reference = [reference[0], *[torch.tensor(moment) for moment in reference[1:]]]
+
+    assert merged[0] == reference[0]
+    # deviations from a mean around 1e8 carry an absolute error of about 1e-8 each, whatever the summation order
+    for merged_moment, reference_moment in zip(merged[1:], reference[1:]):
+        torch.testing.assert_close(merged_moment, reference_moment, rtol=1e-6, atol=1e-3, check_dtype=False)
+    for unbiased in [False, True]:
+        torch.testing.assert_close(_skew(merged, unbiased), _skew(reference, unbiased), rtol=1e-5, atol=1e-9)
+        torch.testing.assert_close(_kurt(merged, unbiased), _kurt(reference, unbiased), rtol=1e-5, atol=1e-9)
+
+
+@pytest.mark.parametrize("unbiased", [False, True])
+def test_describe_matches_pandas(ctx, data, unbiased):
+    reader = PandasReader(sample_id_name="sample_id", match_id_name="match_id", dtype="float64", partition=4)
+    df = reader.to_frame(ctx, data.copy())
+    columns = ["normal", "skewed", "offset"]
+    expected = data[columns]
+
+    describe = df.describe(unbiased=unbiased).loc[columns]
+    np.testing.assert_allclose(describe["sum"], expected.sum(), rtol=1e-9)
+    np.testing.assert_allclose(describe["mean"], expected.mean(), rtol=1e-9)
+    np.testing.assert_allclose(describe["min"], expected.min())
+    np.testing.assert_allclose(describe["max"], expected.max())
+    np.testing.assert_allclose(describe["var"], expected.var(), rtol=1e-6)
+    np.testing.assert_allclose(describe["std"], expected.std(), rtol=1e-6)
+    np.testing.assert_allclose(describe["na_count"], 0)
+
+    deviation = expected - expected.mean()
+    m2, m3, m4 = [(deviation**k).mean() for k in [2, 3, 4]]
+    if unbiased:
+        expected_skew, expected_kurt = expected.skew(), expected.kurt()
+    else:
+        expected_skew, expected_kurt = m3 / m2**1.5, m4 / m2**2 - 3
+    np.testing.assert_allclose(describe["skew"], expected_skew, rtol=1e-6, atol=1e-9)
+    np.testing.assert_allclose(describe["kurt"], expected_kurt, rtol=1e-6, atol=1e-9)
+
+    np.testing.assert_allclose(df.var().loc[columns], expected.var(), rtol=1e-6)
+    np.testing.assert_allclose(df.skew(unbiased=unbiased).loc[columns], expected_skew, rtol=1e-6, atol=1e-9)
+    np.testing.assert_allclose(df.kurt(unbiased=unbiased).loc[columns], expected_kurt, rtol=1e-6, atol=1e-9)
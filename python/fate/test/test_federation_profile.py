@@ -0,0 +1,33 @@
+import threading
+
+from fate.arch.trace import federation_transfer_statistics
+from fate.arch.trace._profile import federation_remote_timer
+
+
+def test_transfer_counters_from_concurrent_threads():
+    num_threads, num_pushes = 8, 2000
+    barrier = threading.Barrier(num_threads)
+
+    def _push():
+        barrier.wait()
+        for _ in range(num_pushes):
+            timer = federation_remote_timer("concurrent", "concurrent", "tag", ("guest", "10000"), [("host", "9999")])
+            timer.add_bytes(3, 2, 1)
+            timer.add_tables(1)
+            timer.add_serdes_time(0.5)
+            timer.done()
+
+    threads = [threading.Thread(target=_push) for _ in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = federation_transfer_statistics()["remote"]["concurrent"]
+    total = num_threads * num_pushes
+    assert stats["count"] == total
+    assert stats["messages"] == total
+    assert stats["tables"] == total
+    assert stats["raw_bytes"] == 3 * total
+    assert stats["wire_bytes"] == 2 * total
+    assert stats["serdes_time"] == 0.5 * total
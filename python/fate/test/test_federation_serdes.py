@@ -0,0 +1,143 @@
+import numpy as np
+import pytest
+from fate.arch.config import cfg
+from fate.arch.federation.api._serdes import (
+    TableRemotePersistentPickler,
+    TableRemotePersistentUnpickler,
+    _FederationBytesCoder,
+    _FederationCodec,
+    _shuffle_safetensors_data,
+)
+
+
+class _InMemoryFederation:
+    """
+    keeps pushed bytes in a dict, enough for objects that are not split into tables
+    """
+
+    local_party = ("guest", "10000")
+
+    def __init__(self):
+        self.pushed = {}
+
+    def push_bytes(self, v, name, tag, parties):
+        self.pushed[(name, tag)] = v
+
+    def pull_bytes(self, name, tag, parties):
+        return [self.pushed.pop((name, tag))]
+
+
+def _round_trip(value, codec="none", max_message_size=1 << 20, **override):
+    federation = _InMemoryFederation()
+    options = {"federation.compression.codec": codec, "federation.compression.min_size": 0, **override}
+    with cfg.temp_override(options):
+        TableRemotePersistentPickler.push(
+            value, federation, None, "name", "tag", [("host", "9999")], max_message_size, 1
+        )
+        header = federation.pushed[("name", "tag")]
+        restored = TableRemotePersistentUnpickler.pull(
+            federation.pull_bytes("name", "tag", [("host", "9999")])[0],
+            None,
+            federation,
+            "name",
+            "tag",
+            ("host", "9999"),
+        )
+    return header, restored, federation
+
+
+_VALUES = [
+    {"ints": list(range(1000)), "text": "abc" * 500},
+    np.linspace(0, 1, 4096, dtype=np.float64),
+    np.arange(4096, dtype=np.int32).reshape(64, 64),
+    [np.ones(10, dtype=np.float32), ("tuple", 1)],
+]
+
+
+def _assert_same(restored, value):
+    if isinstance(value, np.ndarray):
+        assert restored.dtype == value.dtype
+        np.testing.assert_array_equal(restored, value)
+    elif isinstance(value, (list, tuple)):
+        assert type(restored) == type(value)
+        for r, v in zip(restored, value):
+            _assert_same(r, v)
+    else:
+        assert restored == value
+
+
+@pytest.mark.parametrize("codec", ["none", "zlib", "lz4", "zstd"])
+@pytest.mark.parametrize("value", _VALUES)
+def test_codec_round_trip(codec, value):
+    header, restored, _ = _round_trip(value, codec)
+    _assert_same(restored, value)
+    mode = _FederationBytesCoder.decode_mode(header)
+    assert mode in ({0} if codec == "none" else {0, 2})
+
+
+def test_compressible_payload_is_compressed():
+    value = {"zeros": [0] * 100_000}
+    plain, _, _ = _round_trip(value, "none")
+    header, restored, _ = _round_trip(value, "zlib")
+    assert restored == value
+    assert _FederationBytesCoder.decode_mode(header) == 2
+    assert len(header) < len(plain)
+
+
+def test_payload_below_min_size_is_sent_as_is():
+    header, restored, _ = _round_trip({"a": 1}, "zlib", **{"federation.compression.min_size": 1 << 20})
+    assert restored == {"a": 1}
+    assert _FederationBytesCoder.decode_mode(header) == 0
+
+
+def test_codec_rejects_unknown_codec():
+    with pytest.raises(ValueError, match="invalid federation compression codec"):
+        _FederationCodec(codec="snappy")
+
+
+@pytest.mark.parametrize("dtype", [np.float16, np.float32, np.float64])
+def test_float_tensor_shuffle_round_trip(dtype):
+    import safetensors.numpy
+
+    tensor_bytes = safetensors.numpy.save({"n": np.random.default_rng(0).random(1000).astype(dtype)})
+    itemsize = np.dtype(dtype).itemsize
+    shuffled = _shuffle_safetensors_data(tensor_bytes, itemsize, unshuffle=False)
+    assert shuffled != tensor_bytes and len(shuffled) == len(tensor_bytes)
+    assert _shuffle_safetensors_data(shuffled, itemsize, unshuffle=True) == tensor_bytes
+    compressed, codec_type, shuffle = _FederationCodec("zlib").compress_tensor(tensor_bytes, itemsize)
+    assert _FederationCodec.decompress_tensor(compressed, codec_type, shuffle) == tensor_bytes
+
+
+def test_tensor_payload_is_not_compressed_twice(monkeypatch):
+    from fate.arch.federation.api import _serdes
+
+    compress = _serdes._compress
+    compressed_sizes = []
+
+    def _compress(codec_type, level, data):
+        compressed_sizes.append(len(data))
+        return compress(codec_type, level, data)
+
+    monkeypatch.setattr(_serdes, "_compress", _compress)
+    value = {"weights": np.random.default_rng(0).random(4096), "step": 1}
+    header, restored, _ = _round_trip(value, "zlib")
+    _assert_same(restored["weights"], value["weights"])
+    assert restored["step"] == 1
+    # only the tensor goes through the codec, not the stream embedding it
+    assert len(compressed_sizes) == 1
+    assert _FederationBytesCoder.decode_mode(header) == 0
+
+
+def test_large_object_streamed_in_chunks():
+    assert not cfg.federation.split_large_object.stream_chunks
+    value = np.arange(10_000, dtype=np.int64)
+    header, restored, federation = _round_trip(
+        value, "none", max_message_size=1024, **{"federation.split_large_object.stream_chunks": True}
+    )
+    _assert_same(restored, value)
+    assert _FederationBytesCoder.decode_mode(header) == 4
+    total_size, num_chunks, chunk_size = _FederationBytesCoder.decode_chunked(header)
+    assert chunk_size == 1024
+    assert num_chunks == (total_size - 1) // chunk_size + 1 > 1
+    # every chunk is pulled
+    assert not federation.pushed
@@ -0,0 +1,70 @@
+import time
+
+from fate.arch.federation.message_queue._channel_pool import RECEIVE, SEND, ChannelPool
+
+
+class _Channel:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class _CancelOnlyChannel:
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        raise RuntimeError("already cancelled")
+
+
+def test_channels_are_reused():
+    pool = ChannelPool(idle_timeout=60)
+    created = []
+
+    def _create(name):
+        def _create_channel():
+            created.append(name)
+            return _Channel(name)
+
+        return _create_channel
+
+    send = pool.get((SEND, "host", "9999"), _create("send"))
+    assert pool.get((SEND, "host", "9999"), _create("send")) is send
+    receive = pool.get((RECEIVE, "host", "9999"), _create("receive"))
+    assert receive is not send
+    assert created == ["send", "receive"]
+
+    pool.close_all()
+    assert send.closed and receive.closed
+    assert pool.get((SEND, "host", "9999"), _create("send")) is not send
+
+
+def test_idle_channels_are_closed_on_next_access():
+    pool = ChannelPool(idle_timeout=0.05)
+    idle = pool.get("idle", lambda: _Channel("idle"))
+    time.sleep(0.1)
+    active = pool.get("active", lambda: _Channel("active"))
+    assert idle.closed
+    assert not active.closed
+    # channels closed while idle are created again
+    assert pool.get("idle", lambda: _Channel("idle")) is not idle
+    assert pool.get("active", lambda: _Channel("active")) is active
+
+
+def test_channels_never_idle_without_timeout():
+    pool = ChannelPool(idle_timeout=None)
+    channel = pool.get("key", lambda: _Channel("key"))
+    time.sleep(0.01)
+    assert pool.get("key", lambda: _Channel("key")) is channel
+    assert not channel.closed
+
+
+def test_close_falls_back_to_cancel_and_ignores_errors():
+    pool = ChannelPool(idle_timeout=60)
+    channel = pool.get("key", _CancelOnlyChannel)
+    pool.close_all()
+    assert channel.cancelled
@@ -0,0 +1,145 @@
+import json
+import random
+
+import pytest
+from fate.arch.config import cfg
+from fate.arch.federation.message_queue import MessageQueueBasedFederation
+from fate.arch.federation.message_queue._datastream import (
+    BinaryDatastream,
+    Datastream,
+    decode_binary_batch,
+    decode_json_batch,
+)
+
+
+@pytest.fixture
+def records():
+    rng = random.Random(0)
+    return [(rng.randbytes(rng.randint(0, 16)), rng.randbytes(rng.randint(0, 256))) for _ in range(200)]
+
+
+@pytest.mark.parametrize("compress_level", [0, 1, 9])
+def test_binary_batch_round_trip(records, compress_level):
+    datastream = BinaryDatastream(compress_level)
+    for k, v in records:
+        datastream.append(k, v)
+    assert datastream.get_size() == sum(8 + len(k) + len(v) for k, v in records)
+    assert decode_binary_batch(datastream.get_data(), compressed=compress_level > 0) == records
+    datastream.clear()
+    assert datastream.get_size() == 0 and decode_binary_batch(datastream.get_data(), compress_level > 0) == []
+
+
+def test_binary_batch_matches_json_batch(records):
+    json_datastream = Datastream()
+    for k, v in records:
+        json_datastream.append({"k": k.hex(), "v": v.hex()})
+    binary_datastream = BinaryDatastream()
+    for k, v in records:
+        binary_datastream.append(k, v)
+    assert decode_json_batch(json_datastream.get_data().encode()) == decode_binary_batch(binary_datastream.get_data())
+
+
+class _RecordingChannel:
+    _dst_party_id = "9999"
+
+    def __init__(self):
+        self.messages = []
+
+    def produce(self, body, properties):
+        self.messages.append((body, properties))
+
+
+def test_json_batches_by_default():
+    # peers of older versions only read json batches
+    assert cfg.federation.message_queue.table_format == "json"
+
+
+@pytest.mark.parametrize(
+    "table_format, content_type", [("json", "application/json"), ("binary", "application/octet-stream")]
+)
+def test_batch_headers(table_format, content_type):
+    channel = _RecordingChannel()
+    MessageQueueBasedFederation._send_kv(
+        None,
+        name="name",
+        tag="tag",
+        data=b"data",
+        channel_infos=[channel],
+        partition_size=-1,
+        partitions=2,
+        message_key="0_1",
+        table_format=table_format,
+    )
+    [(body, properties)] = channel.messages
+    header = json.loads(properties["headers"])
+    assert body == b"data"
+    assert properties["content_type"] == content_type
+    assert header.get("format", "json") == table_format
+
+
+class _ReplayFederation(MessageQueueBasedFederation):
+    """
+    replays messages recorded from `_send_kv`, without a message queue
+    """
+
+    def __init__(self, messages):
+        self._messages = messages
+        self.consumed = 0
+        self.acked = []
+        self.cancelled = False
+
+    def _get_channel(self, **kwargs):
+        return self
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _get_consume_message(self, channel_info):
+        for id, (body, properties) in enumerate(self._messages):
+            self.consumed += 1
+            yield id, properties, body
+
+    def _consume_ack(self, channel_info, id):
+        self.acked.append(id)
+
+
+def _send_batches(records, batch_size, table_format):
+    channel = _RecordingChannel()
+    batches = [records[i : i + batch_size] for i in range(0, len(records), batch_size)]
+    for i, batch in enumerate(batches):
+        datastream = BinaryDatastream() if table_format == "binary" else Datastream()
+        for k, v in batch:
+            if table_format == "binary":
+                datastream.append(k, v)
+            else:
+                datastream.append({"k": k.hex(), "v": v.hex()})
+        data = datastream.get_data()
+        MessageQueueBasedFederation._send_kv(
+            None,
+            name="name",
+            tag="tag",
+            data=data if table_format == "binary" else data.encode(),
+            channel_infos=[channel],
+            partition_size=len(records) if i == len(batches) - 1 else -1,
+            partitions=1,
+            message_key=f"0_{i + 1}",
+            table_format=table_format,
+        )
+    return channel.messages
+
+
+@pytest.mark.parametrize("table_format", ["json", "binary"])
+def test_partition_receive_streams_batches(records, table_format):
+    messages = _send_batches(records, 50, table_format)
+    # a duplicated message is acked and skipped
+    messages.insert(1, messages[0])
+    federation = _ReplayFederation(messages)
+    received = federation._partition_receive(
+        0, "name", "tag", "10000", "guest", "9999", "host", [(0, 0, None)], None, {}
+    )
+    first = next(received)
+    # only the first message is read before its records are consumed
+    assert first == records[0] and federation.consumed == 1 and federation.acked == []
+    assert [first, *received] == records
+    assert federation.acked == list(range(len(messages)))
+    assert federation.cancelled
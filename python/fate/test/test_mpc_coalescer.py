@@ -0,0 +1,110 @@
+import threading
+import time
+
+import torch
+from fate.arch.context._namespace import NS
+from fate.arch.protocol.mpc.communicator.communicator import _MessageCoalescer
+
+
+class _Mailbox:
+    def __init__(self):
+        self.messages = {}
+        self.sent_by = []
+        self.transfer_hooks = []
+
+    def put(self, src, dst, tag, value):
+        # like federation, every push runs the transfer hooks first
+        for hook in self.transfer_hooks:
+            hook()
+        self.sent_by.append(threading.current_thread())
+        self.messages[(src, dst, tag)] = value
+
+    def get(self, src, dst, tag):
+        return self.messages.pop((src, dst, tag))
+
+
+class _Parties:
+    def __init__(self, mailbox, rank, peer):
+        self._mailbox = mailbox
+        self._rank = rank
+        self._peer = peer
+
+    def put(self, tag, value):
+        self._mailbox.put(self._rank, self._peer, tag, value)
+
+    def get(self, tag):
+        return [self._mailbox.get(self._peer, self._rank, tag)]
+
+
+class _Communicator:
+    def __init__(self, mailbox, rank):
+        self._mailbox = mailbox
+        self._rank = rank
+
+    def _get_parties_by_rank(self, rank, namespace):
+        return _Parties(self._mailbox, self._rank, rank)
+
+
+def _coalescers(window=60.0, max_bytes=1 << 20):
+    mailbox = _Mailbox()
+    namespace = NS(name="mpc_coalesced", deep=0)
+    return (
+        mailbox,
+        _MessageCoalescer(_Communicator(mailbox, 0), namespace, window=window, max_bytes=max_bytes),
+        _MessageCoalescer(_Communicator(mailbox, 1), namespace, window=window, max_bytes=max_bytes),
+    )
+
+
+def test_coalesced_messages_are_sent_before_receive():
+    mailbox, sender, receiver = _coalescers()
+    tensor = torch.arange(4)
+    sender.put([1], "a", tensor)
+    sender.put([1], "b", {"obj": 1})
+    # buffered tensors are snapshots
+    tensor += 1
+    assert not mailbox.messages
+    receiver.put([0], "c", "reply")
+    sender.flush()
+    assert len(mailbox.messages) == 1
+    assert receiver.get(0, "b") == {"obj": 1}
+    # the receiving party sends its own buffer before waiting
+    assert len(mailbox.messages) == 1
+    assert torch.equal(receiver.get(0, "a"), torch.arange(4))
+    assert sender.get(1, "c") == "reply"
+    assert not mailbox.messages
+
+
+def test_coalescer_flushes_on_calling_thread():
+    mailbox, sender, receiver = _coalescers(window=0.01, max_bytes=64)
+    num_threads = threading.active_count()
+    sender.put([1], "small", 1)
+    time.sleep(0.05)
+    # no background thread sends the buffer once the window passes
+    assert not mailbox.messages
+    assert threading.active_count() == num_threads
+    # the next put does
+    sender.put([1], "late", 2)
+    assert len(mailbox.messages) == 1
+    # so does growing over max_bytes
+    sender.put([1], "large", torch.zeros(64, dtype=torch.float64))
+    assert len(mailbox.messages) == 2
+    assert all(thread is threading.main_thread() for thread in mailbox.sent_by)
+    assert [receiver.get(0, tag) for tag in ["small", "late"]] == [1, 2]
+    assert torch.equal(receiver.get(0, "large"), torch.zeros(64, dtype=torch.float64))
+
+
+def test_coalescer_flushed_by_transfer_hooks():
+    mailbox, sender, receiver = _coalescers()
+    mailbox.transfer_hooks.append(sender.flush)
+    sender.put([1], "a", 1)
+    sender.put([1], "b", 2)
+    # a plain federation push of the party sends the buffered batch first
+    mailbox.put(0, 1, "plain", "value")
+    assert len(mailbox.messages) == 2
+    assert [receiver.get(0, tag) for tag in ["a", "b"]] == [1, 2]
+    # sends of the batch itself run the hook again without sending twice
+    sender.put([1], "c", 3)
+    sender.flush()
+    assert receiver.get(0, "c") == 3
+    assert mailbox.get(0, 1, "plain") == "value"
+    assert not mailbox.messages
@@ -0,0 +1,310 @@
+import operator
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fate.arch.computing.api._table import _LazyKVTable
+from fate.arch.computing.api import LocalBroadcast
+from fate.arch.computing.backends.standalone import CSession
+from fate.arch.computing.backends.standalone._broadcast import FileBroadcast
+from fate.arch.computing.backends.standalone._table import Table
+from fate.arch.computing.backends.standalone._standalone import (
+    _FunctorCacheMiss,
+    _MapReduceFunctorInfo,
+    _SharedTableRefManager,
+    _WorkerFunctorCache,
+    _load_table,
+)
+from fate.arch.config import cfg
+from fate.arch.unify import URI
+from pytest import fixture
+
+
+@fixture(params=["partition_affine", "basic"])
+def computing(request, tmp_path):
+    computing = CSession(data_dir=str(tmp_path), options={"task_cores": 2, "executor_pool": request.param})
+    yield computing
+    computing.destroy()
+
+
+@fixture
+def kvs():
+    return [(i, i * i) for i in range(100)]
+
+
+def test_repeated_jobs_reuse_functor(computing, kvs):
+    table = computing.parallelize(kvs, include_key=True, partition=4)
+    mapper = lambda x: x + 1
+    for _ in range(3):
+        assert sorted(table.mapValues(mapper).collect()) == [(k, v + 1) for k, v in kvs]
+        assert table.reduce(operator.add) == sum(v for _, v in kvs)
+
+
+def test_jobs_submitted_from_threads(computing, kvs, monkeypatch):
+    # a small cache makes the payload bookkeeping evict functors while other threads dispatch
+    monkeypatch.setattr(_WorkerFunctorCache, "capacity", 2)
+    table = computing.parallelize(kvs, include_key=True, partition=4)
+
+    def _job(i):
+        return sorted(table.mapValues(lambda x: x + i).collect())
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(_job, range(16)))
+    assert results == [[(k, v + i) for k, v in kvs] for i in range(16)]
+
+
+def test_functor_info_ids_stable():
+    mapper = lambda x: x + 1
+    first = _MapReduceFunctorInfo(mapper=mapper, reducer=None)
+    second = _MapReduceFunctorInfo(mapper=mapper, reducer=None)
+    assert first.functor_ids() == second.functor_ids()
+    assert len(first.functor_ids()) == 1
+
+
+def test_functor_info_without_payload():
+    info = _MapReduceFunctorInfo(mapper=lambda x: x * 3, reducer=None)
+    stripped = info.without_payload()
+    _WorkerFunctorCache._functors.pop(info.functor_ids()[0], None)
+    with pytest.raises(_FunctorCacheMiss):
+        stripped.get_mapper()
+    info.preload()
+    assert stripped.get_mapper()(2) == 6
+
+
+def test_pools_agree(tmp_path, kvs):
+    results = []
+    for executor_pool in ["partition_affine", "basic"]:
+        computing = CSession(
+            data_dir=str(tmp_path / executor_pool), options={"task_cores": 2, "executor_pool": executor_pool}
+        )
+        table = computing.parallelize(kvs, include_key=True, partition=4)
+        results.append(
+            (
+                sorted(table.mapValues(lambda x: x - 1).collect()),
+                sorted(table.join(table, operator.add).collect()),
+                table.count(),
+            )
+        )
+        computing.destroy()
+    assert results[0] == results[1]
+
+
+def _narrow_pipeline(table):
+    return (
+        table.mapValues(lambda x: x + 1)
+        .filter(lambda x: x % 3 != 0)
+        .mapPartitions(lambda kvs: [(k, v * 2) for k, v in kvs], preserves_partitioning=True)
+    )
+
+
+def _pipeline_results(table):
+    fused = _narrow_pipeline(table)
+    return (
+        sorted(fused.collect()),
+        fused.count(),
+        fused.reduce(operator.add),
+        sorted(fused.mapReducePartitions(lambda kvs: [(k % 5, v) for k, v in kvs], operator.add).collect()),
+        sorted(fused.join(table, lambda x, y: (x, y)).collect()),
+    )
+
+
+def test_lazy_execution_equivalent(computing, kvs):
+    table = computing.parallelize(kvs, include_key=True, partition=4)
+    eager = _pipeline_results(table)
+    with cfg.temp_override({"computing.lazy_execution.enable": True}):
+        assert isinstance(_narrow_pipeline(table), _LazyKVTable)
+        lazy = _pipeline_results(table)
+    assert lazy == eager
+
+
+def test_load_references_saved_table(computing, kvs):
+    uri = URI.from_string("standalone:///db/test_namespace/test_table")
+    computing.parallelize(kvs, include_key=True, partition=4).save(uri, schema={})
+    loaded = computing.load(uri, schema={})
+    assert loaded.table.read_only
+    assert sorted(loaded.collect()) == kvs
+
+    # in-place modifications work on a copy and leave the saved table untouched
+    dropped = loaded._drop_num(10, loaded.partitioner)
+    assert dropped.count() == len(kvs) - 10
+    assert sorted(computing.load(uri, schema={}).collect()) == kvs
+
+
+def _grouped_sum(kvs, key_func):
+    out = {}
+    for k, v in kvs:
+        out[key_func(k)] = out.get(key_func(k), 0) + v
+    return sorted(out.items())
+
+
+@pytest.mark.parametrize("spill_size", [64, None])
+def test_shuffle_with_spilled_runs(tmp_path, kvs, spill_size):
+    computing = CSession(data_dir=str(tmp_path), options={"task_cores": 2, "shuffle_spill_size": spill_size})
+    table = computing.parallelize(kvs, include_key=True, partition=4)
+    shuffled = table.mapReducePartitions(lambda it: [(k % 7, v) for k, v in it], operator.add, map_side_combine=False)
+    assert sorted(shuffled.collect()) == _grouped_sum(kvs, lambda k: k % 7)
+    assert sorted(table.repartition(3).collect()) == kvs
+    assert sorted(table.map(lambda k, v: (v, k)).collect()) == sorted((v, k) for k, v in kvs)
+    computing.destroy()
+
+
+def test_map_side_combine_equivalent(computing, kvs):
+    table = computing.parallelize(kvs, include_key=True, partition=4)
+    map_op = lambda it: [(k % 5, (v, 1)) for k, v in it]
+    reduce_op = lambda x, y: (x[0] + y[0], x[1] + y[1])
+    combined = table.mapReducePartitions(map_op, reduce_op, map_side_combine=True)
+    uncombined = table.mapReducePartitions(map_op, reduce_op, map_side_combine=False)
+    assert sorted(combined.collect()) == sorted(uncombined.collect())
+    assert sorted(combined.mapValues(lambda x: x[0]).collect()) == _grouped_sum(kvs, lambda k: k % 5)
+
+
+@pytest.mark.parametrize("fan_in", [1, 2, 3])
+def test_tree_reduce(tmp_path, kvs, fan_in):
+    computing = CSession(data_dir=str(tmp_path), options={"task_cores": 2, "tree_reduce_fan_in": fan_in})
+    table = computing.parallelize(kvs, include_key=True, partition=16)
+    assert table.reduce(operator.add) == sum(v for _, v in kvs)
+    assert table.reduce(max) == max(v for _, v in kvs)
+    assert sorted(table.mapValues(lambda x: [x]).reduce(operator.add)) == sorted(v for _, v in kvs)
+    # empty partitions are skipped before merging
+    assert computing.parallelize(kvs[:3], include_key=True, partition=16).reduce(operator.add) == 0 + 1 + 4
+    computing.destroy()
+
+
+@pytest.mark.parametrize("level", ["memory", "memory_serialized"])
+def test_cached_table_sees_writes(computing, kvs, level):
+    table = computing.parallelize(kvs, include_key=True, partition=4).cache(level)
+    total = sum(v for _, v in kvs)
+    assert table.reduce(operator.add) == total
+    assert table.mapValues(lambda x: x + 1).reduce(operator.add) == total + len(kvs)
+
+    raw = table.table
+    raw.put(table.key_serdes.serialize(1000), table.value_serdes.serialize(7), table.partitioner)
+    assert table.count() == len(kvs) + 1
+    assert table.reduce(operator.add) == total + 7
+    assert table.mapValues(lambda x: x + 1).reduce(operator.add) == total + 8 + len(kvs)
+
+    raw.delete(table.key_serdes.serialize(99), table.partitioner)
+    assert table.reduce(operator.add) == total + 7 - 99 * 99
+    assert sorted(table.collect()) == sorted(kvs[:-1] + [(1000, 7)])
+
+
+@pytest.mark.parametrize("budget", [1, None])
+def test_cache_memory_budget(tmp_path, kvs, budget):
+    computing = CSession(data_dir=str(tmp_path), options={"task_cores": 2, "cache_memory_budget": budget})
+    if budget is not None:
+        assert computing.get_standalone_session()._cache_memory_budget == budget
+    table = computing.parallelize(kvs, include_key=True, partition=4).cache("memory")
+    # partitions above the budget are read from disk every time
+    for _ in range(2):
+        assert table.reduce(operator.add) == sum(v for _, v in kvs)
+        assert sorted(table.mapValues(lambda x: -x).collect()) == [(k, -v) for k, v in kvs]
+    computing.destroy()
+
+
+@pytest.mark.parametrize("size, broadcast_cls", [(10, LocalBroadcast), (100_000, FileBroadcast)])
+def test_broadcast(computing, kvs, size, broadcast_cls):
+    lookup = {i: i % 13 for i in range(size)}
+    broadcast = computing.broadcast(lookup)
+    assert isinstance(broadcast, broadcast_cls)
+    table = computing.parallelize(kvs, include_key=True, partition=4)
+    mapped = table.map(lambda k, v: (k, v + broadcast.value.get(k, -1)))
+    assert sorted(mapped.collect()) == [(k, v + lookup.get(k, -1)) for k, v in kvs]
+    broadcast.destroy()
+
+
+def test_coalesce_keeps_keys_in_place(computing, kvs):
+    table = computing.parallelize(kvs, include_key=True, partition=8)
+    coalesced = table.coalesce(3)
+    # the nearest divisor of the partition count is used
+    assert coalesced.num_partitions == 4
+    assert sorted(coalesced.collect()) == kvs
+    other = computing.parallelize(kvs, include_key=True, partition=4)
+    assert sorted(coalesced.join(other, operator.add).collect()) == [(k, 2 * v) for k, v in kvs]
+    assert table.coalesce(8) is table
+
+
+def test_adaptive_parallelize_from_sample(computing, kvs):
+    override = {
+        "computing.adaptive_partition.enable": True,
+        "computing.adaptive_partition.min_partition_rows": 10,
+        "computing.adaptive_partition.sample_rows": 20,
+    }
+    with cfg.temp_override(override):
+        # sized data, unsized data longer than the sample, and data shorter than the sample
+        for data, num_partitions in [(kvs, 2), (iter(kvs), 2), (iter(kvs[:15]), 1)]:
+            table = computing.parallelize(data, include_key=True)
+            assert table.num_partitions == num_partitions
+            assert sorted(table.collect()) == sorted(kvs[: table.count()])
+            assert table.count() in (15, len(kvs))
+    with cfg.temp_override({**override, "computing.adaptive_partition.max_partition_bytes": 64}):
+        # rows of the same size are extrapolated exactly
+        uniform = [(1000 + i, "v" * 8) for i in range(100)]
+        table = computing.parallelize(uniform, include_key=True)
+        num_rows, num_bytes = table.size_stats()
+        assert table.num_partitions == computing.suggest_num_partitions(num_rows=num_rows, num_bytes=num_bytes)
+        assert sorted(table.collect()) == uniform
+
+
+@pytest.mark.parametrize("num_rows", [0, 10, 2500])
+def test_parallelize_without_keys_in_batches(computing, num_rows):
+    values = [f"v{i}" for i in range(num_rows)]
+    # integer keys are serialized a batch at a time, also from inputs without a length
+    table = computing.parallelize((v for v in values), include_key=False, partition=4, key_serdes_type=1)
+    assert sorted(table.collect()) == list(enumerate(values))
+    assert sorted(computing.parallelize(values, include_key=False, partition=4).collect()) == list(enumerate(values))
+
+
+def _load_shared(raw):
+    return _load_table(
+        session=raw._session,
+        data_dir=raw._data_dir,
+        name=raw.name,
+        namespace=raw.namespace,
+        need_cleanup=True,
+        read_only=True,
+        shared=True,
+    )
+
+
+def test_shared_table_writable_after_release(computing, kvs):
+    table = computing.parallelize(kvs, include_key=True, partition=4)
+    raw = table.table
+    k_bytes, v_bytes = table.key_serdes.serialize(1000), table.value_serdes.serialize(1)
+
+    raw.share(2)
+    refs = [_load_shared(raw), _load_shared(raw)]
+    assert raw.read_only
+    with pytest.raises(PermissionError):
+        raw.put(k_bytes, v_bytes, table.partitioner)
+    assert sorted(Table(refs[0]).collect()) == kvs
+
+    refs[0].destroy()
+    refs[0].destroy()
+    assert raw.read_only
+    refs[1].destroy()
+    # the sender holds the only reference left
+    assert not raw.read_only
+    raw.put(k_bytes, v_bytes, table.partitioner)
+    assert table.count() == len(kvs) + 1
+
+    raw.destroy()
+    raw.destroy()
+
+
+def test_shared_table_reclaimed_by_last_holder(computing, kvs):
+    raw = computing.parallelize(kvs, include_key=True, partition=4).table
+    raw.share(1)
+    ref = _load_shared(raw)
+    raw.destroy()
+    raw.destroy()
+    assert sorted(Table(ref).collect()) == kvs
+    ref.destroy()
+    with pytest.raises(RuntimeError, match="table not exist"):
+        computing.get_standalone_session().load(raw.name, raw.namespace)
+
+
+def test_shared_refs_per_data_dir(tmp_path):
+    for data_dir in [tmp_path / "a", tmp_path / "b"]:
+        _SharedTableRefManager.acquire(str(data_dir), "namespace", "name", 2, True)
+    assert _SharedTableRefManager.release(str(tmp_path / "a"), "namespace", "name") == (1, True)
+    assert _SharedTableRefManager.release(str(tmp_path / "b"), "namespace", "name") == (1, True)
+    assert _SharedTableRefManager.release_if_last(str(tmp_path / "a"), "namespace", "name")
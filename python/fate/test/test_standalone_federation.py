@@ -0,0 +1,205 @@
+import multiprocessing
+import time
+import traceback
+
+import pytest
+from fate.arch import Context
+from fate.arch.computing.backends.standalone import CSession
+from fate.arch.computing.backends.standalone._standalone import _FederationNotifier
+from fate.arch.config import cfg
+from fate.arch.federation.api._federation import Federation, _PushQueue
+from fate.arch.federation.backends.standalone import StandaloneFederation
+from fate.arch.trace import federation_transfer_statistics
+
+GUEST = ("guest", "10000")
+HOST = ("host", "9999")
+
+
+def _run_party(data_dir, party, parties, func, queue, barrier):
+    try:
+        computing = CSession(data_dir=data_dir, options={"task_cores": 2})
+        federation = StandaloneFederation(computing, "federation", party, parties)
+        ctx = Context(computing=computing, federation=federation)
+        queue.put((party, func(ctx), None))
+        # destroying a federation drops the objects of all parties, wait for the others to finish first
+        barrier.wait()
+        ctx.destroy()
+    except BaseException:
+        queue.put((party, None, traceback.format_exc()))
+        barrier.abort()
+
+
+def run_parties(tmp_path, party_funcs: dict, timeout=60):
+    """
+    run each party in its own process, lmdb environments of the federation can not be opened twice in one process.
+    returns the results of the parties' functions in order
+    """
+    parties = list(party_funcs)
+    mp = multiprocessing.get_context("fork")
+    queue = mp.Queue()
+    barrier = mp.Barrier(len(parties))
+    processes = [
+        mp.Process(target=_run_party, args=(str(tmp_path), party, parties, func, queue, barrier))
+        for party, func in party_funcs.items()
+    ]
+    for process in processes:
+        process.start()
+    results = {}
+    try:
+        for _ in processes:
+            party, result, error = queue.get(timeout=timeout)
+            assert error is None, error
+            results[party] = result
+    finally:
+        for process in processes:
+            process.join(timeout=timeout)
+            if process.is_alive():
+                process.kill()
+    return [results[party] for party in parties]
+
+
+@pytest.mark.filterwarnings("error::pytest.PytestUnhandledThreadExceptionWarning")
+def test_notifier_wakes_waiter(tmp_path):
+    waiter = _FederationNotifier(str(tmp_path), "session", HOST)
+    sender = _FederationNotifier(str(tmp_path), "session", GUEST)
+    assert waiter.enabled
+    generation = waiter.generation
+    waiter.wait(generation, timeout=0.01)
+    sender.notify(HOST)
+    start = time.monotonic()
+    waiter.wait(generation, timeout=10)
+    assert waiter.generation != generation
+    assert time.monotonic() - start < 5
+    # parties not listening are ignored
+    sender.notify(("arbiter", "1"))
+    # closing wakes the listener blocked in recv and lets it exit quietly
+    listener = waiter._listener
+    waiter.close()
+    assert not listener.is_alive()
+    sender.close()
+
+
+def _exchange_guest(ctx):
+    ctx.hosts.put("obj", {"a": 1})
+    ctx.hosts.put("table", ctx.computing.parallelize([(i, i * i) for i in range(20)], include_key=True, partition=2))
+    return ctx.hosts[0].get("echo")
+
+
+def _exchange_host(ctx):
+    obj = ctx.guest.get("obj")
+    table = ctx.guest.get("table")
+    ctx.guest.put("echo", [obj, sorted(table.collect())])
+    return obj
+
+
+def test_exchange_between_parties(tmp_path):
+    guest, host = run_parties(tmp_path, {GUEST: _exchange_guest, HOST: _exchange_host})
+    assert host == {"a": 1}
+    assert guest == [{"a": 1}, [(i, i * i) for i in range(20)]]
+
+
+def _as_completed_guest(ctx):
+    arrivals = [(index, value) for index, value in ctx.hosts.get_as_completed("slow_or_fast")]
+    # the timer of a pull is finalized when its consumer stops early
+    early = ctx.hosts.get_as_completed("early")
+    next(early)
+    early.close()
+    return arrivals, ctx.hosts.get("ordered"), federation_transfer_statistics()["get"]["early"]["count"]
+
+
+def _as_completed_host(delay):
+    def _host(ctx):
+        time.sleep(delay)
+        ctx.guest.put("slow_or_fast", delay)
+        ctx.guest.put("early", delay)
+        ctx.guest.put("ordered", delay)
+
+    return _host
+
+
+def test_get_as_completed(tmp_path):
+    slow, fast = ("host", "9999"), ("host", "9998")
+    guest, _, _ = run_parties(
+        tmp_path, {GUEST: _as_completed_guest, slow: _as_completed_host(2.0), fast: _as_completed_host(0.0)}
+    )
+    arrivals, ordered, early_count = guest
+    assert arrivals == [(1, 0.0), (0, 2.0)]
+    assert ordered == [2.0, 0.0]
+    assert early_count == 1
+
+
+class _BatchPullFederation(Federation):
+    def __init__(self):
+        super().__init__("session", GUEST, [GUEST, HOST, ("host", "9998")])
+        self.pulls = []
+
+    def _pull_bytes(self, name, tag, parties):
+        self.pulls.append(list(parties))
+        return [f"{party[1]}".encode() for party in parties]
+
+
+def test_pull_as_completed_fallback_pulls_all_parties_at_once():
+    federation = _BatchPullFederation()
+    parties = [HOST, ("host", "9998")]
+    assert list(federation.pull_bytes_as_completed("name", "tag", parties)) == [(0, b"9999"), (1, b"9998")]
+    assert federation.pulls == [parties]
+
+
+def test_transfer_hooks_run_before_pushes_and_pulls():
+    federation = _BatchPullFederation()
+    calls = []
+
+    def hook():
+        calls.append("hook")
+
+    federation.add_transfer_hook(hook)
+    federation.submit_push(lambda: calls.append("push"))
+    federation.wait_pushes()
+    assert calls == ["hook", "push", "hook"]
+    federation.remove_transfer_hook(hook)
+    federation.wait_pushes()
+    assert calls == ["hook", "push", "hook"]
+
+
+def test_push_queue_runs_in_order_and_reports_errors():
+    push_queue = _PushQueue(max_pending=2)
+    done = []
+    futures = [push_queue.submit(lambda i=i: done.append(i) or i) for i in range(10)]
+    push_queue.join()
+    assert done == list(range(10))
+    assert [future.result() for future in futures] == list(range(10))
+
+    def _fail():
+        raise ValueError("push failed")
+
+    failed = push_queue.submit(_fail)
+    after = push_queue.submit(lambda: "after")
+    with pytest.raises(ValueError, match="push failed"):
+        push_queue.join()
+    assert isinstance(failed.exception(), ValueError)
+    assert after.result() == "after"
+    # errors are raised once
+    push_queue.join()
+    push_queue.close()
+
+
+def _async_guest(ctx):
+    futures = [ctx.hosts.put(f"value_{i}", list(range(i))) for i in range(5)]
+    table = ctx.computing.parallelize([(i, i) for i in range(10)], include_key=True, partition=2)
+    futures.append(ctx.hosts.put("table", table))
+    # gets wait for the pending puts first
+    echo = ctx.hosts[0].get("echo")
+    return [future.done() for future in futures], echo
+
+
+def _async_host(ctx):
+    values = [ctx.guest.get(f"value_{i}") for i in range(5)]
+    table = ctx.guest.get("table")
+    ctx.guest.put("echo", [values, sorted(table.collect())]).result()
+
+
+def test_async_push(tmp_path):
+    with cfg.temp_override({"federation.async_push.enable": True, "federation.async_push.max_pending": 2}):
+        (done, echo), _ = run_parties(tmp_path, {GUEST: _async_guest, HOST: _async_host})
+    assert all(done)
+    assert echo == [[list(range(i)) for i in range(5)], [(i, i) for i in range(10)]]